@@ -4,6 +4,9 @@
 
 import bpy
 
+from time import perf_counter
+from contextlib import contextmanager
+
 # This is only here for supporting blender 4.1
 bl_info = {
     "name": "Rig Nodes",
@@ -22,13 +25,56 @@ def get_addon_prefs():
     return bpy.context.preferences.addons[__package__].preferences
 
 
+class PrefsSnapshot:
+    """cached copy of the addon preferences flags read in hot paths (handlers, debug prints).
+    Reading the preferences is an RNA lookup, the snapshot is refreshed by the preferences update callbacks instead.
+    NOTE import it with 'from .. import PrefsSnapshot', 'from ..__init__' would give you a copy of this module."""
+    debug = False
+    debug_depsgraph = False
+    auto_launch_minimap_navigation = False
+
+
+def refresh_prefs_snapshot(prefs=None) -> None:
+    """refresh the preferences snapshot, from the given preferences or the addon preferences"""
+
+    if (prefs is None):
+        prefs = get_addon_prefs()
+
+    PrefsSnapshot.debug = prefs.debug
+    PrefsSnapshot.debug_depsgraph = prefs.debug_depsgraph
+    PrefsSnapshot.auto_launch_minimap_navigation = prefs.auto_launch_minimap_navigation
+    return None
+
+
 def isdebug():
-    return get_addon_prefs().debug
+    return PrefsSnapshot.debug
+
 
+def dprint(thing, *args):
+    """print only in debug mode. Pass format arguments separately so the string is only formatted
+    when debugging, ex: dprint("node %s updated", node.name)"""
+    if (PrefsSnapshot.debug):
+        print((thing % args) if args else thing)
 
-def dprint(thing):
-    if isdebug():
-        print(thing)
+
+# NOTE milliseconds spent in each phase of the latest register(), see register_report().
+REGISTER_TIMINGS = {}
+
+
+@contextmanager
+def register_phase(name:str):
+    """measure the time spent in a phase of the addon registration"""
+    t = perf_counter()
+    yield
+    REGISTER_TIMINGS[name] = (perf_counter() - t) * 1000
+
+
+def register_report() -> str:
+    """get a report of the time spent in each phase of the latest addon registration"""
+
+    lines = [f"  {name}: {ms:.2f}ms" for name, ms in REGISTER_TIMINGS.items()]
+    total = sum(REGISTER_TIMINGS.values())
+    return "\n".join([f"Rig Nodes register(): {total:.2f}ms"] + lines)
 
 
 def cleanse_modules():
@@ -77,25 +123,32 @@ def get_addon_classes(revert=False):
 def register():
     """main addon register"""
 
+    REGISTER_TIMINGS.clear()
+
     # register every single addon classes here
-    for cls in get_addon_classes():
-        bpy.utils.register_class(cls)
+    with register_phase("classes"):
+        for cls in get_addon_classes():
+            bpy.utils.register_class(cls)
 
-    from .properties import load_properties
+    with register_phase("load_properties"):
+        from .properties import load_properties
 
-    load_properties()
+        load_properties()
 
-    from .handlers import load_handlers
+    with register_phase("load_handlers"):
+        from .handlers import load_handlers
 
-    load_handlers()
+        load_handlers()
 
-    from .ui import load_ui
+    with register_phase("load_ui"):
+        from .ui import load_ui
 
-    load_ui()
+        load_ui()
 
-    from .operators import load_operators_keymaps
+    with register_phase("load_operators_keymaps"):
+        from .operators import load_operators_keymaps
 
-    load_operators_keymaps()
+        load_operators_keymaps()
 
     return None
 
@@ -103,25 +156,38 @@ def register():
 def unregister():
     """main addon un-register"""
 
-    from .operators import unload_operators_keymaps
+    from .utils.prof_utils import ProfilingState, profiled, profiling_summary
+
+    with profiled("unregister.unload_operators_keymaps"):
+        from .operators import unload_operators_keymaps
 
-    unload_operators_keymaps()
+        unload_operators_keymaps()
 
-    from .ui import unload_ui
+    with profiled("unregister.unload_ui"):
+        from .ui import unload_ui
 
-    unload_ui()
+        unload_ui()
 
-    from .handlers import unload_handlers
+    with profiled("unregister.unload_handlers"):
+        from .handlers import unload_handlers
 
-    unload_handlers()
+        unload_handlers()
 
-    from .properties import unload_properties
+    with profiled("unregister.unload_properties"):
+        from .properties import unload_properties
 
-    unload_properties()
+        unload_properties()
 
     # unregister every single addon classes here
-    for cls in get_addon_classes(revert=True):
-        bpy.utils.unregister_class(cls)
+    with profiled("unregister.classes"):
+        for cls in get_addon_classes(revert=True):
+            bpy.utils.unregister_class(cls)
+
+    # the profiling data is lost with the modules cleanse, we print it one last time.
+    if (ProfilingState.enabled):
+        print(register_report())
+        for name, calls, total, avg, maxi in profiling_summary():
+            print(f"  {name}: {calls} calls, {total:.2f}ms total, {avg:.3f}ms avg, {maxi:.3f}ms max")
 
     cleanse_modules()
 
@@ -0,0 +1,197 @@
+# SPDX-FileCopyrightText: 2025 Natalie Cuthbert <natalie@cuthbert.co.za>
+#
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+
+# NOTE headless benchmarks of the utils/bezier2d_utils.py curve maths, with a regression gate.
+# The module is pure numpy, only its CurveMapping adapters need blender, and they are not benchmarked here.
+# Usage, from the plugin folder:
+#   python benchmarks/bezier2d_bench.py                 run & compare with the json baseline, exit 1 on regression.
+#   python benchmarks/bezier2d_bench.py --save          run & overwrite the json baseline.
+#   python benchmarks/bezier2d_bench.py --threshold 0.5 tolerate up to 50% slowdown before failing.
+#   python benchmarks/bezier2d_bench.py --dtype float32 run the cases on float32 curves as well.
+# BEWARE: timings are machine dependent, please regenerate the baseline on the machine running the gate.
+
+
+import os
+import sys
+import json
+import timeit
+import argparse
+import platform
+import importlib.util
+
+import numpy as np
+
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+BASELINE_PATH = os.path.join(BENCH_DIR, "bezier2d_baseline.json")
+SIZES = (2, 10, 100, 1_000, 10_000)
+
+
+def load_module(name:str, relpath:str):
+    """load a plugin module by path, without importing the plugin package (which needs bpy)"""
+
+    spec = importlib.util.spec_from_file_location(name, os.path.join(BENCH_DIR, "..", relpath))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def make_monotonic_bezsegs(num_segments:int, seed:int=0) -> np.ndarray:
+    """generate a random x-monotonic curve of num_segments segments, in the [0,1] x range"""
+
+    rng = np.random.default_rng(seed)
+    xs = np.sort(rng.random(num_segments + 1))
+    xs[0], xs[-1] = 0.0, 1.0
+    ys = rng.random(num_segments + 1)
+
+    segments = np.empty((num_segments, 8), dtype=float)
+    dx = np.diff(xs)
+    segments[:, 0], segments[:, 1] = xs[:-1], ys[:-1]
+    segments[:, 6], segments[:, 7] = xs[1:], ys[1:]
+    # handles within their segment x bounds
+    segments[:, 2] = xs[:-1] + dx * rng.uniform(0.1, 0.45, num_segments)
+    segments[:, 4] = xs[1:] - dx * rng.uniform(0.1, 0.45, num_segments)
+    segments[:, 3] = ys[:-1] + rng.uniform(-0.2, 0.2, num_segments)
+    segments[:, 5] = ys[1:] + rng.uniform(-0.2, 0.2, num_segments)
+    return segments
+
+
+def make_random_bezsegs(num_segments:int, seed:int=0) -> np.ndarray:
+    """generate a non-monotonic curve: anchors are shuffled on the x axis"""
+
+    segments = make_monotonic_bezsegs(num_segments, seed=seed)
+    rng = np.random.default_rng(seed + 1)
+    points = np.vstack([segments[:, 0:2], segments[-1:, 6:8]])
+    rng.shuffle(points)
+    segments[:, 0:2], segments[:, 6:8] = points[:-1], points[1:]
+    return segments
+
+
+def get_cases(bz, dtype=np.float64) -> dict:
+    """get the benchmark cases as {name: (sizes, setup(size) -> callable)}"""
+
+    def mono(n, seed=0):
+        return make_monotonic_bezsegs(n, seed=seed).astype(dtype)
+
+    def rand(n, seed=0):
+        return make_random_bezsegs(n, seed=seed).astype(dtype)
+
+    return {
+        "sample_bezsegs": (SIZES,
+            lambda n: (lambda s=mono(n): bz.sample_bezsegs(s, 10))),
+        "cut_bezsegs": (SIZES,
+            lambda n: (lambda s=mono(n): bz.cut_bezsegs(s, 0.5))),
+        "ensure_monotonic_bezsegs": (SIZES,
+            lambda n: (lambda s=rand(n): bz.ensure_monotonic_bezsegs(s))),
+        # NOTE subdiv_project_bezsegs() cuts one knot at a time, quadratic, we don't go up to 10k.
+        "subdiv_project_bezsegs": (SIZES[:-1],
+            lambda n: (lambda s=mono(n), r=mono(max(2, n//2), seed=1): bz.subdiv_project_bezsegs(s, r))),
+        "lerp_bezsegs": (SIZES,
+            lambda n: (lambda a=mono(n), b=mono(n, seed=1): bz.lerp_bezsegs(a, b, 0.3))),
+        "lerp_bezsegs_unmatched": (SIZES[:-1],
+            lambda n: (lambda a=mono(n), b=mono(max(2, n//2), seed=1): bz.lerp_bezsegs(a, b, 0.3))),
+        "looped_offset_bezsegs": (SIZES,
+            lambda n: (lambda s=mono(n): bz.looped_offset_bezsegs(s, 0.37))),
+        # steady-state per-frame updates, the results are written to a reused array.
+        "lerp_bezsegs_out": (SIZES,
+            lambda n: (lambda a=mono(n), b=mono(n, seed=1), o=np.empty((n, 8), dtype): bz.lerp_bezsegs(a, b, 0.3, out=o))),
+        "looped_offset_bezsegs_out": (SIZES,
+            lambda n: (lambda s=mono(n), o=np.empty((n+1, 8), dtype): bz.looped_offset_bezsegs(s, 0.37, out=o))),
+    }
+
+
+def measure(fct, min_time:float=0.05, repeat:int=5) -> float:
+    """get the best time of a call, in milliseconds"""
+
+    timer = timeit.Timer(fct)
+    # find a number of calls reaching min_time per repeat
+    number = 1
+    while (timer.timeit(number) < min_time):
+        number *= 2
+    best = min(timer.repeat(repeat=repeat, number=number))
+    return best / number * 1000
+
+
+def run(bz, only:list=None, min_time:float=0.05, repeat:int=5, dtypes:list=("float64",)) -> dict:
+    """run all benchmarks cases, return {"case[size]": milliseconds}, suffixed with the dtype if not float64"""
+
+    results = {}
+    for dtype in dtypes:
+        for name, (sizes, setup) in get_cases(bz, dtype=np.dtype(dtype)).items():
+            if (only and (name not in only)):
+                continue
+            for n in sizes:
+                key = f"{name}[{n}]" if (dtype == "float64") else f"{name}[{n}][{dtype}]"
+                results[key] = measure(setup(n), min_time=min_time, repeat=repeat)
+                print(f"  {key:<40} {results[key]:>12.4f}ms")
+                continue
+            continue
+        continue
+
+    return results
+
+
+def compare(results:dict, baseline:dict, threshold:float) -> list:
+    """return the list of (key, baseline ms, new ms, ratio) regressing more than the threshold"""
+
+    regressions = []
+    for key, ms in results.items():
+        ref = baseline.get(key)
+        if (ref is None) or (ref <= 0):
+            continue
+        ratio = ms / ref
+        if (ratio > 1.0 + threshold):
+            regressions.append((key, ref, ms, ratio))
+        continue
+
+    return regressions
+
+
+def main(argv=None) -> int:
+
+    parser = argparse.ArgumentParser(description="bezier2d_utils benchmarks & regression gate")
+    parser.add_argument("--save", action="store_true", help="overwrite the json baseline with this run results")
+    parser.add_argument("--baseline", default=BASELINE_PATH, help="path of the json baseline")
+    parser.add_argument("--threshold", type=float, default=0.25, help="relative slowdown tolerated, 0.25 = 25%%")
+    parser.add_argument("--only", nargs="*", help="only run the given cases names")
+    parser.add_argument("--min-time", type=float, default=0.05, help="minimal time in seconds per measure")
+    parser.add_argument("--dtype", nargs="*", default=["float64"], choices=["float64", "float32"], help="dtypes of the curves")
+    args = parser.parse_args(argv)
+
+    bz = load_module("bezier2d_utils", os.path.join("utils", "bezier2d_utils.py"))
+
+    print("bezier2d_utils benchmarks:")
+    results = run(bz, only=args.only, min_time=args.min_time, dtypes=args.dtype)
+
+    if (args.save):
+        data = {
+            "machine": {"python": platform.python_version(), "numpy": np.__version__, "platform": platform.platform()},
+            "results": results,
+            }
+        with open(args.baseline, "w") as f:
+            json.dump(data, f, indent=2)
+        print(f"baseline written to '{args.baseline}'")
+        return 0
+
+    if (not os.path.exists(args.baseline)):
+        print(f"no baseline found at '{args.baseline}', run with --save first.")
+        return 0
+
+    with open(args.baseline) as f:
+        baseline = json.load(f)["results"]
+
+    regressions = compare(results, baseline, args.threshold)
+    if (not regressions):
+        print(f"OK: no regression above {args.threshold:.0%}.")
+        return 0
+
+    print(f"FAILED: {len(regressions)} regression(s) above {args.threshold:.0%}:")
+    for key, ref, ms, ratio in regressions:
+        print(f"  {key:<40} {ref:>10.4f}ms -> {ms:>10.4f}ms  (x{ratio:.2f})")
+    return 1
+
+
+if (__name__ == "__main__"):
+    sys.exit(main())
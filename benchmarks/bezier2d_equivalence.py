@@ -0,0 +1,241 @@
+# SPDX-FileCopyrightText: 2025 Natalie Cuthbert <natalie@cuthbert.co.za>
+#
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+
+# NOTE randomized equivalence checks between the utils/bezier2d_utils.py kernels and their reference implementations.
+# - the references are the kernels as they were before being optimized, see benchmarks/bezier2d_reference.py
+# - each kernel is fed with many generated curves (monotonic, shuffled, degenerated, float32..) and cut locations.
+#   results must match the reference within tolerances, the speedups are reported alongside.
+# - float32 curves are worked in float32 by the kernels (see the module precision policy), while the references worked
+#   them in float64. their results must stay float32 and keep the reference structure (None results, shapes, booleans),
+#   their values may drift within float32 rounding errors, these divergences are reported.
+# - the examples are reproducible: a failure prints the seed to pass to '--seed' in order to replay it.
+# Usage, from the plugin folder:
+#   python benchmarks/bezier2d_equivalence.py                  check all kernels, exit 1 on mismatch.
+#   python benchmarks/bezier2d_equivalence.py --examples 5000  check more examples.
+
+
+import sys
+import argparse
+
+import numpy as np
+
+import bezier2d_reference as ref
+from bezier2d_bench import load_module, measure, make_monotonic_bezsegs, make_random_bezsegs
+
+
+# .oooooo..o     .                            .                        o8o
+# d8P'    `Y8   .o8                          .o8                        `"'
+# Y88bo.      .o888oo oooo d8b  .oooo.   .o888oo  .ooooo.   .oooooooo oooo   .ooooo.   .oooo.o
+#  `"Y8888o.    888   `888""8P `P  )88b    888   d88' `88b 888' `88b  `888  d88' `88b d88(  "8
+#      `"Y88b   888    888      .oP"888    888   888ooo888 888   888   888  888ooo888 `"Y88b.
+# oo     .d8P   888 .  888     d8(  888    888 . 888    .o `88bod8P'   888  888    .o o.  )88b
+# 8""88888P'    "888" d888b    `Y888""8o   "888" `Y8bod8P' `8oooooo.  o888o `Y8bod8P' 8""888P'
+
+
+def gen_bezsegs(rng) -> np.ndarray:
+    """draw a random curve: monotonic, shuffled or degenerated, of a random size, scale & dtype"""
+
+    num_segments = int(rng.choice((1, 2, 3, 5, 10, 50, 200)))
+    seed = int(rng.integers(2**31))
+
+    match rng.choice(("MONOTONIC", "SHUFFLED", "DUPLICATED", "FLAT", "ALIGNED_HANDLES")):
+        case "MONOTONIC":
+            segments = make_monotonic_bezsegs(num_segments, seed=seed)
+        case "SHUFFLED":
+            segments = make_random_bezsegs(num_segments, seed=seed)
+        case "DUPLICATED":
+            # anchors sharing the same x location, zero width segments
+            segments = make_monotonic_bezsegs(num_segments, seed=seed)
+            segments[:, 6] = segments[:, 0]
+        case "FLAT":
+            segments = make_monotonic_bezsegs(num_segments, seed=seed)
+            segments[:, 1::2] = 0.5
+        case "ALIGNED_HANDLES":
+            # handles sitting on their anchors
+            segments = make_monotonic_bezsegs(num_segments, seed=seed)
+            segments[:, 2:4], segments[:, 4:6] = segments[:, 0:2], segments[:, 6:8]
+
+    scale = float(rng.choice((1.0, 1e-3, 1e3)))
+    offset = float(rng.uniform(-10, 10))
+    segments = segments * scale + offset
+
+    dtype = rng.choice((np.float64, np.float32))
+    return segments.astype(dtype)
+
+
+def gen_xlocation(rng, segments:np.ndarray) -> float:
+    """draw a cut location: inside the curve, on a knot, on the bounds, or outside"""
+
+    xs = segments[:, 0::2]
+    match rng.choice(("INSIDE", "KNOT", "BOUND", "OUTSIDE")):
+        case "INSIDE": return float(rng.uniform(xs.min(), xs.max()))
+        case "KNOT": return float(segments[rng.integers(segments.shape[0]), 0])
+        case "BOUND": return float(rng.choice((xs.min(), xs.max())))
+        case "OUTSIDE": return float(xs.max() + rng.uniform(0.1, 1.0))
+
+
+def gen_t_map(rng, num_segments:int) -> np.ndarray:
+    """draw a t-map: random t-values, with some zeros, ones & values around the tolerance"""
+
+    t_map = rng.random(num_segments)
+    special = rng.random(num_segments) < 0.3
+    t_map[special] = rng.choice((0.0, 1.0, 1e-7, 1e-5, 1 - 1e-7, 1 - 1e-5), size=special.sum())
+    return t_map
+
+
+# oooooooooooo                                 o8o                         oooo
+# `888'     `8                                 `"'                         `888
+#  888         .ooooo oo oooo  oooo   .oooo.   oooo  oooo    ooo  .oooo.    888   .ooooo.  ooo. .oo.    .ooooo.   .ooooo.
+#  888oooo8   d88' `888  `888  `888  `P  )88b  `888   `88.  .8'  `P  )88b   888  d88' `88b `888P"Y88b  d88' `"Y8 d88' `88b
+#  888    "   888   888   888   888   .oP"888   888    `88..8'    .oP"888   888  888ooo888  888   888  888       888ooo888
+#  888       o888   888   888   888  d8(  888   888     `888'    d8(  888   888  888    .o  888   888  888   .o8 888    .o
+# o888ooooood8 `V8bod888  `V88V"V8P' `Y888""8o o888o     `8'     `Y888""8o o888o `Y8bod8P' o888o o888o `Y8bod8P' `Y8bod8P'
+#                    888.
+#                    8P'
+#                    "
+
+
+def is_dtype_preserved(a, dtype) -> bool:
+    """check if the floating arrays of a kernel result are of the given dtype, recursively for tuples"""
+
+    if isinstance(a, tuple):
+        return all(is_dtype_preserved(x, dtype) for x in a)
+    if (a is None):
+        return True
+
+    a = np.asarray(a)
+    return (not np.issubdtype(a.dtype, np.floating)) or (a.dtype == dtype)
+
+
+def is_same_structure(a, b) -> bool:
+    """compare the structure of a kernel result with its reference, recursively for tuples.
+    None results, shapes & booleans must match exactly, whatever the precision"""
+
+    if isinstance(a, tuple) or isinstance(b, tuple):
+        return isinstance(a, tuple) and isinstance(b, tuple) and (len(a)==len(b)) and all(map(is_same_structure, a, b))
+
+    if (a is None) or (b is None):
+        return (a is None) and (b is None)
+
+    a, b = np.asarray(a), np.asarray(b)
+    if (a.shape != b.shape):
+        return False
+    if (a.dtype == bool) or (b.dtype == bool):
+        return np.array_equal(a, b)
+
+    return True
+
+
+def is_equivalent(a, b, scale:float, float32:bool=False) -> bool:
+    """compare the values of a kernel result with its reference, of the same structure, recursively for tuples.
+    the tolerance is relative to the scale of the kernel input coordinates, float32 tolerates its own rounding errors"""
+
+    if isinstance(a, tuple):
+        return all(is_equivalent(x, y, scale, float32) for x, y in zip(a, b))
+    if (a is None):
+        return True
+
+    rtol, atol = (1e-4, 1e-5) if float32 else (1e-9, 1e-12)
+    return np.allclose(np.asarray(a, dtype=np.float64), b, rtol=rtol, atol=atol * max(1.0, scale))
+
+
+def get_kernels(bz) -> dict:
+    """get the kernels to check as {name: (draw(rng) -> args, fast kernel, reference kernel)}"""
+
+    def draw_segments(rng):
+        return (gen_bezsegs(rng),)
+
+    def draw_cut(rng):
+        segments = gen_bezsegs(rng)
+        return (segments, gen_xlocation(rng, segments), int(rng.choice((1, 5, 50))))
+
+    def draw_subdiv(rng):
+        segments = gen_bezsegs(rng)
+        return (segments, gen_t_map(rng, segments.shape[0]))
+
+    def draw_sample(rng):
+        return (gen_bezsegs(rng), int(rng.choice((1, 2, 10, 100))))
+
+    return {
+        "sample_bezsegs": (draw_sample, bz.sample_bezsegs, ref.sample_bezsegs),
+        "is_bezsegs_monotonic": (draw_segments, bz.is_bezsegs_monotonic, ref.is_bezsegs_monotonic),
+        "casteljau_subdiv_bezsegs": (draw_subdiv, bz.casteljau_subdiv_bezsegs, ref.casteljau_subdiv_bezsegs),
+        "cut_bezsegs": (draw_cut, bz.cut_bezsegs, ref.cut_bezsegs),
+        "get_bezsegs_length": (draw_segments, bz.get_bezsegs_length, ref.get_bezsegs_length),
+    }
+
+
+def check_kernel(draw, fast, reference, examples:int, seed:int) -> tuple[list, int]:
+    """run a kernel and its reference on many drawn examples, return the list of failing seeds & the float32 divergences count"""
+
+    failures, divergences = [], 0
+    for i in range(examples):
+        example_seed = seed + i
+        args = draw(np.random.default_rng(example_seed))
+        dtype = args[0].dtype
+        # the kernels should never modify their arguments in place, we pass copies to both.
+        # the references are fed float64 copies, as python float multipliers would keep parts of their maths in float32.
+        expected = reference(*[a.astype(np.float64) if isinstance(a, np.ndarray) else a for a in args])
+        result = fast(*[a.copy() if isinstance(a, np.ndarray) else a for a in args])
+
+        # the structure must always match, float32 values may only drift within its own rounding errors.
+        scale = float(np.abs(args[0]).max(initial=0.0))
+        if (not is_dtype_preserved(result, dtype)) or (not is_same_structure(result, expected)):
+            failures.append(example_seed)
+        elif (not is_equivalent(result, expected, scale)):
+            if (dtype != np.float32) or (not is_equivalent(result, expected, scale, float32=True)):
+                  failures.append(example_seed)
+            else: divergences += 1
+        continue
+
+    return failures, divergences
+
+
+def get_speedup(draw, fast, reference, num_segments:int) -> float:
+    """get the speedup of a kernel over its reference, on a monotonic curve of num_segments segments"""
+
+    rng = np.random.default_rng(0)
+    args = list(draw(rng))
+    args[0] = make_monotonic_bezsegs(num_segments)
+    if (draw.__name__ == "draw_subdiv"):
+        args[1] = gen_t_map(rng, num_segments)
+
+    return measure(lambda: reference(*args)) / measure(lambda: fast(*args))
+
+
+def main(argv=None) -> int:
+
+    parser = argparse.ArgumentParser(description="bezier2d_utils kernels equivalence checks against their references")
+    parser.add_argument("--examples", type=int, default=500, help="number of examples drawn per kernel")
+    parser.add_argument("--seed", type=int, default=0, help="seed of the first example")
+    parser.add_argument("--only", nargs="*", help="only check the given kernels names")
+    parser.add_argument("--no-speedup", action="store_true", help="skip the speedup measures")
+    args = parser.parse_args(argv)
+
+    bz = load_module("bezier2d_utils", "utils/bezier2d_utils.py")
+
+    failed = False
+    print("bezier2d_utils kernels equivalence:")
+    for name, (draw, fast, reference) in get_kernels(bz).items():
+        if (args.only and (name not in args.only)):
+            continue
+
+        failures, divergences = check_kernel(draw, fast, reference, args.examples, args.seed)
+        speedups = "" if args.no_speedup else \
+            "  speedup " + "  ".join(f"[{n}] x{get_speedup(draw, fast, reference, n):.1f}" for n in (10, 1_000))
+
+        if (failures):
+            failed = True
+            print(f"  FAILED {name:<28} {len(failures)}/{args.examples} mismatches, replay with --only {name} --examples 1 --seed {failures[0]}")
+            continue
+
+        print(f"  OK     {name:<28} {args.examples} examples, {divergences} float32 divergences{speedups}")
+        continue
+
+    return 1 if failed else 0
+
+
+if (__name__ == "__main__"):
+    sys.exit(main())
@@ -0,0 +1,297 @@
+# SPDX-FileCopyrightText: 2025 BD3D DIGITAL DESIGN (Dorian B.)
+#
+# SPDX-License-Identifier: GPL-2.0-or-later
+
+
+# NOTE reference kernels of utils/bezier2d_utils.py, kept verbatim as they were before their vectorized rewrite.
+# They are the ground truth of benchmarks/bezier2d_equivalence.py, please don't optimize them.
+# if you rewrite another kernel of bezier2d_utils, copy its current implementation here first.
+
+
+import numpy as np
+
+
+def is_bezsegs_monotonic(segments:np.ndarray, sample_rate:int=500) -> bool:
+    """Check if the segments represent a monotonic curve in it's x-axis.
+    Curve monotinicity means that the curve points never backtrace on itself on the x-axis.
+    segments (np.ndarray): An (N-1) x 8 NumPy array [P0x, P0y, P1x, P1y, P2x, P2y, P3x, P3y].
+    Returns True if the segments are monotonic in x, False otherwise.
+    """
+    points = sample_bezsegs(segments, sample_rate)
+    return np.all(np.diff(points[:,0]) >= 0)
+
+
+def sample_bezsegs(segments:np.ndarray, sampling_rate:int) -> np.ndarray:
+    """Generate sampled points from the segments numpy array using vectorized operations.
+    segments (np.ndarray): An (N-1) x 8 NumPy array [P0x, P0y, P1x, P1y, P2x, P2y, P3x, P3y].
+    sampling_rate (int): Number of steps per segment (e.g., 1 gives start/end, 2 gives start/mid/end).
+    Returns a NumPy array of 2D points (sampling_rate + 1, 2).
+    """
+
+    if (sampling_rate < 1): raise ValueError("sampling_rate must be at least 1")
+
+    num_segments = segments.shape[0]
+    num_points_per_segment = sampling_rate + 1
+
+    # Extract control points for all segments
+    # Reshape to (num_segments, 4, 2) for easier access
+    control_points = segments.reshape(num_segments, 4, 2)
+    P0 = control_points[:, 0, :][:, np.newaxis, :] # Shape (N, 1, 2)
+    P1 = control_points[:, 1, :][:, np.newaxis, :] # Shape (N, 1, 2)
+    P2 = control_points[:, 2, :][:, np.newaxis, :] # Shape (N, 1, 2)
+    P3 = control_points[:, 3, :][:, np.newaxis, :] # Shape (N, 1, 2)
+
+    # Generate t values (parameterization)
+    # Shape (1, num_points_per_segment, 1) to broadcast correctly with points
+    t = np.linspace(0, 1, num_points_per_segment).reshape(1, num_points_per_segment, 1)
+
+    # Calculate powers of t and (1-t)
+    omt = 1.0 - t
+    omt2 = omt * omt
+    omt3 = omt2 * omt
+    t2 = t * t
+    t3 = t2 * t
+
+    # Calculate points using the Bezier formula with broadcasting
+    # Result shape: (num_segments, num_points_per_segment, 2)
+    points = (P0 * omt3) + (P1 * 3.0 * omt2 * t) + (P2 * 3.0 * omt * t2) + (P3 * t3)
+
+    # Reshape to a 2D array: (num_segments * num_points_per_segment, 2)
+    all_points = points.reshape(-1, 2)
+
+    # Remove duplicate points at segment junctions
+    # Keep the first point (t=0) of the first segment.
+    # Keep points from t=1/sampling_rate to t=1 for all segments.
+    # Create indices to keep: 0 (start of first seg), and then 1 to sampling_rate+1 for each segment
+    indices_to_keep = [0] # Keep the very first point
+    for i in range(num_segments):
+        start = i * num_points_per_segment + 1
+        end = start + sampling_rate # +1 for num_points, -1 because index starts at 1
+        indices_to_keep.extend(range(start, end + 1))
+        continue
+
+    # Ensure indices are within bounds (handles cases like sampling_rate=1 correctly)
+    indices_to_keep = [idx for idx in indices_to_keep if (idx < all_points.shape[0])]
+    sampled_points = all_points[indices_to_keep]
+
+    return sampled_points
+
+
+def sample_bezsegs_with_t(segments:np.ndarray, sampling_rate:int) -> tuple[list, list]:
+    """Generate an array of points **and** their corresponding t-values per segment, using vectorized operations.
+    NOTE: This is an useful information to have in order to retrieve the t-value for a given x-coordinate for example.
+    Args:
+        segments (np.ndarray): An (N-1) x 8 NumPy array [P0x, P0y, P1x, P1y, P2x, P2y, P3x, P3y].
+        sampling_rate (int): Number of steps per segment (e.g., 1 gives start/end, 2 gives start/mid/end).
+    Returns:
+        tuple[list[np.ndarray], list[np.ndarray]]:
+            - points_per_segment: List of numpy arrays sampled points per segments.
+            - t_values_per_segment: List of numpy arrays t-values per segments.
+    """
+
+    if (sampling_rate < 1): raise ValueError("sampling_rate must be at least 1")
+
+    num_segments = segments.shape[0]
+    num_points_per_segment = sampling_rate + 1
+    original_dtype = segments.dtype
+
+    # Extract control points for all segments
+    control_points = segments.reshape(num_segments, 4, 2)
+    P0 = control_points[:, 0, :][:, np.newaxis, :] # Shape (N, 1, 2)
+    P1 = control_points[:, 1, :][:, np.newaxis, :] # Shape (N, 1, 2)
+    P2 = control_points[:, 2, :][:, np.newaxis, :] # Shape (N, 1, 2)
+    P3 = control_points[:, 3, :][:, np.newaxis, :] # Shape (N, 1, 2)
+
+    # Generate t values (parameterization)
+    t_1d = np.linspace(0, 1, num_points_per_segment, dtype=np.float64) # Use float64 for precision
+    # Reshape for broadcasting calculation
+    t = t_1d.reshape(1, num_points_per_segment, 1)
+
+    # Calculate powers of t and (1-t)
+    omt = 1.0 - t
+    omt2 = omt * omt
+    omt3 = omt2 * omt
+    t2 = t * t
+    t3 = t2 * t
+
+    # Calculate points using the Bezier formula with broadcasting
+    # Result shape: (num_segments, num_points_per_segment, 2)
+    # Ensure calculation uses float64, then potentially cast back if needed
+    points = (P0.astype(np.float64) * omt3) + \
+             (P1.astype(np.float64) * 3.0 * omt2 * t) + \
+             (P2.astype(np.float64) * 3.0 * omt * t2) + \
+             (P3.astype(np.float64) * t3)
+    
+    # Convert result back to original dtype if it was float32 or similar
+    if (original_dtype != np.float64):
+        points = points.astype(original_dtype)
+
+    # Populate lists using list comprehensions
+    # points_per_segment will be a list of (num_points_per_segment, 2) arrays
+    points_per_segment = [points[i] for i in range(num_segments)]
+    # t_values_per_segment will be a list of (num_points_per_segment,) arrays (all identical)
+    t_values_per_segment = [t_1d for _ in range(num_segments)]
+
+    return points_per_segment, t_values_per_segment
+
+
+def casteljau_subdiv_bezsegs(segments:np.ndarray, t_map:np.ndarray, tolerance:float=1e-6) -> np.ndarray:
+    """Batch numpy array subdivision of Bézier segments at t-values using the Casteljau algorithm.
+    Args:
+        segments (np.ndarray): An (N-1, 8) NumPy array of Bézier segments [P0x, P0y, P1x, P1y, P2x, P2y, P3x, P3y].
+        t_map (np.ndarray): An NumPy array of t-values (ranging from0.0 to 1.0) corresponding to each segment for subdivision.
+                            length of t_map should match length of segments.
+                            Use 0 value for segments that should not be subdivided.
+        tolerance (float): Tolerance of t-values near 0 or 1 for avoiding subdivision.
+    Returns:
+        np.ndarray: A new NumPy array containing all segments after subdivision operation.
+    """
+
+    num_segments = segments.shape[0]
+    if (t_map.shape != (num_segments,)):
+        raise ValueError(f"ERROR: casteljau_subdiv_bezsegs(): t_map must be an (N,) NumPy array, got shape {t_map.shape}")
+
+    control_points = segments.reshape(num_segments, 4, 2)
+    P0 = control_points[:, 0, :]
+    P1 = control_points[:, 1, :]
+    P2 = control_points[:, 2, :]
+    P3 = control_points[:, 3, :]
+
+    # Perform Vectorized Calculation
+    t = np.clip(t_map, 0.0, 1.0).reshape(-1, 1)
+    omt = 1.0 - t
+    Q0 = P0 * omt + P1 * t
+    Q1 = P1 * omt + P2 * t
+    Q2 = P2 * omt + P3 * t
+    R0 = Q0 * omt + Q1 * t
+    R1 = Q1 * omt + Q2 * t
+    S = R0 * omt + R1 * t
+
+    # Construct Potential Sub-segments
+    # These arrays hold the potential results IF subdivision happens
+    potential_seg1 = np.concatenate((P0, Q0, R0, S), axis=1)
+    potential_seg2 = np.concatenate((S, R1, Q2, P3), axis=1)
+
+    # Identify Segments to Subdivide
+    subdivide_mask = (t_map > tolerance) & (t_map < 1.0 - tolerance) # Use original t_map for mask
+
+    # Assemble the Output Array
+    new_segments = []
+    for i in range(num_segments):
+        if subdivide_mask[i]:
+            new_segments.append(potential_seg1[i])
+            new_segments.append(potential_seg2[i])
+        else:
+            new_segments.append(segments[i])
+
+    # failed to subdivide anything?
+    if (not new_segments):
+        print(f"WARNING: casteljau_subdiv_bezsegs(): No segments were subdivided.")
+        return None
+
+    # Determine appropriate dtype (original or float if potential_seg2 was involved)
+    result_dtype = np.promote_types(segments.dtype, potential_seg2.dtype)
+    return np.array(new_segments, dtype=result_dtype)
+
+
+def cut_bezsegs(segments:np.ndarray, xlocation:float, sampling_rate:int=50, tolerance:float=1e-6,) -> np.ndarray:
+    """
+    Subdivides Bézier segments at a given x-location.
+    How this function works:
+        1 We sample the segments at a given sampling  rate with sample_bezsegs_with_t() funciton in order to have an idea 
+          of the t-values equivalent for each sampled points x locations.
+        2 Once an equivalent t-value is found we run the casteljau_subdiv_bezsegs() function to subdivide the segment.
+    Args:
+        segments (np.ndarray): An (N, 8) NumPy array of Bézier segments [P0x, P0y, P1x, P1y, P2x, P2y, P3x, P3y].
+        xlocation (float): The target x-coordinate for subdivision.
+        sampling_rate (int): The density used by sample_bezsegs_with_t to generate points for estimating 't'. 
+                             Higher values increase accuracy but cost more computation upfront.
+    Returns:
+        np.ndarray: A new NumPy array containing all resulting segments after
+                    subdivision. Shape will be (M, 8) where N <= M <= 2*N.
+                    Returns the original array if no subdivisions occur.
+    """
+
+    if sampling_rate < 1: raise ValueError("sampling_rate must be at least 1")
+
+    num_segments = segments.shape[0]
+
+    # 1. Sample points and t-values for estimation
+    points_per_segment, t_values_per_segment = sample_bezsegs_with_t(segments, sampling_rate)
+
+    if (len(points_per_segment) != num_segments) or (len(t_values_per_segment) != num_segments):
+        print(f"WARNING: Mismatch between segment count and sampling results. This should not happen.")
+        return None
+
+    # 2. Initialize the t-map for subdivision
+    t_map = np.zeros(num_segments, dtype=np.float64)
+    # Track which segments is being subdivided
+    subdivide_mask = np.zeros(num_segments, dtype=bool)
+
+    # 3. find the t-values equivalent to our target x-location, might match multiple segments
+    for i in range(num_segments):
+        sampled_pts_x, sampled_ts = points_per_segment[i][:, 0], t_values_per_segment[i]
+
+        # if we have no points or t-values, skip this segment
+        if ((sampled_pts_x.size==0) or (sampled_ts.size==0)):
+            continue
+
+        # if we have no points or t-values, skip this segment
+        min_x, max_x = np.min(sampled_pts_x), np.max(sampled_pts_x)
+        if (xlocation < min_x) or (xlocation > max_x):
+            continue
+
+        # find the t-value equivalent to our target x-location
+        idx = np.argmin(np.abs(sampled_pts_x - xlocation))
+        estimated_t = sampled_ts[idx]
+
+        # mark for subdivision
+        if (tolerance < estimated_t < (1.0 - tolerance)):
+            t_map[i] = estimated_t
+            subdivide_mask[i] = True
+        continue
+
+    # 4. Call the batch subdivision function
+    # Use the t_map where subdivision is needed, otherwise t=0 (no split)
+    segments = casteljau_subdiv_bezsegs(segments, t_map, tolerance=tolerance)
+
+    # 5. Adjust x-coordinate of the new anchor points
+    # Ensure we modify a float array copy
+    segments = segments.astype(float, copy=True)
+    output_idx = 0
+    for i in range(num_segments):
+        if subdivide_mask[i]: # Check if this original segment *was* actually split
+            # Adjust P3x of first child segment
+            segments[output_idx, 6] = xlocation
+            # Adjust P0x of second child segment
+            segments[output_idx + 1, 0] = xlocation
+            # Move output index past the two children
+            output_idx += 2
+            continue
+        # Move output index past the single original segment
+        output_idx += 1
+        continue
+
+    return segments
+
+
+def get_bezsegs_length(segments:np.ndarray, sampling_rate:int=100) -> np.ndarray:
+    """Compute the length of each cubic Bézier curve segment.
+    We do that by sampling the curve and measuring the accumulated length between each point.
+    Args:
+        segments (np.ndarray): Array of shape (N, 8) where each row is [P0x, P0y, P1x, P1y, P2x, P2y, P3x, P3y].
+        sampling_rate (int): Number of sample points for the integration.
+    Returns:
+        np.ndarray: Array of shape (N,) where each element is the length of the corresponding segment.
+        float: The total length of the curve.
+    """
+    points_per_segment, _ = sample_bezsegs_with_t(segments, sampling_rate)
+    lengths = []
+    for pts in points_per_segment:
+        # Compute differences between consecutive sample points
+        diffs = np.diff(pts, axis=0)
+        # Euclidean distances for each subinterval
+        seg_len = np.linalg.norm(diffs, axis=1).sum()
+        lengths.append(seg_len)
+        continue
+    return np.array(lengths), np.sum(lengths)
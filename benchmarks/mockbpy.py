@@ -0,0 +1,562 @@
+# SPDX-FileCopyrightText: 2025 Natalie Cuthbert <natalie@cuthbert.co.za>
+#
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+
+# NOTE a lightweight stand-in for the bpy & mathutils modules, so node_utils and handlers can be profiled outside of blender.
+# - only the part of the object model the plugin hot paths rely on is implemented:
+#   bpy.data.node_groups, nodes, links, sockets, ng.interface, bpy.app.timers/handlers, bpy.msgbus & bpy.context.
+# - the behavior is simplified (no socket availability, no real update system, parenting doesn't offset locations..)
+#   it is meant to measure how our python code scales, not to validate its correctness against blender.
+# Usage:
+#   import mockbpy
+#   bpy = mockbpy.install()            # register the 'bpy' & 'mathutils' fake modules
+#   plugin = mockbpy.load_plugin()     # import the plugin package by path, as 'rig_nodes'
+#   from rig_nodes.utils import node_utils
+
+
+import os
+import sys
+import types
+import importlib.util
+from itertools import count
+
+
+PLUGIN_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+
+#   .oooooo.   ooo        ooooo           mathutils
+#  d8P'  `Y8b  `88.       .888'
+# 888      888  888b     d'888
+# 888      888  8 Y88. .P  888
+# 888      888  8  `888'   888
+# `88b    d88'  8    Y     888
+#  `Y8bood8P'  o8o        o888o
+
+
+class Vector:
+    """minimal mathutils.Vector"""
+
+    __slots__ = ("_v",)
+
+    def __init__(self, seq=(0.0, 0.0)):
+        self._v = [float(v) for v in seq]
+
+    def __len__(self): return len(self._v)
+    def __iter__(self): return iter(self._v)
+    def __getitem__(self, i): return self._v[i]
+    def __setitem__(self, i, v): self._v[i] = float(v)
+    def __eq__(self, other): return list(self) == list(other)
+    def __repr__(self): return f"Vector({tuple(self._v)})"
+    def __add__(self, other): return Vector(a + b for a, b in zip(self._v, other))
+    def __sub__(self, other): return Vector(a - b for a, b in zip(self._v, other))
+    def __mul__(self, f): return Vector(a * f for a in self._v)
+    def copy(self): return Vector(self._v)
+
+    x = property(lambda s: s._v[0], lambda s, v: s.__setitem__(0, v))
+    y = property(lambda s: s._v[1], lambda s, v: s.__setitem__(1, v))
+    z = property(lambda s: s._v[2], lambda s, v: s.__setitem__(2, v))
+
+
+class Quaternion(Vector):
+    """minimal mathutils.Quaternion"""
+
+    __slots__ = ()
+
+    def __init__(self, seq=(1.0, 0.0, 0.0, 0.0)):
+        super().__init__(seq)
+
+
+class Matrix:
+    """minimal mathutils.Matrix, rows of floats"""
+
+    __slots__ = ("rows",)
+
+    def __init__(self, rows=((1, 0, 0, 0), (0, 1, 0, 0), (0, 0, 1, 0), (0, 0, 0, 1))):
+        self.rows = [[float(v) for v in r] for r in rows]
+
+    def __len__(self): return len(self.rows)
+    def __iter__(self): return iter(self.rows)
+    def __getitem__(self, i): return self.rows[i]
+
+
+# ooooooooo.   ooooo      ooo       .o.                bpy.types
+# `888   `Y88. `888b.     `8'      .888.
+#  888   .d88'  8 `88b.    8      .8"888.
+#  888ooo88P'   8   `88b.  8     .8' `888.
+#  888`88b.     8     `88b.8    .88ooo8888.
+#  888  `88b.   8       `888   .8'     `888.
+# o888o  o888o o8o        `8  o88o     o8888o
+
+
+SESSION_UIDS = count(1)
+
+# {socket_type: (socket.type, default_value)}
+SOCKET_TYPES = {
+    "NodeSocketFloat": ("VALUE", 0.0),
+    "NodeSocketInt": ("INT", 0),
+    "NodeSocketBool": ("BOOLEAN", False),
+    "NodeSocketVector": ("VECTOR", (0.0, 0.0, 0.0)),
+    "NodeSocketColor": ("RGBA", (0.0, 0.0, 0.0, 1.0)),
+    "NodeSocketRotation": ("ROTATION", None),
+    "NodeSocketMatrix": ("MATRIX", None),
+    "NodeSocketString": ("STRING", ""),
+    "NodeSocketGeometry": ("GEOMETRY", None),
+    "NodeSocketObject": ("OBJECT", None),
+}
+
+# {node bl_idname: (node.type, inputs socket types, outputs socket types)}
+NODE_TYPES = {
+    "NodeReroute": ("REROUTE", ("NodeSocketColor",), ("NodeSocketColor",)),
+    "NodeFrame": ("FRAME", (), ()),
+    "NodeGroupInput": ("GROUP_INPUT", (), ()),
+    "NodeGroupOutput": ("GROUP_OUTPUT", (), ()),
+    "GeometryNodeGroup": ("GROUP", (), ()),
+    "ShaderNodeMath": ("MATH", ("NodeSocketFloat", "NodeSocketFloat"), ("NodeSocketFloat",)),
+    "ShaderNodeValue": ("VALUE", (), ("NodeSocketFloat",)),
+    "FunctionNodeInputVector": ("INPUT_VECTOR", (), ("NodeSocketVector",)),
+    "FunctionNodeQuaternionToRotation": ("QUATERNION_TO_ROTATION", ("NodeSocketFloat",) * 4, ("NodeSocketRotation",)),
+    "FunctionNodeCombineMatrix": ("COMBINE_MATRIX", ("NodeSocketFloat",) * 16, ("NodeSocketMatrix",)),
+}
+
+
+class ID:
+    """minimal bpy.types.ID"""
+
+    def __init__(self, name):
+        self.name = name
+        self.session_uid = next(SESSION_UIDS)
+        self.users = 0
+        self.use_fake_user = False
+
+    def __repr__(self):
+        return f"<{type(self).__name__} '{self.name}'>"
+
+
+class NodeLink:
+    """minimal bpy.types.NodeLink"""
+
+    __slots__ = ("from_socket", "to_socket", "is_muted", "is_valid")
+
+    def __init__(self, from_socket, to_socket):
+        self.from_socket, self.to_socket = from_socket, to_socket
+        self.is_muted, self.is_valid = False, True
+
+    from_node = property(lambda s: s.from_socket.node)
+    to_node = property(lambda s: s.to_socket.node)
+
+
+class NodeSocket:
+    """minimal bpy.types.NodeSocket"""
+
+    def __init__(self, node, name, identifier, socket_type, is_output):
+        self.node, self.name, self.identifier, self.is_output = node, name, identifier, is_output
+        self.bl_idname = socket_type
+        self.type, self.default_value = SOCKET_TYPES.get(socket_type, ("CUSTOM", None))
+        self.is_multi_input = False
+        self.enabled = True
+        self._links = []
+
+    def __repr__(self):
+        return f"<NodeSocket '{self.node.name}'.{'outputs' if self.is_output else 'inputs'}['{self.name}']>"
+
+    id_data = property(lambda s: s.node.id_data)
+    links = property(lambda s: tuple(s._links))
+    is_linked = property(lambda s: bool(s._links))
+
+
+class NodeSockets:
+    """minimal bpy_prop_collection of sockets"""
+
+    def __init__(self, node, is_output):
+        self.node, self.is_output = node, is_output
+        self._items = []
+
+    def __len__(self): return len(self._items)
+    def __iter__(self): return iter(self._items)
+
+    def __getitem__(self, key):
+        if isinstance(key, (int, slice)):
+            return self._items[key]
+        for s in self._items:
+            if (s.name == key) or (s.identifier == key):
+                return s
+        raise KeyError(key)
+
+    def get(self, key, default=None):
+        try: return self[key]
+        except KeyError: return default
+
+    def new(self, socket_type, name, identifier=None):
+        s = NodeSocket(self.node, name, identifier or name, socket_type, self.is_output)
+        self._items.append(s)
+        return s
+
+    def remove(self, socket):
+        for l in socket.links:
+            self.node.id_data.links.remove(l)
+        self._items.remove(socket)
+
+
+class Node:
+    """minimal bpy.types.Node. Register subclasses with bpy.utils.register_class() to make them available to nodes.new()"""
+
+    bl_idname = "ShaderNodeMath"
+
+    def __init__(self, tree, name, bl_idname=None):
+        if (bl_idname is not None):
+            self.bl_idname = bl_idname
+        self.id_data = tree
+        self._name = self.label = name
+        self._location = Vector((0.0, 0.0))
+        self.width, self.height = 140.0, 100.0
+        self.parent = None
+        self.mute = self.select = self.hide = False
+        self.inputs, self.outputs = NodeSockets(self, False), NodeSockets(self, True)
+
+        nodetype, ins, outs = NODE_TYPES.get(self.bl_idname, ("CUSTOM", (), ()))
+        self.type = nodetype
+        for i, t in enumerate(ins):
+            self.inputs.new(t, "Input" if (len(ins) == 1) else f"Input_{i}")
+        for i, t in enumerate(outs):
+            self.outputs.new(t, "Output" if (len(outs) == 1) else f"Output_{i}")
+        self.init(None)
+
+    def init(self, context):
+        pass
+
+    def __repr__(self):
+        return f"<Node '{self.name}' {self.bl_idname}>"
+
+    location = property(lambda s: s._location, lambda s, v: setattr(s, "_location", Vector(v)))
+    name = property(lambda s: s._name, lambda s, v: s.id_data.nodes._rename(s, v))
+    dimensions = property(lambda s: Vector((s.width, s.height)))
+
+    @property
+    def internal_links(self):
+        if (self.inputs._items and self.outputs._items):
+            return (NodeLink(self.inputs[0], self.outputs[0]),)
+        return ()
+
+
+class NodeGroupNode(Node):
+    """minimal GeometryNodeGroup, its sockets mirror the interface of its node_tree"""
+
+    bl_idname = "GeometryNodeGroup"
+
+    def __init__(self, tree, name, bl_idname=None):
+        self._node_tree = None
+        super().__init__(tree, name, bl_idname)
+
+    @property
+    def node_tree(self):
+        return self._node_tree
+
+    @node_tree.setter
+    def node_tree(self, ng):
+        if (self._node_tree is not None):
+            self._node_tree.users -= 1
+            self._node_tree._instances.discard(self)
+        self._node_tree = ng
+        self.inputs._items.clear()
+        self.outputs._items.clear()
+        if (ng is not None):
+            ng.users += 1
+            ng._instances.add(self)
+            for itm in ng.interface.items_tree:
+                sockets = self.outputs if (itm.in_out == 'OUTPUT') else self.inputs
+                sockets.new(itm.socket_type, itm.name, itm.identifier)
+
+
+class Nodes:
+    """minimal bpy.types.Nodes"""
+
+    def __init__(self, tree):
+        self.tree = tree
+        self._items = {}
+        self._names = count(1)
+
+    def __len__(self): return len(self._items)
+    def __iter__(self): return iter(list(self._items.values()))
+    def __getitem__(self, key):
+        if isinstance(key, (int, slice)):
+            return list(self._items.values())[key]
+        return self._items[key]
+
+    def get(self, key, default=None):
+        return self._items.get(key, default)
+
+    def new(self, bl_idname):
+        cls = REGISTERED_NODES.get(bl_idname, NodeGroupNode if (bl_idname == "GeometryNodeGroup") else Node)
+        name = f"{bl_idname}.{next(self._names):03}"
+        node = cls(self.tree, name, bl_idname)
+        self._items[name] = node
+        return node
+
+    def _rename(self, node, name):
+        if (self._items.get(node._name) is node):
+            del self._items[node._name]
+        node._name = name
+        self._items[name] = node
+
+    def remove(self, node):
+        for s in (*node.inputs, *node.outputs):
+            for l in s.links:
+                self.tree.links.remove(l)
+        if isinstance(node, NodeGroupNode):
+            node.node_tree = None
+        del self._items[node.name]
+
+
+class NodeLinks:
+    """minimal bpy.types.NodeLinks"""
+
+    def __init__(self, tree):
+        self.tree = tree
+        self._items = []
+
+    def __len__(self): return len(self._items)
+    def __iter__(self): return iter(list(self._items))
+
+    def new(self, from_socket, to_socket):
+        if (not to_socket.is_multi_input):
+            for l in to_socket.links:
+                self.remove(l)
+        link = NodeLink(from_socket, to_socket)
+        from_socket._links.append(link)
+        to_socket._links.append(link)
+        self._items.append(link)
+        return link
+
+    def remove(self, link):
+        link.from_socket._links.remove(link)
+        link.to_socket._links.remove(link)
+        self._items.remove(link)
+        link.is_valid = False
+
+
+class NodeTreeInterfaceSocket:
+    """minimal bpy.types.NodeTreeInterfaceSocket"""
+
+    def __init__(self, name, in_out, socket_type, identifier):
+        self.name, self.in_out, self.socket_type, self.identifier = name, in_out, socket_type, identifier
+        self.description = ""
+        self.item_type = "SOCKET"
+
+
+class NodeTreeInterface:
+    """minimal bpy.types.NodeTreeInterface, new sockets are mirrored on the group in/out nodes & group instances"""
+
+    def __init__(self, tree):
+        self.tree = tree
+        self.items_tree = []
+        self._identifiers = count(1)
+
+    def _mirrors(self, in_out):
+        for n in self.tree.nodes:
+            if (n.bl_idname == "NodeGroupOutput") and (in_out == 'OUTPUT'):
+                yield n.inputs
+            elif (n.bl_idname == "NodeGroupInput") and (in_out == 'INPUT'):
+                yield n.outputs
+        for n in self.tree._instances:
+            yield n.outputs if (in_out == 'OUTPUT') else n.inputs
+
+    def new_socket(self, name, in_out='INPUT', socket_type="NodeSocketFloat"):
+        itm = NodeTreeInterfaceSocket(name, in_out, socket_type, f"Socket_{next(self._identifiers)}")
+        self.items_tree.append(itm)
+        for sockets in self._mirrors(in_out):
+            sockets.new(socket_type, name, itm.identifier)
+        return itm
+
+    def remove(self, itm):
+        self.items_tree.remove(itm)
+        for sockets in self._mirrors(itm.in_out):
+            s = sockets.get(itm.identifier)
+            if (s is not None):
+                sockets.remove(s)
+
+
+class NodeTree(ID):
+    """minimal bpy.types.GeometryNodeTree"""
+
+    def __init__(self, name, bl_idname="GeometryNodeTree"):
+        super().__init__(name)
+        self.bl_idname = bl_idname
+        self.type = 'GEOMETRY'
+        self._instances = set()
+        self.nodes, self.links = Nodes(self), NodeLinks(self)
+        self.interface = NodeTreeInterface(self)
+        self.update_tags = 0
+
+    def update_tag(self):
+        self.update_tags += 1
+
+
+class IDCollection:
+    """minimal bpy_prop_collection of ID, such as bpy.data.node_groups"""
+
+    def __init__(self, idtype=ID):
+        self.idtype = idtype
+        self._items = {}
+
+    def __len__(self): return len(self._items)
+    def __iter__(self): return iter(list(self._items.values()))
+    def __getitem__(self, key): return self._items[key]
+    def get(self, key, default=None): return self._items.get(key, default)
+
+    def new(self, name, type=None):
+        base, i = name, 0
+        while (name in self._items):
+            i += 1
+            name = f"{base}.{i:03}"
+        item = self.idtype(name, type) if (type is not None) else self.idtype(name)
+        self._items[name] = item
+        return item
+
+    def remove(self, item):
+        del self._items[item.name]
+
+    def clear(self):
+        self._items.clear()
+
+
+# oooooooooo.  ooooooooo.   oooooo   oooo                bpy
+# `888'   `Y8b `888   `Y88.  `888.   .8'
+#  888     888  888   .d88'   `888. .8'
+#  888oooo888'  888ooo88P'     `888.8'
+#  888    `88b  888             `888'
+#  888    .88P  888              888
+# o888bood8P'  o888o            o888o
+
+
+REGISTERED_NODES = {}
+
+
+class Timers:
+    """minimal bpy.app.timers. Nothing runs on its own, call run_timers() to simulate a tick"""
+
+    def __init__(self):
+        self.functions = {}
+
+    def register(self, function, first_interval=0.0, persistent=False):
+        self.functions[function] = first_interval
+
+    def unregister(self, function):
+        del self.functions[function]
+
+    def is_registered(self, function):
+        return function in self.functions
+
+
+class Handlers:
+    """minimal bpy.app.handlers"""
+
+    names = ("depsgraph_update_post", "frame_change_pre", "load_post", "undo_post", "redo_post")
+
+    def __init__(self):
+        for name in self.names:
+            setattr(self, name, [])
+
+    def __iter__(self):
+        return iter([getattr(self, name) for name in self.names])
+
+    @staticmethod
+    def persistent(function):
+        return function
+
+
+class MsgBus:
+    """minimal bpy.msgbus, subscriptions are stored as {owner: [(key, args, notify),]}"""
+
+    def __init__(self):
+        self.subscriptions = {}
+
+    def subscribe_rna(self, key=None, owner=None, args=(), notify=None, options=set()):
+        self.subscriptions.setdefault(owner, []).append((key, args, notify))
+
+    def clear_by_owner(self, owner):
+        self.subscriptions.pop(owner, None)
+
+
+def run_timers() -> int:
+    """simulate a tick of the blender timers, return the number of functions called"""
+
+    timers = sys.modules["bpy"].app.timers
+    functions = list(timers.functions)
+    for function in functions:
+        del timers.functions[function]
+        interval = function()
+        if (interval is not None):
+            timers.functions[function] = interval
+        continue
+
+    return len(functions)
+
+
+def reset() -> None:
+    """clear the fake blend data and app states, as if loading a new empty file"""
+
+    bpy = sys.modules["bpy"]
+    bpy.data.node_groups.clear()
+    bpy.data.objects.clear()
+    bpy.app.timers.functions.clear()
+    bpy.msgbus.subscriptions.clear()
+    return None
+
+
+def install():
+    """register the fake 'bpy' & 'mathutils' modules in sys.modules, return the bpy module"""
+
+    if ("bpy" in sys.modules):
+        return sys.modules["bpy"]
+
+    mathutils = types.ModuleType("mathutils")
+    mathutils.Vector, mathutils.Matrix, mathutils.Quaternion = Vector, Matrix, Quaternion
+
+    bpy = types.ModuleType("bpy")
+    bpy.data = types.SimpleNamespace(
+        node_groups=IDCollection(NodeTree),
+        objects=IDCollection(),
+        libraries=IDCollection(),
+    )
+    bpy.app = types.SimpleNamespace(
+        timers=Timers(),
+        handlers=Handlers(),
+        version=(4, 4, 0),
+    )
+    bpy.msgbus = MsgBus()
+    bpy.context = types.SimpleNamespace(
+        preferences=types.SimpleNamespace(system=types.SimpleNamespace(dpi=72), addons={}),
+        window_manager=types.SimpleNamespace(
+            windows=[],
+            rig_nodes=types.SimpleNamespace(authorize_automatic_execution=True, minimap_modal_operator_is_active=False),
+        ),
+    )
+    bpy.types = types.SimpleNamespace(
+        ID=ID, Node=Node, NodeSocket=NodeSocket, NodeLink=NodeLink, NodeTree=NodeTree,
+        GeometryNodeTree=NodeTree, NodeCustomGroup=NodeGroupNode, Scene=type("Scene", (ID,), {}),
+    )
+    bpy.utils = types.SimpleNamespace(
+        register_class=lambda cls: REGISTERED_NODES.__setitem__(cls.bl_idname, cls),
+        unregister_class=lambda cls: REGISTERED_NODES.pop(cls.bl_idname, None),
+    )
+
+    sys.modules["mathutils"] = mathutils
+    sys.modules["bpy"] = bpy
+    return bpy
+
+
+def load_plugin(name:str="rig_nodes"):
+    """import the plugin package by path under the given name, bpy must be installed first.
+    The plugin is not registered, its submodules can be imported, ex: 'from rig_nodes.utils import node_utils'"""
+
+    if (name in sys.modules):
+        return sys.modules[name]
+
+    spec = importlib.util.spec_from_file_location(
+        name, os.path.join(PLUGIN_DIR, "__init__.py"), submodule_search_locations=[PLUGIN_DIR],
+    )
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    spec.loader.exec_module(module)
+    return module
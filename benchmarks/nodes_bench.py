@@ -0,0 +1,365 @@
+# SPDX-FileCopyrightText: 2025 Natalie Cuthbert <natalie@cuthbert.co.za>
+#
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+
+# NOTE headless benchmarks of utils/node_utils.py & the handlers dispatch, running on the mockbpy stand-in.
+# The mock is much simpler than blender, absolute timings are not representative, look at how they scale.
+# Usage, from the plugin folder:
+#   python benchmarks/nodes_bench.py                    run & compare with the json baseline, exit 1 on regression.
+#   python benchmarks/nodes_bench.py --save             run & overwrite the json baseline.
+#   python benchmarks/nodes_bench.py --sizes 1000 10000 only run the given sizes.
+
+
+import os
+import sys
+import json
+import argparse
+import platform
+
+import mockbpy
+from bezier2d_bench import measure, compare
+
+bpy = mockbpy.install()
+mockbpy.load_plugin("rig_nodes")
+
+from rig_nodes import handlers
+from rig_nodes.utils import node_utils
+
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+BASELINE_PATH = os.path.join(BENCH_DIR, "nodes_baseline.json")
+SIZES = (1_000, 10_000, 100_000)
+SOCKETS_SIZES = (10, 100, 1_000)
+NODES_PER_TREE = 1_000
+
+
+class BenchDepsNode(mockbpy.Node):
+    """synthetic custom node updated on depsgraph changes"""
+
+    bl_idname = "RigNodesBenchDepsNode"
+    auto_update = {'DEPS_POST'}
+
+    def init(self, context):
+        self.inputs.new("NodeSocketFloat", "Value")
+        self.outputs.new("NodeSocketFloat", "Result")
+
+    def update_all(self, signal_from_handlers=False, using_nodes=None):
+        node_utils.set_socket_defvalue(self.outputs[0], self.inputs[0].default_value * 2.0)
+
+
+class BenchFrameNode(BenchDepsNode):
+    """synthetic custom node updated on frame changes, supporting the frame cache"""
+
+    bl_idname = "RigNodesBenchFrameNode"
+    auto_update = {'FRAME_PRE'}
+
+    def update_all(self, signal_from_handlers=False, using_nodes=None):
+        value = self.inputs[0].default_value
+        for _ in range(50):
+            value = (value * 1.0001) % 1000.0
+        node_utils.set_socket_defvalue(self.outputs[0], value)
+
+    def frame_cache_fingerprint(self):
+        return (self.inputs[0].default_value,)
+
+    def frame_cache_store(self):
+        return self.outputs[0].default_value
+
+    def frame_cache_restore(self, data):
+        node_utils.set_socket_defvalue(self.outputs[0], data)
+
+
+BENCH_NODES = (BenchDepsNode, BenchFrameNode)
+for cls in BENCH_NODES:
+    bpy.utils.register_class(cls)
+handlers.DEPSPOST_UPD_NODES.append(BenchDepsNode)
+handlers.FRAMEPRE_UPD_NODES.append(BenchFrameNode)
+
+
+def reset() -> None:
+    """start from an empty file, with empty caches"""
+
+    mockbpy.reset()
+    node_utils.clear_ng_interface_cache()
+    node_utils.clear_ng_instances_index()
+    node_utils.clear_ng_constants_registry()
+    handlers.clear_frame_cache()
+    return None
+
+
+def new_group_tree(name:str):
+    """create a nodetree with its group input & output nodes"""
+
+    ng = bpy.data.node_groups.new(name, "GeometryNodeTree")
+    in_nod, out_nod = ng.nodes.new("NodeGroupInput"), ng.nodes.new("NodeGroupOutput")
+    in_nod.name, out_nod.name = "Group Input", "Group Output"
+    out_nod.location.x = 400
+    return ng
+
+
+def make_tree(name:str, num_nodes:int, custom_ratio:float=0.05, frame_every:int=50):
+    """create a nodetree of num_nodes nodes on a grid: math nodes chains, reroutes, frames & custom nodes"""
+
+    ng = new_group_tree(name)
+    custom_every = max(1, int(1 / custom_ratio)) if custom_ratio else 0
+    frame, previous = None, None
+
+    for i in range(num_nodes - 2):
+
+        if (frame_every and (i % frame_every == 0)):
+            frame = ng.nodes.new("NodeFrame")
+            frame.location = ((i // frame_every) * 300.0, 0.0)
+            frame.width, frame.height = 300.0, 200.0 * frame_every
+            previous = None
+            continue
+
+        if custom_every and (i % custom_every == 0):
+            bl_idname = BENCH_NODES[(i // custom_every) % 2].bl_idname
+        elif (i % 7 == 0):
+            bl_idname = "NodeReroute"
+        else:
+            bl_idname = "ShaderNodeMath"
+
+        node = ng.nodes.new(bl_idname)
+        node.location = (0.0, -(i % frame_every) * 200.0) if frame else ((i % 100) * 200.0, -(i // 100) * 200.0)
+        node.parent = frame
+        if node.inputs:
+            node.inputs[0].default_value = float(i) if (node.inputs[0].type == 'VALUE') else node.inputs[0].default_value
+        if (previous is not None) and previous.outputs and node.inputs:
+            ng.links.new(previous.outputs[0], node.inputs[0])
+        previous = node
+        continue
+
+    return ng
+
+
+def make_trees(total_nodes:int):
+    """create as many nodetrees of NODES_PER_TREE nodes as needed to reach total_nodes"""
+
+    return [make_tree(f"Tree{i}", min(NODES_PER_TREE, total_nodes - i * NODES_PER_TREE))
+            for i in range(-(-total_nodes // NODES_PER_TREE))]
+
+
+def make_reroutes_chain(num_nodes:int):
+    """create a single nodetree where a math node is fed by a long chain of reroutes, return the math node"""
+
+    ng = new_group_tree("Chain")
+    previous = ng.nodes.new("ShaderNodeValue")
+    for i in range(num_nodes):
+        reroute = ng.nodes.new("NodeReroute")
+        ng.links.new(previous.outputs[0], reroute.inputs[0])
+        previous = reroute
+        continue
+
+    math = ng.nodes.new("ShaderNodeMath")
+    ng.links.new(previous.outputs[0], math.inputs[0])
+    return math
+
+
+def make_sockets_group(num_sockets:int, num_instances:int=10):
+    """create a nodegroup with num_sockets inputs & outputs of mixed types, used by num_instances group nodes"""
+
+    ng = new_group_tree("Sockets")
+    types = ("NodeSocketFloat", "NodeSocketInt", "NodeSocketVector", "NodeSocketBool")
+    with node_utils.interface_batch(ng) as batch:
+        for i in range(num_sockets):
+            batch.new_socket(f"In{i}", 'INPUT', types[i % len(types)])
+            batch.new_socket(f"Out{i}", 'OUTPUT', types[i % len(types)])
+            continue
+
+    host = new_group_tree("Host")
+    for i in range(num_instances):
+        node = host.nodes.new("GeometryNodeGroup")
+        node.node_tree = ng
+        continue
+
+    return ng
+
+
+def get_socket_values(ng, in_out:str, offset:float) -> dict:
+    """get {identifier: value} for all the sockets of a nodegroup"""
+
+    values = {}
+    items = node_utils.get_ng_interface_items(ng, node_utils.get_ng_interface_map(ng, in_out=in_out), in_out=in_out)
+    for identifier, (idx, sockui, socket) in items.items():
+        match socket.type:
+            case 'VALUE': values[identifier] = idx + offset
+            case 'INT': values[identifier] = idx + int(offset)
+            case 'BOOLEAN': values[identifier] = bool(int(offset) % 2)
+            case 'VECTOR': values[identifier] = (idx, offset, 0.0)
+        continue
+
+    return values
+
+
+def toggling(fct, *args):
+    """call fct alternating between two sets of args, so every call writes new values"""
+
+    state = [0]
+    def call():
+        state[0] ^= 1
+        return fct(*args[state[0]])
+    return call
+
+
+# .oooooo..o                                                          o8o
+# d8P'    `Y8                                                          `"'
+# Y88bo.       .ooooo.   .ooooo.  ooo. .oo.    .oooo.   oooo d8b     oooo   .ooooo.   .oooo.o
+#  `"Y8888o.  d88' `"Y8 d88' `88b `888P"Y88b  `P  )88b  `888""8P     `888  d88' `88b d88(  "8
+#      `"Y88b 888       888ooo888  888   888   .oP"888   888          888  888   888 `"Y88b.
+# oo     .d8P 888   .o8 888    .o  888   888  d8(  888   888          888  888   888 o.  )88b
+# 8""88888P'  `Y8bod8P' `Y8bod8P' o888o o888o `Y888""8o d888b        o888o `Y8bod8P' 8""888P'
+
+
+def setup_get_all_nodes(n):
+    make_trees(n)
+    return lambda: node_utils.get_all_nodes()
+
+
+def setup_get_all_nodes_exact(n):
+    make_trees(n)
+    idnames = {cls.bl_idname for cls in BENCH_NODES}
+    return lambda: node_utils.get_all_nodes(exactmatch_idnames=idnames)
+
+
+def setup_socket_intersections(n):
+    math = make_reroutes_chain(n)
+    return lambda: node_utils.socket_intersections(math.inputs[0], direction='LEFT')
+
+
+def setup_nearest_node(n):
+    ng = make_tree("Tree", n)
+    nodes = ng.nodes[:]
+    return lambda: node_utils.get_nearest_node_at_position(nodes, None, None, position=(1000.0, -1000.0))
+
+
+def setup_set_ng_socket_defvalue(n):
+    ng = make_sockets_group(n)
+    values = [get_socket_values(ng, 'OUTPUT', offset) for offset in (0.0, 1.0)]
+    indices = node_utils.get_ng_interface_map(ng, in_out='OUTPUT')
+    def setall(values):
+        for identifier, value in values.items():
+            node_utils.set_ng_socket_defvalue(ng, idx=indices[identifier][0], value=value)
+    return toggling(setall, (values[0],), (values[1],))
+
+
+def setup_set_ng_socket_defvalues(n):
+    ng = make_sockets_group(n)
+    values = [get_socket_values(ng, 'OUTPUT', offset) for offset in (0.0, 1.0)]
+    return toggling(node_utils.set_ng_socket_defvalues, (ng, values[0]), (ng, values[1]))
+
+
+def setup_set_ng_instances_defvalues(n):
+    ng = make_sockets_group(n)
+    values = [get_socket_values(ng, 'INPUT', offset) for offset in (0.0, 1.0)]
+    return toggling(node_utils.set_ng_instances_defvalues, (ng, values[0]), (ng, values[1]))
+
+
+def setup_handler_depspost(n):
+    make_trees(n)
+    return lambda: handlers.rig_nodes_handler_depspost(None, None)
+
+
+def setup_handler_framepre(n):
+    make_trees(n)
+    scene = bpy.types.Scene("Scene")
+    scene.frame_current = 0
+    def call():
+        # scrubbing over 10 frames, the frame cache is warm after the first loop
+        scene.frame_current = (scene.frame_current + 1) % 10
+        scene.frame_current_final = float(scene.frame_current)
+        return handlers.rig_nodes_handler_framepre(scene, None)
+    return call
+
+
+def setup_refresh_signals(n):
+    trees = make_trees(n)
+    sockets = [n.outputs[0] for ng in trees for n in ng.nodes if (n.outputs and n.outputs[0].links)]
+    def call():
+        with node_utils.refresh_batch():
+            for s in sockets:
+                node_utils.send_refresh_signal(s)
+    return call
+
+
+# {name: (sizes, setup(size) -> callable)}
+CASES = {
+    "get_all_nodes": (SIZES, setup_get_all_nodes),
+    "get_all_nodes_exact": (SIZES, setup_get_all_nodes_exact),
+    "socket_intersections": (SIZES, setup_socket_intersections),
+    "nearest_node": (SIZES, setup_nearest_node),
+    "set_ng_socket_defvalue": (SOCKETS_SIZES, setup_set_ng_socket_defvalue),
+    "set_ng_socket_defvalues": (SOCKETS_SIZES, setup_set_ng_socket_defvalues),
+    "set_ng_instances_defvalues": (SOCKETS_SIZES, setup_set_ng_instances_defvalues),
+    "handler_depspost": (SIZES, setup_handler_depspost),
+    "handler_framepre": (SIZES, setup_handler_framepre),
+    "refresh_signals": (SIZES, setup_refresh_signals),
+}
+
+
+def run(only:list=None, sizes:list=None, min_time:float=0.05, repeat:int=5) -> dict:
+    """run all benchmarks cases, return {"case[size]": milliseconds}"""
+
+    results = {}
+    for name, (casesizes, setup) in CASES.items():
+        if (only and (name not in only)):
+            continue
+        for n in casesizes:
+            if (sizes and (n not in sizes)):
+                continue
+            reset()
+            key = f"{name}[{n}]"
+            results[key] = measure(setup(n), min_time=min_time, repeat=repeat)
+            print(f"  {key:<40} {results[key]:>12.4f}ms")
+            continue
+        continue
+
+    reset()
+    return results
+
+
+def main(argv=None) -> int:
+
+    parser = argparse.ArgumentParser(description="node_utils & handlers benchmarks on a mock bpy")
+    parser.add_argument("--save", action="store_true", help="overwrite the json baseline with this run results")
+    parser.add_argument("--baseline", default=BASELINE_PATH, help="path of the json baseline")
+    parser.add_argument("--threshold", type=float, default=0.25, help="relative slowdown tolerated, 0.25 = 25%%")
+    parser.add_argument("--only", nargs="*", help="only run the given cases names")
+    parser.add_argument("--sizes", nargs="*", type=int, help="only run the given sizes")
+    parser.add_argument("--min-time", type=float, default=0.05, help="minimal time in seconds per measure")
+    args = parser.parse_args(argv)
+
+    print("node_utils & handlers benchmarks (mock bpy):")
+    results = run(only=args.only, sizes=args.sizes, min_time=args.min_time)
+
+    if (args.save):
+        data = {
+            "machine": {"python": platform.python_version(), "platform": platform.platform()},
+            "results": results,
+            }
+        with open(args.baseline, "w") as f:
+            json.dump(data, f, indent=2)
+        print(f"baseline written to '{args.baseline}'")
+        return 0
+
+    if (not os.path.exists(args.baseline)):
+        print(f"no baseline found at '{args.baseline}', run with --save first.")
+        return 0
+
+    with open(args.baseline) as f:
+        baseline = json.load(f)["results"]
+
+    regressions = compare(results, baseline, args.threshold)
+    if (not regressions):
+        print(f"OK: no regression above {args.threshold:.0%}.")
+        return 0
+
+    print(f"FAILED: {len(regressions)} regression(s) above {args.threshold:.0%}:")
+    for key, ref, ms, ratio in regressions:
+        print(f"  {key:<40} {ref:>10.4f}ms -> {ms:>10.4f}ms  (x{ratio:.2f})")
+    return 1
+
+
+if (__name__ == "__main__"):
+    sys.exit(main())
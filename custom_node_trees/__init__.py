@@ -2,7 +2,7 @@
 # SPDX-FileCopyrightText: 2025 BD3D DIGITAL DESIGN (Dorian B.)
 # SPDX-License-Identifier: GPL-3.0-or-later
 
-from ..__init__ import get_addon_prefs, dprint
+from .. import get_addon_prefs, dprint
 from .rig_node import RigNodeTree
 
 classes = (
@@ -3,16 +3,136 @@
 # SPDX-License-Identifier: GPL-3.0-or-later
 
 import bpy
-from ..__init__ import get_addon_prefs, dprint
+from .. import PrefsSnapshot, dprint, register_report
 from ..custom_nodes import allcustomnodes
+from ..utils.node_utils import (
+    get_all_nodes,
+    clear_ng_interface_cache,
+    clear_ng_instances_index,
+    clear_ng_constants_registry,
+    refresh_batch,
+)
+from ..utils.prof_utils import profiled, profiled_function
+from ..utils.expr_utils import clear_expressions_cache
 from collections.abc import Iterable
+from collections import OrderedDict
+
+
+MSGBUS_OWNER = object()
+MSGBUS_NODES_OWNER = object()
+
+# NOTE custom nodes can subscribe to the RNA data they depend on, instead of being polled on each depsgraph update.
+# - the node class need a 'MSGBUS' keyword in its 'auto_update' set.
+# - the node need a 'msgbus_keys()' method, returning the list of keys it depends on, as accepted
+#   by bpy.msgbus.subscribe_rna(). ex: [obj.path_resolve("location", False), (bpy.types.Scene, "frame_start")]
+# - if the node dependencies change (ex: another object is picked), call refresh_node_subscriptions().
+# - the existing nodes are subscribed once bpy.data is available (after the registration restrict state, and on load_post).
+#   nodes created afterwards need to call subscribe_node_msgbus(self) from their init() & copy() methods.
+# - BEWARE: the msgbus is only notified for RNA changes (UI, python), not for animation or drivers.
+MSGBUS_NODES_QUEUE = set()
+
+
+def flush_msgbus_nodes_queue():
+    """update all nodes notified by the msgbus within the same tick at once. Is a bpy.app timer function"""
+
+    queue = list(MSGBUS_NODES_QUEUE)
+    MSGBUS_NODES_QUEUE.clear()
+
+    has_autorization = bpy.context.window_manager.rig_nodes.authorize_automatic_execution
+
+    with refresh_batch():
+
+        for treename, nodename in queue:
+
+            node_tree = bpy.data.node_groups.get(treename)
+            node = node_tree.nodes.get(nodename) if (node_tree is not None) else None
+            if (node is None):
+                continue
+
+            # for security reasons, same as upd_all_custom_nodes()
+            if ("AUTORIZATION_REQUIRED" in node.auto_update) and (not has_autorization):
+                continue
+
+            with profiled("msgbus", node.bl_idname):
+                node.update_all(signal_from_handlers=True, using_nodes=[node])
+            continue
+
+    return None
+
+
+def msgbus_node_notify(treename, nodename):
+    """msgbus callback, queue the subscribed node for an update on the next tick"""
+
+    # NOTE the timer could have been removed by a file load while nodes were queued, we check the timer itself.
+    if (not bpy.app.timers.is_registered(flush_msgbus_nodes_queue)):
+        bpy.app.timers.register(flush_msgbus_nodes_queue, first_interval=0.0)
+
+    MSGBUS_NODES_QUEUE.add((treename, nodename))
+    return None
+
+
+def subscribe_node_msgbus(node):
+    """subscribe a custom node instance to the rna data it declared.
+    Nodes created after the file load should call this from their init() & copy() methods"""
+
+    if (not hasattr(node, "msgbus_keys")):
+        return None
+
+    args = (node.id_data.name, node.name)
+    for key in node.msgbus_keys():
+        bpy.msgbus.subscribe_rna(
+            key=key,
+            owner=MSGBUS_NODES_OWNER,
+            args=args,
+            notify=msgbus_node_notify,
+        )
+        continue
+
+    return None
+
+
+def register_node_subscriptions():
+    """subscribe every custom node instances to the rna data they declared.
+    BEWARE: needs access to bpy.data, not available while the plugin registers in restrict state"""
+
+    if (not MSGBUS_UPD_NODES):
+        return None
+
+    nodes = get_all_nodes(
+        exactmatch_idnames=[cls.bl_idname for cls in MSGBUS_UPD_NODES],
+    )
+
+    for n in nodes:
+        subscribe_node_msgbus(n)
+        continue
+
+    return None
+
+
+def refresh_node_subscriptions():
+    """re-subscribe all custom nodes, to be used when a node dependencies changed"""
+
+    bpy.msgbus.clear_by_owner(MSGBUS_NODES_OWNER)
+    register_node_subscriptions()
+
+    return None
 
 
 def register_msgbusses():
+    """register our static subscriptions, owned by MSGBUS_OWNER. The custom nodes are subscribed separately, see refresh_node_subscriptions()"""
+
+    # avoid stacking duplicate subscriptions
+    unregister_msgbusses()
+
     return None
 
 
 def unregister_msgbusses():
+
+    bpy.msgbus.clear_by_owner(MSGBUS_OWNER)
+    bpy.msgbus.clear_by_owner(MSGBUS_NODES_OWNER)
+    MSGBUS_NODES_QUEUE.clear()
+
     return None
 
 
@@ -26,7 +146,7 @@ def wait_restrict_state_timer():
         """
 
         dprint(
-            f"HANDLER: on_plugin_installation(): Still in restrict state?",
+            "HANDLER: on_plugin_installation(): Still in restrict state?",
         )
 
         # don't do anything until context is cleared out
@@ -34,9 +154,14 @@ def wait_restrict_state_timer():
             return 0.01
 
         dprint(
-            f"HANDLER: on_plugin_installation(): Loading Plugin: Running few functions..",
+            "HANDLER: on_plugin_installation(): Loading Plugin: Running few functions..",
         )
 
+        # bpy.data is now available, we can subscribe the existing custom nodes.
+        refresh_node_subscriptions()
+        if (PrefsSnapshot.debug):
+            print(register_report())
+
         return None
 
     bpy.app.timers.register(wait_restrict_state_timer)
@@ -44,21 +169,136 @@ def wait_restrict_state_timer():
     return None
 
 
-def windows_changed():
-    """check if a new window has been opened"""
+# NOTE the windows are watched by a low frequency timer, away from the depsgraph handler hot path.
+WINDOWS_WATCH_INTERVAL = 1.0
+WINDOWS_WATCH_STATE = {"wincount": None}
+
+
+def windows_watch_timer():
+    """check if a new window has been opened, and relaunch the minimap navigation if so.
+    BEWARE: this is a function from a bpy.app timer, context is trickier to handle
+    """
+
+    # the timer stops itself when the feature is disabled, see ensure_windows_watch_timer()
+    if (not PrefsSnapshot.auto_launch_minimap_navigation):
+        WINDOWS_WATCH_STATE["wincount"] = None
+        return None
 
-    wincount = len(bpy.context.window_manager.windows)
-    _f = windows_changed
-    if not hasattr(_f, "wincount"):
-        _f.wincount = wincount
+    wm = bpy.context.window_manager
+    if (wm is None):
+        return WINDOWS_WATCH_INTERVAL
 
-    state = wincount != _f.wincount
-    _f.wincount = wincount
-    return state
+    wincount = len(wm.windows)
+    previous = WINDOWS_WATCH_STATE["wincount"]
+    WINDOWS_WATCH_STATE["wincount"] = wincount
 
+    if (previous is not None) and (wincount > previous):
+        win_sett = wm.rig_nodes
+        # we are forced to restart the modal navigation when a window is opened.
+        # a modal op is tied per window, so if we need to support our nav widget
+        # for this window, we need to relaunch our multi window modal.
+        win_sett.minimap_modal_operator_is_active = False
+        win_sett.minimap_modal_operator_is_active = True
 
-def upd_all_custom_nodes(classes: list):
-    """automatically run the update_all() function of all custom nodes passed"""
+    return WINDOWS_WATCH_INTERVAL
+
+
+def ensure_windows_watch_timer():
+    """start watching the windows if the minimap navigation is enabled by the user"""
+
+    if (PrefsSnapshot.auto_launch_minimap_navigation):
+        if (not bpy.app.timers.is_registered(windows_watch_timer)):
+            bpy.app.timers.register(windows_watch_timer, first_interval=WINDOWS_WATCH_INTERVAL, persistent=True)
+
+    return None
+
+
+# NOTE LRU cache of the FRAME_PRE nodes outputs, so scrubbing over the same frames doesn't recompute identical results.
+# - stored per node as {(tree name, node name): {(frame, inputs fingerprint): outputs data}}, most recently used last,
+#   both for the nodes and for their frames.
+# - the frame is scene.frame_current_final, so motion blur subframes are cached apart from their whole frame.
+# - each node keeps its own FRAME_CACHE_MAX_ENTRIES latest frames, a node can't evict the frames of the others.
+# - FRAME_CACHE_MAX_TOTAL bounds the entries across all nodes, the least recently used nodes lose their oldest frames first.
+# - the entries of renamed or removed nodes & trees are pruned on nodetrees depsgraph updates and on undo/redo.
+# - a node opt in by implementing three methods:
+#   'frame_cache_fingerprint()' return a hashable fingerprint of everything its outputs depend on, except the frame.
+#   'frame_cache_store()' return a snapshot of its outputs values.
+#   'frame_cache_restore(data)' set back its outputs values from a snapshot.
+FRAME_CACHE = OrderedDict()
+FRAME_CACHE_MAX_ENTRIES = 1_000
+FRAME_CACHE_MAX_TOTAL = 20_000
+FRAME_CACHE_TOTAL = 0
+
+
+def clear_frame_cache() -> None:
+    """clear the FRAME_PRE nodes outputs cache"""
+
+    global FRAME_CACHE_TOTAL
+    FRAME_CACHE.clear()
+    FRAME_CACHE_TOTAL = 0
+    return None
+
+
+def prune_frame_cache() -> None:
+    """forget the cached outputs of the nodes that no longer exist, ex: renamed or removed nodes & trees"""
+
+    global FRAME_CACHE_TOTAL
+
+    for treename, nodename in list(FRAME_CACHE):
+        node_tree = bpy.data.node_groups.get(treename)
+        if (node_tree is None) or (node_tree.nodes.get(nodename) is None):
+            FRAME_CACHE_TOTAL -= len(FRAME_CACHE.pop((treename, nodename)))
+        continue
+
+    return None
+
+
+def upd_node_frame_cached(node, frame:float, using_nodes) -> None:
+    """update a node supporting the frame cache, restore its outputs if the same frame & inputs were already computed"""
+
+    global FRAME_CACHE_TOTAL
+
+    nodekey = (node.id_data.name, node.name)
+    nodecache = FRAME_CACHE.get(nodekey)
+    if (nodecache is None):
+        nodecache = FRAME_CACHE[nodekey] = OrderedDict()
+    else:
+        FRAME_CACHE.move_to_end(nodekey)
+
+    key = (frame, node.frame_cache_fingerprint())
+
+    data = nodecache.get(key)
+    if (data is not None):
+        nodecache.move_to_end(key)
+        with profiled("frame_cache_restore", node.bl_idname):
+            node.frame_cache_restore(data)
+        return None
+
+    with profiled("update_all", node.bl_idname):
+        node.update_all(signal_from_handlers=True, using_nodes=using_nodes)
+
+    nodecache[key] = node.frame_cache_store()
+    FRAME_CACHE_TOTAL += 1
+
+    if (len(nodecache) > FRAME_CACHE_MAX_ENTRIES):
+        nodecache.popitem(last=False)
+        FRAME_CACHE_TOTAL -= 1
+
+    # over the global limit, evict the oldest frames of the least recently used nodes. this node is the most recent one.
+    while (FRAME_CACHE_TOTAL > FRAME_CACHE_MAX_TOTAL):
+        oldkey, oldcache = next(iter(FRAME_CACHE.items()))
+        oldcache.popitem(last=False)
+        FRAME_CACHE_TOTAL -= 1
+        if (not oldcache):
+            del FRAME_CACHE[oldkey]
+        continue
+
+    return None
+
+
+def upd_all_custom_nodes(classes: list, frame:float | None=None,):
+    """automatically run the update_all() function of all custom nodes passed
+    - frame: if passed, the nodes supporting the frame cache will be restored from it when possible."""
 
     # NOTE function below will simply collect all instances of 'RigNodes' nodes.
     # NOTE there's a lot of classes, and this functions might loop over a lot of data.
@@ -78,19 +318,28 @@ def upd_all_custom_nodes(classes: list):
     )
     # print("upd_all_custom_nodes().nodes:", matching_blid, nodes, )
 
-    for n in nodes:
+    # NOTE the refresh signals sent by the nodes are coalesced, each nodetree is tagged once at the end of the dispatch.
+    with refresh_batch():
 
-        # cls with auto_update property are eligible for automatic execution.
-        if (not hasattr(n, "update_all")) or (not hasattr(n, "auto_update")):
-            continue
+        for n in nodes:
 
-        # automatic re-evaluation of the Python Expression and Python Nex Nodes.
-        # for security reasons, we update only if the user allows it expressively on each blender sess.
-        if ("AUTORIZATION_REQUIRED" in n.auto_update) and (not has_autorization):
-            continue
+            # cls with auto_update property are eligible for automatic execution.
+            if (not hasattr(n, "update_all")) or (not hasattr(n, "auto_update")):
+                continue
 
-        n.update_all(signal_from_handlers=True, using_nodes=nodes)
-        continue
+            # automatic re-evaluation of the Python Expression and Python Nex Nodes.
+            # for security reasons, we update only if the user allows it expressively on each blender sess.
+            # NOTE these nodes should evaluate with utils.expr_utils, their compiled code & namespace are cached.
+            if ("AUTORIZATION_REQUIRED" in n.auto_update) and (not has_autorization):
+                continue
+
+            if (frame is not None) and hasattr(n, "frame_cache_fingerprint"):
+                upd_node_frame_cached(n, frame, nodes)
+                continue
+
+            with profiled("update_all", n.bl_idname):
+                n.update_all(signal_from_handlers=True, using_nodes=nodes)
+            continue
 
     return None
 
@@ -99,20 +348,16 @@ def upd_all_custom_nodes(classes: list):
 
 
 @bpy.app.handlers.persistent
+@profiled_function
 def rig_nodes_handler_depspost(scene, desp):
     """update on depsgraph change"""
 
-    if get_addon_prefs().debug_depsgraph:
+    if (PrefsSnapshot.debug_depsgraph):
         print("rig_nodes_handler_depspost(): depsgraph signal")
 
-    if get_addon_prefs().auto_launch_minimap_navigation:
-        if windows_changed():
-            win_sett = bpy.context.window_manager.rig_nodes
-            # we are forced to restart the modal navigation when a window is opened.
-            # a modal op is tied per window, so if we need to support our nav widget
-            # for this window, we need to relaunch our multi window modal.
-            win_sett.minimap_modal_operator_is_active = False
-            win_sett.minimap_modal_operator_is_active = True
+    # nodes or trees might have been renamed or removed
+    if (desp is not None) and (FRAME_CACHE) and desp.id_type_updated('NODETREE'):
+        prune_frame_cache()
 
     # updates for our custom nodes
     upd_all_custom_nodes(DEPSPOST_UPD_NODES)
@@ -123,35 +368,59 @@ def rig_nodes_handler_depspost(scene, desp):
 
 
 @bpy.app.handlers.persistent
+@profiled_function
 def rig_nodes_handler_framepre(scene, desp):
     """update on frame change"""
 
-    if get_addon_prefs().debug_depsgraph:
+    if (PrefsSnapshot.debug_depsgraph):
         print("rig_nodes_handler_framepre(): frame_pre signal")
 
     # updates for our custom nodes
-    upd_all_custom_nodes(FRAMEPRE_UPD_NODES)
+    upd_all_custom_nodes(FRAMEPRE_UPD_NODES, frame=scene.frame_current_final)
+    return None
+
+
+@bpy.app.handlers.persistent
+def rig_nodes_handler_undoredo(scene, desp):
+    """Handler function on undo & redo"""
+
+    if (PrefsSnapshot.debug_depsgraph):
+        print("rig_nodes_handler_undoredo(): undo/redo signal")
+
+    # nodes or trees might have been brought back or removed
+    prune_frame_cache()
     return None
 
 
 LOADPOST_UPD_NODES = [cls for cls in allcustomnodes if ("LOAD_POST" in cls.auto_update)]
 
+MSGBUS_UPD_NODES = [cls for cls in allcustomnodes if ("MSGBUS" in cls.auto_update)]
+
 
 @bpy.app.handlers.persistent
+@profiled_function
 def rig_nodes_handler_loadpost(scene, desp):
     """Handler function when user is loading a file"""
 
-    if get_addon_prefs().debug_depsgraph:
-        print("rig_nodes_handler_framepre(): frame_pre signal")
+    if (PrefsSnapshot.debug_depsgraph):
+        print("rig_nodes_handler_loadpost(): load_post signal")
+
+    # cached data from the previous file is no longer valid
+    clear_ng_interface_cache()
+    clear_ng_instances_index()
+    clear_ng_constants_registry()
+    clear_frame_cache()
+    clear_expressions_cache()
 
-    # need to add message bus on each blender load
+    # need to add message bus on each blender load, the subscriptions are lost with the previous file.
     register_msgbusses()
+    refresh_node_subscriptions()
 
     # register gpu drawing functions
     register_gpu_drawcalls()
 
     # start the minimap navigation automatically? only if the user enabled it.
-    if get_addon_prefs().auto_launch_minimap_navigation:
+    if (PrefsSnapshot.auto_launch_minimap_navigation):
         bpy.context.window_manager.rig_nodes.minimap_modal_operator_is_active = True
 
     # updates for our custom nodes
@@ -185,6 +454,10 @@ def load_handlers():
     # if we need to do things on plugin init, but there's an annoying restrict state.
     on_plugin_installation()
 
+    register_msgbusses()
+
+    ensure_windows_watch_timer()
+
     handler_names = [h.__name__ for h in all_handlers()]
 
     if "rig_nodes_handler_depspost" not in handler_names:
@@ -196,11 +469,20 @@ def load_handlers():
     if "rig_nodes_handler_loadpost" not in handler_names:
         bpy.app.handlers.load_post.append(rig_nodes_handler_loadpost)
 
+    if "rig_nodes_handler_undoredo" not in handler_names:
+        bpy.app.handlers.undo_post.append(rig_nodes_handler_undoredo)
+        bpy.app.handlers.redo_post.append(rig_nodes_handler_undoredo)
+
     return None
 
 
 def unload_handlers():
 
+    unregister_msgbusses()
+
+    if bpy.app.timers.is_registered(windows_watch_timer):
+        bpy.app.timers.unregister(windows_watch_timer)
+
     for h in all_handlers():
 
         if h.__name__ == "rig_nodes_handler_depspost":
@@ -212,4 +494,10 @@ def unload_handlers():
         if h.__name__ == "rig_nodes_handler_loadpost":
             bpy.app.handlers.load_post.remove(h)
 
+        if h.__name__ == "rig_nodes_handler_undoredo":
+            if (h in bpy.app.handlers.undo_post):
+                bpy.app.handlers.undo_post.remove(h)
+            if (h in bpy.app.handlers.redo_post):
+                bpy.app.handlers.redo_post.remove(h)
+
     return None
@@ -5,12 +5,17 @@
 
 import bpy
 
+from .profiling import RIG_NODES_OT_profiling_dump, RIG_NODES_OT_profiling_clear
+
 
 ADDON_KEYMAPS = []
 
 KMI_DEFS = ()
 
-classes = ()
+classes = (
+    RIG_NODES_OT_profiling_dump,
+    RIG_NODES_OT_profiling_clear,
+)
 
 
 def load_operators_keymaps():
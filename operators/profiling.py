@@ -0,0 +1,39 @@
+# SPDX-FileCopyrightText: 2025 Natalie Cuthbert <natalie@cuthbert.co.za>
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+import bpy
+
+from .. import REGISTER_TIMINGS
+from ..utils.prof_utils import dump_profiling, clear_profiling
+
+
+class RIG_NODES_OT_profiling_dump(bpy.types.Operator):
+
+    bl_idname = "rig_nodes.profiling_dump"
+    bl_label = "Dump Profiling"
+    bl_description = "Write the recorded profiling data to a json file"
+
+    filepath : bpy.props.StringProperty(subtype="FILE_PATH")
+    filter_glob : bpy.props.StringProperty(default="*.json", options={"HIDDEN"})
+
+    def invoke(self, context, event):
+        if (not self.filepath):
+            self.filepath = "rig_nodes_profiling.json"
+        context.window_manager.fileselect_add(self)
+        return {"RUNNING_MODAL"}
+
+    def execute(self, context):
+        dump_profiling(bpy.path.abspath(self.filepath), register_timings=REGISTER_TIMINGS)
+        self.report({"INFO"}, f"Profiling written to '{self.filepath}'")
+        return {"FINISHED"}
+
+
+class RIG_NODES_OT_profiling_clear(bpy.types.Operator):
+
+    bl_idname = "rig_nodes.profiling_clear"
+    bl_label = "Clear Profiling"
+    bl_description = "Clear the recorded profiling data"
+
+    def execute(self, context):
+        clear_profiling()
+        return {"FINISHED"}
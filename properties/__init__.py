@@ -4,11 +4,24 @@
 
 import bpy
 
+from .addonprefs import RIG_NODES_AddonPref
 
-classes = ()
+
+classes = (
+    RIG_NODES_AddonPref,
+)
 
 
 def load_properties():
+
+    from .. import get_addon_prefs, refresh_prefs_snapshot
+    from ..utils.prof_utils import set_profiling_enabled
+
+    # restore the cached flags and the profiling state from the saved preferences
+    prefs = get_addon_prefs()
+    refresh_prefs_snapshot(prefs)
+    set_profiling_enabled(prefs.debug_profiling)
+
     return None
 
 
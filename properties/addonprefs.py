@@ -0,0 +1,100 @@
+# SPDX-FileCopyrightText: 2025 Natalie Cuthbert <natalie@cuthbert.co.za>
+# SPDX-FileCopyrightText: 2025 BD3D DIGITAL DESIGN (Dorian B.)
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+import bpy
+
+from .. import REGISTER_TIMINGS, refresh_prefs_snapshot
+from ..utils.prof_utils import set_profiling_enabled, profiling_summary
+
+
+def upd_prefs_snapshot(self, context):
+    refresh_prefs_snapshot(self)
+    return None
+
+
+def upd_auto_launch_minimap_navigation(self, context):
+    refresh_prefs_snapshot(self)
+    from ..handlers import ensure_windows_watch_timer
+    ensure_windows_watch_timer()
+    return None
+
+
+def upd_debug_profiling(self, context):
+    set_profiling_enabled(self.debug_profiling)
+    return None
+
+
+class RIG_NODES_AddonPref(bpy.types.AddonPreferences):
+
+    # NOTE __package__ of this module is '<addon>.properties', we need the addon base package.
+    bl_idname = __package__.rpartition(".")[0]
+
+    debug : bpy.props.BoolProperty(
+        name="Debug Mode",
+        default=False,
+        update=upd_prefs_snapshot,
+        )
+    debug_depsgraph : bpy.props.BoolProperty(
+        name="Depsgraph Debug",
+        default=False,
+        update=upd_prefs_snapshot,
+        )
+    debug_profiling : bpy.props.BoolProperty(
+        name="Profiling",
+        description="Record the time spent in the plugin handlers, register phases and nodes updates",
+        default=False,
+        update=upd_debug_profiling,
+        )
+    auto_launch_minimap_navigation : bpy.props.BoolProperty(
+        name="Auto Launch Minimap Navigation",
+        default=False,
+        update=upd_auto_launch_minimap_navigation,
+        )
+    ui_word_wrap_max_char_factor : bpy.props.FloatProperty(
+        name="Word Wrap Max Char Factor",
+        default=1.0,
+        min=0.1,
+        max=3.0,
+        )
+    ui_word_wrap_y : bpy.props.FloatProperty(
+        name="Word Wrap Y",
+        default=0.8,
+        min=0.1,
+        max=3.0,
+        )
+
+    def draw(self, context):
+
+        layout = self.layout
+
+        col = layout.column(heading="Debug")
+        col.prop(self, "debug")
+        col.prop(self, "debug_depsgraph")
+        col.prop(self, "debug_profiling")
+
+        if (not self.debug_profiling):
+            return None
+
+        box = layout.box()
+        row = box.row()
+        row.label(text="Profiling Summary", icon="TIME")
+        row.operator("rig_nodes.profiling_dump", text="", icon="EXPORT")
+        row.operator("rig_nodes.profiling_clear", text="", icon="TRASH")
+
+        summary = profiling_summary(register_timings=REGISTER_TIMINGS)
+        if (not summary):
+            box.label(text="Nothing recorded yet.")
+            return None
+
+        grid = box.grid_flow(row_major=True, columns=4, even_columns=False, align=True)
+        for title in ("Name", "Calls", "Total", "Avg"):
+            grid.label(text=title)
+        for name, calls, total, avg, _ in summary[:30]:
+            grid.label(text=name)
+            grid.label(text=str(calls))
+            grid.label(text=f"{total:.2f}ms")
+            grid.label(text=f"{avg:.3f}ms")
+            continue
+
+        return None
@@ -0,0 +1,240 @@
+# SPDX-FileCopyrightText: 2025 Natalie Cuthbert <natalie@cuthbert.co.za>
+#
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+
+# NOTE offline baking of the bezier2d_utils curve operations across frame ranges, ex: for render-farm preparation.
+# - the animated values (mix factors, offsets) are evaluated once per frame on the main thread, the curves
+#   are prepared once (matched, made monotonic), then the frame range is split across a ProcessPoolExecutor.
+# - the workers write their results directly in a shared memory (frames, rows, 8) array, through the 'out'
+#   argument of the bezier2d_utils functions, nothing is sent back but the number of rows of each frame.
+# - the blender side write-back then happens in one bulk pass at the end, on the main thread:
+#       with bake_looped_offset_bezsegs(segments, range(1, 251), fcurve.evaluate) as baked:
+#           for frame, segments in baked:
+#               bezsegs_to_curvemapping(curve, segments)
+#               ...keyframe or store the result for this frame.
+# NOTE this module should stay free of bpy, it's imported as a standalone module by the worker processes.
+
+
+import os
+import sys
+import importlib.util
+from multiprocessing import get_context
+from multiprocessing.shared_memory import SharedMemory
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+try:
+    from . import bezier2d_utils as bz
+except ImportError:
+    # standalone module in a worker process, see get_worker_module(), our sibling module is loaded by path as well.
+    spec = importlib.util.spec_from_file_location(f"{__name__}_bezier2d", os.path.join(os.path.dirname(__file__), "bezier2d_utils.py"))
+    bz = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(bz)
+
+
+# NOTE the workers are spawned python processes, unable to import the addon package itself (its registration needs bpy).
+# our worker function is pickled by module name, so both the main process & the workers load this file by path under
+# the same standalone name. The worker processes do it in their initializer, a builtin exec() of the code below.
+WORKER_MODULE_NAME = "_rig_nodes_bake_worker"
+WORKER_MODULE_INIT = """
+import sys, importlib.util
+if (NAME not in sys.modules):
+    spec = importlib.util.spec_from_file_location(NAME, PATH)
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[NAME] = module
+    spec.loader.exec_module(module)
+"""
+
+
+def load_module_by_path(name:str, path:str):
+    """load a python file as a standalone module registered in sys.modules, only once"""
+
+    if (name in sys.modules):
+        return sys.modules[name]
+
+    spec = importlib.util.spec_from_file_location(name, path)
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    spec.loader.exec_module(module)
+
+    return module
+
+
+def get_worker_module():
+    """get the standalone version of this module, the one the worker processes are able to unpickle"""
+
+    return load_module_by_path(WORKER_MODULE_NAME, __file__)
+
+
+class BakedBezsegs:
+    """the baked segments of a frame range, stored in a shared memory (frames, rows, 8) array.
+    Each frame uses the first 'counts[i]' rows of its array. Use as a context manager, or close() it to free the memory."""
+
+    def __init__(self, frames, rows:int, dtype):
+
+        self.frames = np.asarray(frames)
+        self.counts = np.zeros(len(self.frames), dtype=np.int64)
+        shape = (len(self.frames), rows, 8)
+
+        self.shm = SharedMemory(create=True, size=max(1, int(np.prod(shape)) * np.dtype(dtype).itemsize))
+        self.segments = np.ndarray(shape, dtype=dtype, buffer=self.shm.buf)
+
+    def __len__(self) -> int:
+        return len(self.frames)
+
+    def __getitem__(self, i:int) -> np.ndarray:
+        """get the segments of the i-th baked frame, a view of the shared memory"""
+        return self.segments[i, :self.counts[i]]
+
+    def __iter__(self):
+        """iterate the baked (frame, segments) in frame order, the segments are views of the shared memory"""
+        for i, frame in enumerate(self.frames):
+            yield frame, self[i]
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """free the shared memory. copy the segments you want to keep beforehand"""
+
+        if (self.shm is None):
+            return None
+
+        self.segments = None
+        close_shared_memory(self.shm)
+        self.shm.unlink()
+        self.shm = None
+
+        return None
+
+
+def close_shared_memory(shm:SharedMemory) -> None:
+    """close our access to a shared memory block"""
+
+    try:
+        shm.close()
+    except BufferError:
+        # views of the shared memory are still alive somewhere, the mapping will be freed along with them.
+        pass
+
+    return None
+
+
+def bake_frames(segments:np.ndarray, start:int, operation:str, values:np.ndarray, curves:tuple, cut_precision:int, tolerance:float) -> np.ndarray:
+    """compute the given frames of a bake, written in the (frames, rows, 8) segments array from the 'start' index.
+    Return the number of rows of each frame"""
+
+    counts = np.zeros(len(values), dtype=np.int64)
+
+    for i, value in enumerate(values):
+        match operation:
+            case 'LERP':
+                segsA, segsB = curves
+                result = bz.lerp_bezsegs(segsA, segsB, value, cut_precision=cut_precision, tolerance=tolerance, out=segments[start + i])
+            case 'LOOPED_OFFSET':
+                (mono_segments,) = curves
+                result = bz.looped_offset_bezsegs(mono_segments, value, cut_precision=cut_precision, tolerance=tolerance, out=segments[start + i])
+
+        counts[i] = 0 if (result is None) else result.shape[0]
+        continue
+
+    return counts
+
+
+def bake_frames_shared(shm_name:str, shape:tuple, dtype:str, *args) -> np.ndarray:
+    """bake_frames() in a worker process, writing in the shared memory array of the bake"""
+
+    shm = SharedMemory(name=shm_name)
+    try:
+        return bake_frames(np.ndarray(shape, dtype=dtype, buffer=shm.buf), *args)
+    finally:
+        close_shared_memory(shm)
+
+
+def bake_bezsegs(operation:str, frames, values, curves:tuple, rows:int, cut_precision:int=100, tolerance:float=1e-6, max_workers:int=None) -> BakedBezsegs:
+    """bake a bezier2d_utils operation across frames, split across a pool of worker processes.
+    Args:
+        operation (str): 'LERP' or 'LOOPED_OFFSET'.
+        frames: The frames to bake, ex: range(start, end+1).
+        values: The animated value of each frame, either a sequence or a callable(frame) -> float evaluated on the main thread.
+        curves (tuple): The prepared curves passed to the operation, see bake_lerp_bezsegs() & bake_looped_offset_bezsegs().
+        rows (int): The maximal number of rows a frame result can take.
+        max_workers (int): Number of worker processes, defaults to the cpu count. 1 bakes serially in the main process.
+    Returns:
+        BakedBezsegs: The baked segments, to free with close() once written back.
+    """
+
+    if (operation not in {'LERP', 'LOOPED_OFFSET'}):
+        raise ValueError(f"ERROR: bake_bezsegs(): Invalid operation '{operation}'. Must be 'LERP' or 'LOOPED_OFFSET'.")
+
+    frames = list(frames)
+    values = np.asarray([values(f) for f in frames] if callable(values) else values, dtype=np.float64)
+    if (values.shape != (len(frames),)):
+        raise ValueError(f"ERROR: bake_bezsegs(): values must match the {len(frames)} frames, got shape {values.shape}")
+
+    dtype = curves[0].dtype
+    baked = BakedBezsegs(frames, rows, dtype)
+    if (len(frames) == 0):
+        return baked
+
+    # split the frame range in one contiguous chunk per worker
+    max_workers = max_workers or os.cpu_count() or 1
+    chunks = [c for c in np.array_split(np.arange(len(frames)), min(max_workers, len(frames))) if len(c)]
+    shared = (baked.shm.name, baked.segments.shape, dtype.str)
+
+    try:
+        if (len(chunks) == 1):
+            baked.counts[:] = bake_frames(baked.segments, 0, operation, values, curves, cut_precision, tolerance)
+            return baked
+
+        worker = get_worker_module()
+        with ProcessPoolExecutor(
+            max_workers=len(chunks),
+            # NOTE spawn, forking blender is not safe.
+            mp_context=get_context("spawn"),
+            initializer=exec,
+            initargs=(WORKER_MODULE_INIT, {"NAME": WORKER_MODULE_NAME, "PATH": __file__}),
+            ) as executor:
+
+            futures = [executor.submit(worker.bake_frames_shared, *shared, int(c[0]), operation, values[c], curves, cut_precision, tolerance) for c in chunks]
+            for c, future in zip(chunks, futures):
+                baked.counts[c] = future.result()
+
+    except Exception:
+        baked.close()
+        raise
+
+    return baked
+
+
+def bake_lerp_bezsegs(segsA:np.ndarray, segsB:np.ndarray, frames, mixfacs, cut_precision:int=100, tolerance:float=1e-6, dtype=None, max_workers:int=None) -> BakedBezsegs:
+    """bake lerp_bezsegs() between two curves across frames, with an animated mix factor.
+    The curves are matched once, every frame result has the same number of rows. See bake_bezsegs() for the arguments"""
+
+    dtype = bz.get_bezsegs_dtype(segsA, segsB, dtype=dtype)
+    segsA, segsB = bz.as_bezsegs(segsA, dtype), bz.as_bezsegs(segsB, dtype)
+
+    # match the number of segments once, instead of once per frame
+    if (segsA.shape[0] != segsB.shape[0]):
+        segsA, segsB = (bz.subdiv_project_bezsegs(segsA, segsB, tolerance=tolerance),
+                        bz.subdiv_project_bezsegs(segsB, segsA, tolerance=tolerance))
+        if (segsA is None) or (segsB is None) or (segsA.shape[0] != segsB.shape[0]):
+            raise ValueError(f"ERROR: bake_lerp_bezsegs(): failed to match the segments of both curves. Cannot mix.")
+
+    return bake_bezsegs('LERP', frames, mixfacs, (segsA, segsB), segsA.shape[0],
+        cut_precision=cut_precision, tolerance=tolerance, max_workers=max_workers)
+
+
+def bake_looped_offset_bezsegs(segments:np.ndarray, frames, offsets, cut_precision:int=100, tolerance:float=1e-6, dtype=None, max_workers:int=None) -> BakedBezsegs:
+    """bake looped_offset_bezsegs() of a curve across frames, with an animated offset.
+    The curve is made monotonic once, a frame result may take one more row than the curve when it's cut. See bake_bezsegs() for the arguments"""
+
+    mono_segments = bz.ensure_monotonic_bezsegs(segments, dtype=dtype)
+
+    return bake_bezsegs('LOOPED_OFFSET', frames, offsets, (mono_segments,), mono_segments.shape[0] + 1,
+        cut_precision=cut_precision, tolerance=tolerance, max_workers=max_workers)
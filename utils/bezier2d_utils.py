@@ -7,8 +7,13 @@
 # heavily related to blender mapping.curve API.
 
 # NOTE 
-# i think we should be more carreful to not modify an arg in place.. 
-# always work on copies and not directly on the arg.. unsure if respected.
+# about memory & arguments mutation:
+# - the segments arguments are never modified in place. results are new arrays, or are written in the 'out' array if given.
+# - transformations accept an 'out' (M,8) array, reusable by hot per-frame callers to avoid allocating their results.
+#   'out' may have more rows than needed, the result is then the 'out[:M]' view. It must be of the working dtype
+#   and must not share memory with the segments arguments.
+# - returned arrays might be a view of the input when nothing had to be done. If you want to modify the result
+#   in place, pass an 'out' array, results are always written in it.
 
 # NOTE 
 # about AI
@@ -20,6 +25,70 @@
 import numpy as np
 
 
+# NOTE precision policy of this module:
+# - the floating dtype of the segments is preserved end to end. float32 curves stay float32, without hidden casts or copies.
+#   non floating inputs (ints, lists..) are worked as float64.
+# - the working dtype can be forced per call with the 'dtype' argument, or module wide with set_bezsegs_precision().
+# - float32 halves the memory bandwidth of large batched curve workloads, at the cost of precision (~7 significant digits).
+# - decisions are always taken in float64 (monotonicity verdicts, which segments get cut), so the curves structure never
+#   depends on the working dtype, only their values do.
+
+class BezsegsPrecision:
+    dtype = None
+
+
+def set_bezsegs_precision(dtype=None) -> None:
+    """force the working dtype of this module functions, ex: np.float32. Pass None to preserve the segments dtype"""
+
+    BezsegsPrecision.dtype = None if (dtype is None) else np.dtype(dtype)
+    return None
+
+
+def get_bezsegs_dtype(*arrays, dtype=None) -> np.dtype:
+    """get the working dtype of the given segments arrays, according to the precision policy"""
+
+    if (dtype is not None):
+        return np.dtype(dtype)
+    if (BezsegsPrecision.dtype is not None):
+        return BezsegsPrecision.dtype
+    return np.result_type(*(a.dtype if np.issubdtype(a.dtype, np.floating) else np.float64 for a in arrays))
+
+
+def as_bezsegs(segments, dtype=None) -> np.ndarray:
+    """get the segments as an array of the working dtype, only copied if a conversion is needed"""
+
+    segments = np.asarray(segments)
+    return segments.astype(get_bezsegs_dtype(segments, dtype=dtype), copy=False)
+
+
+def get_bezsegs_out(out, num_segments:int, dtype, *inputs) -> np.ndarray:
+    """get the (num_segments, 8) array a transformation result is written to. 
+    a new array if out is None, otherwise the validated out[:num_segments] view"""
+
+    if (out is None):
+        return np.empty((num_segments, 8), dtype=dtype)
+
+    if (out.ndim != 2) or (out.shape[1] != 8) or (out.shape[0] < num_segments):
+        raise ValueError(f"ERROR: get_bezsegs_out(): out must be a (M>={num_segments}, 8) NumPy array, got shape {out.shape}")
+    if (out.dtype != dtype):
+        raise ValueError(f"ERROR: get_bezsegs_out(): out must be of the working dtype {np.dtype(dtype)}, got {out.dtype}")
+    if any(np.may_share_memory(out, a) for a in inputs if (a is not None)):
+        raise ValueError(f"ERROR: get_bezsegs_out(): out must not share memory with the segments arguments")
+
+    return out[:num_segments]
+
+
+def write_bezsegs_out(segments:np.ndarray, out=None, *inputs) -> np.ndarray:
+    """return the segments as a transformation result. copied in out if given, otherwise returned as is"""
+
+    if (out is None):
+        return segments
+
+    out = get_bezsegs_out(out, segments.shape[0], segments.dtype, segments, *inputs)
+    out[:] = segments
+    return out
+
+
 def reverseengineer_curvemapping_to_bezsegs(curve) -> np.ndarray:
     """
     Convert a Blender CurveMapping object to a NumPy array of Bézier segments,
@@ -336,23 +405,29 @@ def is_bezsegs_monotonic(segments:np.ndarray, sample_rate:int=500) -> bool:
     segments (np.ndarray): An (N-1) x 8 NumPy array [P0x, P0y, P1x, P1y, P2x, P2y, P3x, P3y].
     Returns True if the segments are monotonic in x, False otherwise.
     """
-    points = sample_bezsegs(segments, sample_rate)
+    # NOTE the verdict is always sampled in float64, whatever the working dtype. in single precision the sampling
+    # rounding errors would make flat monotonic curves backtrace, and no tolerance can tell them apart from narrow
+    # curves really going backward. Only a boolean comes out of here, the precision policy is unaffected.
+    points = sample_bezsegs(segments, sample_rate, dtype=np.float64)
     return np.all(np.diff(points[:,0]) >= 0)
 
 
-def ensure_monotonic_bezsegs(segments:np.ndarray) -> np.ndarray:
+def ensure_monotonic_bezsegs(segments:np.ndarray, dtype=None, out=None) -> np.ndarray:
     """Ensure the segments represent a monotonic curve in it's x-axis.
     Monotonicity is important for interpolation, preventing the curve from backtracking on the X axis.
     How it's done:
     - We sort the anchor points by their x-coordinate.
     - We then adjust the handles if needed. 
     segments (np.ndarray): An (N-1) x 8 NumPy array [P0x, P0y, P1x, P1y, P2x, P2y, P3x, P3y].
+    out (np.ndarray): Optional array to write the result to, see get_bezsegs_out().
     """
     # NOTE this function is optimized for numpy.
 
+    segments = as_bezsegs(segments, dtype)
+
     # we don't need to do anything if the curve is already monotonic
     if is_bezsegs_monotonic(segments):
-        return segments
+        return write_bezsegs_out(segments, out)
 
     num_segments = segments.shape[0]
     num_points = num_segments + 1
@@ -382,8 +457,8 @@ def ensure_monotonic_bezsegs(segments:np.ndarray) -> np.ndarray:
     sorted_anchor_handle_data = anchor_handle_data[sort_indices]
 
     # 3. Reconstruct segments from sorted data
-    # Create a new array for the sorted segments
-    sorted_segments = np.zeros((num_segments, 8), dtype=segments.dtype)
+    # Create a new array for the sorted segments, all of its values are filled below
+    sorted_segments = get_bezsegs_out(out, num_segments, segments.dtype, segments)
 
     # P0 comes from anchor i's location
     sorted_segments[:, 0:2] = sorted_anchor_handle_data[:-1, 0:2]
@@ -481,15 +556,16 @@ def ensure_monotonic_bezsegs(segments:np.ndarray) -> np.ndarray:
 #     return (P0 * omt3) + (P1 * 3.0 * omt2 * t) + (P2 * 3.0 * omt * t2) + (P3 * t3)
 
 
-def sample_bezsegs(segments:np.ndarray, sampling_rate:int) -> np.ndarray:
+def sample_bezsegs(segments:np.ndarray, sampling_rate:int, dtype=None) -> np.ndarray:
     """Generate sampled points from the segments numpy array using vectorized operations.
     segments (np.ndarray): An (N-1) x 8 NumPy array [P0x, P0y, P1x, P1y, P2x, P2y, P3x, P3y].
     sampling_rate (int): Number of steps per segment (e.g., 1 gives start/end, 2 gives start/mid/end).
-    Returns a NumPy array of 2D points (sampling_rate + 1, 2).
+    Returns a NumPy array of 2D points (N * (sampling_rate + 1), 2).
     """
 
     if (sampling_rate < 1): raise ValueError("sampling_rate must be at least 1")
 
+    segments = as_bezsegs(segments, dtype)
     num_segments = segments.shape[0]
     num_points_per_segment = sampling_rate + 1
 
@@ -503,7 +579,7 @@ def sample_bezsegs(segments:np.ndarray, sampling_rate:int) -> np.ndarray:
 
     # Generate t values (parameterization)
     # Shape (1, num_points_per_segment, 1) to broadcast correctly with points
-    t = np.linspace(0, 1, num_points_per_segment).reshape(1, num_points_per_segment, 1)
+    t = np.linspace(0, 1, num_points_per_segment, dtype=segments.dtype).reshape(1, num_points_per_segment, 1)
 
     # Calculate powers of t and (1-t)
     omt = 1.0 - t
@@ -517,43 +593,25 @@ def sample_bezsegs(segments:np.ndarray, sampling_rate:int) -> np.ndarray:
     points = (P0 * omt3) + (P1 * 3.0 * omt2 * t) + (P2 * 3.0 * omt * t2) + (P3 * t3)
 
     # Reshape to a 2D array: (num_segments * num_points_per_segment, 2)
-    all_points = points.reshape(-1, 2)
-
-    # Remove duplicate points at segment junctions
-    # Keep the first point (t=0) of the first segment.
-    # Keep points from t=1/sampling_rate to t=1 for all segments.
-    # Create indices to keep: 0 (start of first seg), and then 1 to sampling_rate+1 for each segment
-    indices_to_keep = [0] # Keep the very first point
-    for i in range(num_segments):
-        start = i * num_points_per_segment + 1
-        end = start + sampling_rate # +1 for num_points, -1 because index starts at 1
-        indices_to_keep.extend(range(start, end + 1))
-        continue
-
-    # Ensure indices are within bounds (handles cases like sampling_rate=1 correctly)
-    indices_to_keep = [idx for idx in indices_to_keep if (idx < all_points.shape[0])]
-    sampled_points = all_points[indices_to_keep]
+    # NOTE the points at segments junctions are kept twice, as the end of a segment and the start of the next one.
+    sampled_points = points.reshape(-1, 2)
 
     return sampled_points
 
 
-def sample_bezsegs_with_t(segments:np.ndarray, sampling_rate:int) -> tuple[list, list]:
-    """Generate an array of points **and** their corresponding t-values per segment, using vectorized operations.
-    NOTE: This is an useful information to have in order to retrieve the t-value for a given x-coordinate for example.
-    Args:
-        segments (np.ndarray): An (N-1) x 8 NumPy array [P0x, P0y, P1x, P1y, P2x, P2y, P3x, P3y].
-        sampling_rate (int): Number of steps per segment (e.g., 1 gives start/end, 2 gives start/mid/end).
+def _sample_bezsegs_points(segments:np.ndarray, sampling_rate:int) -> tuple[np.ndarray, np.ndarray]:
+    """Sample the segments points and their t-values, see sample_bezsegs_with_t().
+    The segments are expected to be already of the working dtype, see as_bezsegs().
     Returns:
-        tuple[list[np.ndarray], list[np.ndarray]]:
-            - points_per_segment: List of numpy arrays sampled points per segments.
-            - t_values_per_segment: List of numpy arrays t-values per segments.
+        tuple[np.ndarray, np.ndarray]:
+            - points: A (N, sampling_rate + 1, 2) array of sampled points per segments.
+            - t_values: A (sampling_rate + 1,) array of t-values, identical for every segments.
     """
 
     if (sampling_rate < 1): raise ValueError("sampling_rate must be at least 1")
 
     num_segments = segments.shape[0]
     num_points_per_segment = sampling_rate + 1
-    original_dtype = segments.dtype
 
     # Extract control points for all segments
     control_points = segments.reshape(num_segments, 4, 2)
@@ -563,7 +621,7 @@ def sample_bezsegs_with_t(segments:np.ndarray, sampling_rate:int) -> tuple[list,
     P3 = control_points[:, 3, :][:, np.newaxis, :] # Shape (N, 1, 2)
 
     # Generate t values (parameterization)
-    t_1d = np.linspace(0, 1, num_points_per_segment, dtype=np.float64) # Use float64 for precision
+    t_1d = np.linspace(0, 1, num_points_per_segment, dtype=segments.dtype)
     # Reshape for broadcasting calculation
     t = t_1d.reshape(1, num_points_per_segment, 1)
 
@@ -576,26 +634,34 @@ def sample_bezsegs_with_t(segments:np.ndarray, sampling_rate:int) -> tuple[list,
 
     # Calculate points using the Bezier formula with broadcasting
     # Result shape: (num_segments, num_points_per_segment, 2)
-    # Ensure calculation uses float64, then potentially cast back if needed
-    points = (P0.astype(np.float64) * omt3) + \
-             (P1.astype(np.float64) * 3.0 * omt2 * t) + \
-             (P2.astype(np.float64) * 3.0 * omt * t2) + \
-             (P3.astype(np.float64) * t3)
-    
-    # Convert result back to original dtype if it was float32 or similar
-    if (original_dtype != np.float64):
-        points = points.astype(original_dtype)
+    points = (P0 * omt3) + (P1 * 3.0 * omt2 * t) + (P2 * 3.0 * omt * t2) + (P3 * t3)
+
+    return points, t_1d
+
+
+def sample_bezsegs_with_t(segments:np.ndarray, sampling_rate:int, dtype=None) -> tuple[list, list]:
+    """Generate an array of points **and** their corresponding t-values per segment, using vectorized operations.
+    NOTE: This is an useful information to have in order to retrieve the t-value for a given x-coordinate for example.
+    Args:
+        segments (np.ndarray): An (N-1) x 8 NumPy array [P0x, P0y, P1x, P1y, P2x, P2y, P3x, P3y].
+        sampling_rate (int): Number of steps per segment (e.g., 1 gives start/end, 2 gives start/mid/end).
+    Returns:
+        tuple[list[np.ndarray], list[np.ndarray]]:
+            - points_per_segment: List of numpy arrays sampled points per segments.
+            - t_values_per_segment: List of numpy arrays t-values per segments.
+    """
+
+    points, t_1d = _sample_bezsegs_points(as_bezsegs(segments, dtype), sampling_rate)
 
-    # Populate lists using list comprehensions
     # points_per_segment will be a list of (num_points_per_segment, 2) arrays
-    points_per_segment = [points[i] for i in range(num_segments)]
+    points_per_segment = list(points)
     # t_values_per_segment will be a list of (num_points_per_segment,) arrays (all identical)
-    t_values_per_segment = [t_1d for _ in range(num_segments)]
+    t_values_per_segment = [t_1d] * len(points_per_segment)
 
     return points_per_segment, t_values_per_segment
 
 
-def casteljau_subdiv_bezsegs(segments:np.ndarray, t_map:np.ndarray, tolerance:float=1e-6) -> np.ndarray:
+def casteljau_subdiv_bezsegs(segments:np.ndarray, t_map:np.ndarray, tolerance:float=1e-6, dtype=None, out=None) -> np.ndarray:
     """Batch numpy array subdivision of Bézier segments at t-values using the Casteljau algorithm.
     Args:
         segments (np.ndarray): An (N-1, 8) NumPy array of Bézier segments [P0x, P0y, P1x, P1y, P2x, P2y, P3x, P3y].
@@ -603,22 +669,32 @@ def casteljau_subdiv_bezsegs(segments:np.ndarray, t_map:np.ndarray, tolerance:fl
                             length of t_map should match length of segments.
                             Use 0 value for segments that should not be subdivided.
         tolerance (float): Tolerance of t-values near 0 or 1 for avoiding subdivision.
+        out (np.ndarray): Optional array to write the result to, see get_bezsegs_out().
     Returns:
-        np.ndarray: A new NumPy array containing all segments after subdivision operation.
+        np.ndarray: A new NumPy array (or the out view) containing all segments after subdivision operation.
     """
 
+    segments = as_bezsegs(segments, dtype)
     num_segments = segments.shape[0]
     if (t_map.shape != (num_segments,)):
         raise ValueError(f"ERROR: casteljau_subdiv_bezsegs(): t_map must be an (N,) NumPy array, got shape {t_map.shape}")
 
-    control_points = segments.reshape(num_segments, 4, 2)
+    # failed to subdivide anything?
+    if (num_segments == 0):
+        print(f"WARNING: casteljau_subdiv_bezsegs(): No segments were subdivided.")
+        return None
+
+    # Identify Segments to Subdivide
+    subdivide_mask = (t_map > tolerance) & (t_map < 1.0 - tolerance) # Use original t_map for mask
+
+    # Perform Vectorized Calculation, only for the segments to subdivide
+    control_points = segments[subdivide_mask].reshape(-1, 4, 2)
     P0 = control_points[:, 0, :]
     P1 = control_points[:, 1, :]
     P2 = control_points[:, 2, :]
     P3 = control_points[:, 3, :]
 
-    # Perform Vectorized Calculation
-    t = np.clip(t_map, 0.0, 1.0).reshape(-1, 1)
+    t = np.clip(t_map[subdivide_mask], 0.0, 1.0).astype(segments.dtype, copy=False).reshape(-1, 1)
     omt = 1.0 - t
     Q0 = P0 * omt + P1 * t
     Q1 = P1 * omt + P2 * t
@@ -627,34 +703,23 @@ def casteljau_subdiv_bezsegs(segments:np.ndarray, t_map:np.ndarray, tolerance:fl
     R1 = Q1 * omt + Q2 * t
     S = R0 * omt + R1 * t
 
-    # Construct Potential Sub-segments
-    # These arrays hold the potential results IF subdivision happens
-    potential_seg1 = np.concatenate((P0, Q0, R0, S), axis=1)
-    potential_seg2 = np.concatenate((S, R1, Q2, P3), axis=1)
+    # Construct the Sub-segments
+    seg1 = np.concatenate((P0, Q0, R0, S), axis=1)
+    seg2 = np.concatenate((S, R1, Q2, P3), axis=1)
 
-    # Identify Segments to Subdivide
-    subdivide_mask = (t_map > tolerance) & (t_map < 1.0 - tolerance) # Use original t_map for mask
+    # Assemble the Output Array, a subdivided segment is replaced by its two halves.
+    # each original segment is shifted by the number of subdivisions before it.
+    counts = subdivide_mask + 1
+    starts = np.cumsum(counts) - counts
+    new_segments = get_bezsegs_out(out, int(counts.sum()), segments.dtype, segments)
+    new_segments[starts[~subdivide_mask]] = segments[~subdivide_mask]
+    new_segments[starts[subdivide_mask]] = seg1
+    new_segments[starts[subdivide_mask] + 1] = seg2
 
-    # Assemble the Output Array
-    new_segments = []
-    for i in range(num_segments):
-        if subdivide_mask[i]:
-            new_segments.append(potential_seg1[i])
-            new_segments.append(potential_seg2[i])
-        else:
-            new_segments.append(segments[i])
-
-    # failed to subdivide anything?
-    if (not new_segments):
-        print(f"WARNING: casteljau_subdiv_bezsegs(): No segments were subdivided.")
-        return None
+    return new_segments
 
-    # Determine appropriate dtype (original or float if potential_seg2 was involved)
-    result_dtype = np.promote_types(segments.dtype, potential_seg2.dtype)
-    return np.array(new_segments, dtype=result_dtype)
 
-
-def cut_bezsegs(segments:np.ndarray, xlocation:float, sampling_rate:int=50, tolerance:float=1e-6,) -> np.ndarray:
+def cut_bezsegs(segments:np.ndarray, xlocation:float, sampling_rate:int=50, tolerance:float=1e-6, dtype=None, out=None,) -> np.ndarray:
     """
     Subdivides Bézier segments at a given x-location.
     How this function works:
@@ -666,76 +731,48 @@ def cut_bezsegs(segments:np.ndarray, xlocation:float, sampling_rate:int=50, tole
         xlocation (float): The target x-coordinate for subdivision.
         sampling_rate (int): The density used by sample_bezsegs_with_t to generate points for estimating 't'. 
                              Higher values increase accuracy but cost more computation upfront.
+        out (np.ndarray): Optional array to write the result to, see get_bezsegs_out(). Needs N+1 rows for a monotonic curve,
+                          up to 2*N for a non-monotonic one as several segments may be cut.
     Returns:
-        np.ndarray: A new NumPy array containing all resulting segments after
+        np.ndarray: A new NumPy array (or the out view) containing all resulting segments after
                     subdivision. Shape will be (M, 8) where N <= M <= 2*N.
-                    Returns the original array if no subdivisions occur.
     """
 
     if sampling_rate < 1: raise ValueError("sampling_rate must be at least 1")
 
+    segments = as_bezsegs(segments, dtype)
     num_segments = segments.shape[0]
 
-    # 1. Sample points and t-values for estimation
-    points_per_segment, t_values_per_segment = sample_bezsegs_with_t(segments, sampling_rate)
-
-    if (len(points_per_segment) != num_segments) or (len(t_values_per_segment) != num_segments):
-        print(f"WARNING: Mismatch between segment count and sampling results. This should not happen.")
-        return None
-
-    # 2. Initialize the t-map for subdivision
-    t_map = np.zeros(num_segments, dtype=np.float64)
-    # Track which segments is being subdivided
-    subdivide_mask = np.zeros(num_segments, dtype=bool)
+    # 1. Sample points and t-values for estimation, for all segments at once
+    # NOTE always estimated in float64, like is_bezsegs_monotonic(). in single precision the sampling rounding errors
+    # would change which segments get cut, only the subdivision itself is done in the working dtype.
+    points, t_values = _sample_bezsegs_points(segments.astype(np.float64, copy=False), sampling_rate)
+    sampled_xs = points[:, :, 0]
 
-    # 3. find the t-values equivalent to our target x-location, might match multiple segments
-    for i in range(num_segments):
-        sampled_pts_x, sampled_ts = points_per_segment[i][:, 0], t_values_per_segment[i]
+    # 2. find the t-values equivalent to our target x-location, might match multiple segments
+    # skip the segments not reaching our target x-location
+    in_range = ~((xlocation < sampled_xs.min(axis=1)) | (xlocation > sampled_xs.max(axis=1)))
+    estimated_t = t_values[np.argmin(np.abs(sampled_xs - xlocation), axis=1)]
 
-        # if we have no points or t-values, skip this segment
-        if ((sampled_pts_x.size==0) or (sampled_ts.size==0)):
-            continue
-
-        # if we have no points or t-values, skip this segment
-        min_x, max_x = np.min(sampled_pts_x), np.max(sampled_pts_x)
-        if (xlocation < min_x) or (xlocation > max_x):
-            continue
-
-        # find the t-value equivalent to our target x-location
-        idx = np.argmin(np.abs(sampled_pts_x - xlocation))
-        estimated_t = sampled_ts[idx]
-
-        # mark for subdivision
-        if (tolerance < estimated_t < (1.0 - tolerance)):
-            t_map[i] = estimated_t
-            subdivide_mask[i] = True
-        continue
+    # 3. mark for subdivision, use t=0 (no split) where subdivision is not needed
+    subdivide_mask = in_range & (tolerance < estimated_t) & (estimated_t < (1.0 - tolerance))
+    t_map = np.where(subdivide_mask, estimated_t, 0.0)
 
     # 4. Call the batch subdivision function
-    # Use the t_map where subdivision is needed, otherwise t=0 (no split)
-    segments = casteljau_subdiv_bezsegs(segments, t_map, tolerance=tolerance)
+    segments = casteljau_subdiv_bezsegs(segments, t_map, tolerance=tolerance, out=out)
 
     # 5. Adjust x-coordinate of the new anchor points
-    # Ensure we modify a float array copy
-    segments = segments.astype(float, copy=True)
-    output_idx = 0
-    for i in range(num_segments):
-        if subdivide_mask[i]: # Check if this original segment *was* actually split
-            # Adjust P3x of first child segment
-            segments[output_idx, 6] = xlocation
-            # Adjust P0x of second child segment
-            segments[output_idx + 1, 0] = xlocation
-            # Move output index past the two children
-            output_idx += 2
-            continue
-        # Move output index past the single original segment
-        output_idx += 1
-        continue
+    # NOTE casteljau_subdiv_bezsegs() always return a new array (or out), we can modify it.
+    # index of the first child of each split segment, shifted by the splits before it
+    first_children = (np.arange(num_segments) + np.cumsum(subdivide_mask) - subdivide_mask)[subdivide_mask]
+    # Adjust P3x of first child segment, and P0x of second child segment
+    segments[first_children, 6] = xlocation
+    segments[first_children + 1, 0] = xlocation
 
     return segments
 
 
-def extend_bezsegs(segments:np.ndarray, xlocation:float, mode:str='HANDLE', tolerance:float=1e-6,) -> np.ndarray:
+def extend_bezsegs(segments:np.ndarray, xlocation:float, mode:str='HANDLE', tolerance:float=1e-6, dtype=None, out=None,) -> np.ndarray:
     """Create a new Bézier segments in order to reach a target x location, if needed.
     Either extending horizontally, or using the handles to extend tangentially.
     Args:
@@ -743,32 +780,33 @@ def extend_bezsegs(segments:np.ndarray, xlocation:float, mode:str='HANDLE', tole
         xlocation (float): The target x-coordinate to extend to.
         mode (str): The extension mode. Must be 'HANDLE' or 'HORIZONTAL'.
         tolerance (float): Tolerance for checking if tangent x-component is near zero.
+        out (np.ndarray): Optional array to write the result to, see get_bezsegs_out(). Needs N+1 rows.
     Returns:
-        np.ndarray: A new NumPy array of format (N, 8) [P0x, P0y, P1x, P1y, P2x, P2y, P3x, P3y]
+        np.ndarray: A new NumPy array (or the out view) of format (N, 8) or (N+1, 8) [P0x, P0y, P1x, P1y, P2x, P2y, P3x, P3y]
     """
 
     if (mode not in {'HANDLE', 'HORIZONTAL'}):
         raise ValueError(f"ERROR: extend_bezsegs():Invalid mode '{mode}'. Must be 'HANDLE' or 'HORIZONTAL'.")
 
+    segments = as_bezsegs(segments, dtype)
+    float_dtype = segments.dtype
+
     # Determine Current Range and Endpoints
-    P0_orig = segments[0, 0:2].astype(float)
-    P1_orig = segments[0, 2:4].astype(float)
-    P2_orig = segments[-1, 4:6].astype(float)
-    P3_orig = segments[-1, 6:8].astype(float)
+    P0_orig = segments[0, 0:2]
+    P1_orig = segments[0, 2:4]
+    P2_orig = segments[-1, 4:6]
+    P3_orig = segments[-1, 6:8]
 
     min_x = P0_orig[0]
     max_x = P3_orig[0]
 
-    original_dtype = segments.dtype
-    float_dtype = np.promote_types(original_dtype, float)
-
     # Check if Extension is Needed at the first place.
     # xlocation is probably wthin our curve range...
     if (min_x - tolerance) <= xlocation <= (max_x + tolerance):
-        return segments
+        return write_bezsegs_out(segments, out)
 
-    # Calculate New Segment Anchors and Handles
-    new_segment_row = np.zeros(8, dtype=float_dtype)
+    # the new segment is written directly next to the original segments
+    final_segments = get_bezsegs_out(out, segments.shape[0] + 1, float_dtype, segments)
 
     # either we extend to the left..
     if (xlocation < min_x):
@@ -794,15 +832,15 @@ def extend_bezsegs(segments:np.ndarray, xlocation:float, mode:str='HANDLE', tole
                     dy = scale * Ty
                     new_y = anchor_point[1] + dy
 
-        P0_new = np.array([xlocation, new_y])
+        P0_new = np.array([xlocation, new_y], dtype=float_dtype)
 
         # Calculate handles based on 25% interpolation
         segment_vec = P3_new - P0_new
         P1_new = P0_new + 0.25 * segment_vec
         P2_new = P3_new - 0.25 * segment_vec # = P0_new + 0.75 * segment_vec
 
-        new_segment_row[:] = np.concatenate((P0_new, P1_new, P2_new, P3_new))
-        final_segments = np.vstack([new_segment_row, segments])
+        final_segments[0] = np.concatenate((P0_new, P1_new, P2_new, P3_new))
+        final_segments[1:] = segments
 
     # or we extend to the right.
     elif (xlocation > max_x):
@@ -828,23 +866,21 @@ def extend_bezsegs(segments:np.ndarray, xlocation:float, mode:str='HANDLE', tole
                     dy = scale * Ty
                     new_y = anchor_point[1] + dy
 
-        P3_new = np.array([xlocation, new_y])
+        P3_new = np.array([xlocation, new_y], dtype=float_dtype)
 
         # Calculate handles based on 25% interpolation
         segment_vec = P3_new - P0_new
         P1_new = P0_new + 0.25 * segment_vec
         P2_new = P3_new - 0.25 * segment_vec # = P0_new + 0.75 * segment_vec
 
-        new_segment_row[:] = np.concatenate((P0_new, P1_new, P2_new, P3_new))
-        final_segments = np.vstack([segments, new_segment_row])
+        final_segments[:-1] = segments
+        final_segments[-1] = np.concatenate((P0_new, P1_new, P2_new, P3_new))
 
     else:
         print(f"WARNING: extend_bezsegs(): xlocation {xlocation} is within the current range of the segments. Should've catch this earlier.")
-        return segments
+        return write_bezsegs_out(segments, out)
 
-    # return new segments with the same dtype as the original
-    final_dtype = np.promote_types(original_dtype, float_dtype)
-    return final_segments.astype(final_dtype, copy=False)
+    return final_segments
 
 
 # def mirror_bezsegs(segments:np.ndarray, mirror_x:bool=True, mirror_y:bool=False) -> np.ndarray:
@@ -875,7 +911,7 @@ def extend_bezsegs(segments:np.ndarray, xlocation:float, mode:str='HANDLE', tole
 #     return mirrored_segments # Return as float if casting back is unsafe/lossy
 
 
-def get_bezsegs_length(segments:np.ndarray, sampling_rate:int=100) -> np.ndarray:
+def get_bezsegs_length(segments:np.ndarray, sampling_rate:int=100, dtype=None) -> np.ndarray:
     """Compute the length of each cubic Bézier curve segment.
     We do that by sampling the curve and measuring the accumulated length between each point.
     Args:
@@ -885,19 +921,16 @@ def get_bezsegs_length(segments:np.ndarray, sampling_rate:int=100) -> np.ndarray
         np.ndarray: Array of shape (N,) where each element is the length of the corresponding segment.
         float: The total length of the curve.
     """
-    points_per_segment, _ = sample_bezsegs_with_t(segments, sampling_rate)
-    lengths = []
-    for pts in points_per_segment:
-        # Compute differences between consecutive sample points
-        diffs = np.diff(pts, axis=0)
-        # Euclidean distances for each subinterval
-        seg_len = np.linalg.norm(diffs, axis=1).sum()
-        lengths.append(seg_len)
-        continue
-    return np.array(lengths), np.sum(lengths)
+    segments = as_bezsegs(segments, dtype)
+    # lengths don't depend on the location, we sample each segment relative to its start point. in single precision,
+    # the rounding errors then scale with the segment size, instead of how far the curve sits from the origin.
+    points, _ = _sample_bezsegs_points(segments - np.tile(segments[:, 0:2], 4), sampling_rate)
+    # Euclidean distances between consecutive sample points, accumulated per segment
+    lengths = np.linalg.norm(np.diff(points, axis=1), axis=2).sum(axis=1)
+    return lengths, np.sum(lengths)
 
 
-def subdiv_project_bezsegs(segments:np.ndarray, segsref:np.ndarray, tolerance:float=1e-6,) -> tuple[np.ndarray, np.ndarray]:
+def subdiv_project_bezsegs(segments:np.ndarray, segsref:np.ndarray, tolerance:float=1e-6, dtype=None,) -> tuple[np.ndarray, np.ndarray]:
     """Subdivide a bezier segments so it matches the same number of knots as another curve.
     We subdivide by unrolling both curves into the same x bounds space in order to choose the same relative x locations to cut.
     Args:
@@ -911,6 +944,9 @@ def subdiv_project_bezsegs(segments:np.ndarray, segsref:np.ndarray, tolerance:fl
         print("WARNING: subdiv_project_bezsegs(): segments or segsref is empty.")
         return None
 
+    dtype = get_bezsegs_dtype(segments, segsref, dtype=dtype)
+    segments, segsref = as_bezsegs(segments, dtype), as_bezsegs(segsref, dtype)
+
     # 1. Unrolling both curves into the x axis. Is equal to calculating their cumulative length.
     # get the lengths of our segments/total curve
     segO_lengths, segO_total_length = get_bezsegs_length(segments)
@@ -958,7 +994,7 @@ def subdiv_project_bezsegs(segments:np.ndarray, segsref:np.ndarray, tolerance:fl
     addedsegs = 0
     for i,t_values in enumerate(all_t_values):
         for t_val in t_values:
-            t_map = np.zeros(segments.shape[0], dtype=np.float64)
+            t_map = np.zeros(segments.shape[0], dtype=dtype)
             # another problem arise, the t-map need to be adjusted on the go 
             # the more we add segments behind us.
             t_map[i+addedsegs] = t_val
@@ -1045,7 +1081,7 @@ def subdiv_project_bezsegs(segments:np.ndarray, segsref:np.ndarray, tolerance:fl
 #     return segsMod
 
 
-def lerp_bezsegs(segsA:np.ndarray, segsB:np.ndarray, mixfac:float, cut_precision:int=100, tolerance:float=1e-6) -> np.ndarray:
+def lerp_bezsegs(segsA:np.ndarray, segsB:np.ndarray, mixfac:float, cut_precision:int=100, tolerance:float=1e-6, dtype=None, out=None) -> np.ndarray:
     """
     Interpolates linearly between two Bézier curve segment arrays.
     If the number of segments differs, new segments will be added at similar X locations.
@@ -1054,20 +1090,28 @@ def lerp_bezsegs(segsA:np.ndarray, segsB:np.ndarray, mixfac:float, cut_precision
         mixfac (float): The mixing factor (0.0 returns segsA, 1.0 returns segsB).
         cut_precision (int): Sampling rate used by subdiv_project_bezsegs if alignment is needed.
         tolerance (float): Tolerance for comparing mixfac to 0 and 1, and used internally by subdiv_project_bezsegs.
+        out (np.ndarray): Optional array to write the result to, see get_bezsegs_out().
+                          When both curves have the same number of segments, the mix allocates nothing.
     Returns:
-        np.ndarray: The resulting mixed Bézier curve as an (L, 8) NumPy array.
+        np.ndarray: The resulting mixed Bézier curve as an (L, 8) NumPy array (or the out view).
                     L will be the length of segsA/segsB after potential matching.
     """
 
     # Clamp mixfac just in case it's slightly outside [0, 1] after tolerance check
-    mixfac = np.clip(mixfac, 0.0, 1.0)
+    # NOTE kept as a python float, a numpy float64 scalar would promote float32 curves.
+    mixfac = min(max(float(mixfac), 0.0), 1.0)
+
+    # both curves are worked in the same dtype
+    dtype = get_bezsegs_dtype(segsA, segsB, dtype=dtype)
+    segsA, segsB = as_bezsegs(segsA, dtype), as_bezsegs(segsB, dtype)
+    inputs = (segsA, segsB)
 
     # Ensure Curves have the same numbers of segments by subdivide in place at key X locations.
     if (segsA.shape[0] != segsB.shape[0]):
         try:
             # Call subdiv_project_bezsegs, this will cut new segments, so we have the same number of segments.
-            NsegsA = subdiv_project_bezsegs(segsA, segsB, tolerance=tolerance,)
-            NsegsB = subdiv_project_bezsegs(segsB, segsA, tolerance=tolerance,)
+            NsegsA = subdiv_project_bezsegs(segsA, segsB, tolerance=tolerance, dtype=dtype,)
+            NsegsB = subdiv_project_bezsegs(segsB, segsA, tolerance=tolerance, dtype=dtype,)
             segsA, segsB = NsegsA, NsegsB
             # Verify matching worked (should have same length now)
             if (segsA.shape[0] != segsB.shape[0]):
@@ -1079,9 +1123,9 @@ def lerp_bezsegs(segsA:np.ndarray, segsB:np.ndarray, mixfac:float, cut_precision
 
     # Handle Edge Cases for mixfac
     if (abs(mixfac - 0.0) < tolerance):
-        return segsA
+        return write_bezsegs_out(segsA, out, *inputs)
     if (abs(mixfac - 1.0) < tolerance):
-        return segsB
+        return write_bezsegs_out(segsB, out, *inputs)
 
     # Check for empty arrays after potential matching
     if (segsA.size == 0) or (segsB.size == 0):
@@ -1089,9 +1133,12 @@ def lerp_bezsegs(segsA:np.ndarray, segsB:np.ndarray, mixfac:float, cut_precision
          return None
 
     # Perform Optimized NumPy Lerp
+    mixed_segments = get_bezsegs_out(out, segsA.shape[0], dtype, *inputs)
     try:
-        # Linear interpolation: result = A * (1 - factor) + B * factor. Ensure float.
-        mixed_segments = segsA.astype(float) * (1.0 - mixfac) + segsB.astype(float) * mixfac
+        # Linear interpolation: result = A + (B - A) * factor, computed in the result array without temporaries.
+        np.subtract(segsB, segsA, out=mixed_segments)
+        np.multiply(mixed_segments, mixfac, out=mixed_segments)
+        np.add(mixed_segments, segsA, out=mixed_segments)
     except Exception as e:
         print(f"ERROR: during segment interpolation: {e}.")
         return None
@@ -1099,7 +1146,7 @@ def lerp_bezsegs(segsA:np.ndarray, segsB:np.ndarray, mixfac:float, cut_precision
     return mixed_segments
 
 
-def looped_offset_bezsegs(segments:np.ndarray, offset:float, cut_precision:int=100, tolerance:float=1e-6) -> np.ndarray:
+def looped_offset_bezsegs(segments:np.ndarray, offset:float, cut_precision:int=100, tolerance:float=1e-6, dtype=None, out=None) -> np.ndarray:
     """
     Offsets a monotonic Bézier curve segment array horizontally, wrapping the curve around its original x-range.
     How it works:
@@ -1113,16 +1160,18 @@ def looped_offset_bezsegs(segments:np.ndarray, offset:float, cut_precision:int=1
                         right, negative shifts left.
         cut_precision (int): The sampling rate precision used by cut_bezsegs.
         tolerance (float): Tolerance for float comparisons and cutting.
+        out (np.ndarray): Optional array to write the result to, see get_bezsegs_out(). Needs N+1 rows.
     Returns:
-        np.ndarray: The looped and offset Bézier curve segments with same bounds as the input.
+        np.ndarray: The looped and offset Bézier curve segments with same bounds as the input (or the out view).
     """
 
     # ensure our segments are monotonic
+    segments = as_bezsegs(segments, dtype)
     mono_segments = ensure_monotonic_bezsegs(segments)
 
     # if offset is 0.0, we don't need to loop or cut anything
     if (offset == 0.0):
-        return mono_segments
+        return write_bezsegs_out(mono_segments, out, segments)
 
     # Calculate Range and Effective Offset
     start_xloc = mono_segments[0, 0]
@@ -1131,11 +1180,11 @@ def looped_offset_bezsegs(segments:np.ndarray, offset:float, cut_precision:int=1
 
     if distance <= tolerance:
         print("Warning: Curve has zero or negligible width. Cannot loop.")
-        return mono_segments # Return the monotonic version
+        return write_bezsegs_out(mono_segments, out, segments) # Return the monotonic version
 
     # Calculate the effective offset within the curve's width
     # fmod is generally better for float modulo
-    effective_offset = np.fmod(offset, distance)
+    effective_offset = np.fmod(float(offset), distance)
 
     # Determine the location where the cut needs to happen in the *original* monotonic curve
     cut_location = start_xloc + effective_offset
@@ -1178,8 +1227,9 @@ def looped_offset_bezsegs(segments:np.ndarray, offset:float, cut_precision:int=1
         return None
 
     # 3. Move the cutted segments to start/end
-    part1 = cut_segments[:split_idx].astype(float, copy=True) # Part before cut
-    part2 = cut_segments[split_idx:].astype(float, copy=True) # Part after cut
+    # NOTE cut_bezsegs() always return a new array, we can modify its parts.
+    part1 = cut_segments[:split_idx] # Part before cut
+    part2 = cut_segments[split_idx:] # Part after cut
 
     # Create translation vector (only affects X)
     if (effective_offset > 0):
@@ -1188,8 +1238,6 @@ def looped_offset_bezsegs(segments:np.ndarray, offset:float, cut_precision:int=1
         part1[:, 2] += distance # P1x
         part1[:, 4] += distance # P2x
         part1[:, 6] += distance # P3x
-        # Combine: part2 followed by translated part1
-        final_segments = np.vstack([part2, part1])
 
     else: # effective_offset < 0
         # Part 2 (after cut) moves to the beginning, shifted left by distance
@@ -1197,8 +1245,11 @@ def looped_offset_bezsegs(segments:np.ndarray, offset:float, cut_precision:int=1
         part2[:, 2] -= distance # P1x
         part2[:, 4] -= distance # P2x
         part2[:, 6] -= distance # P3x
-        # Combine: translated part2 followed by part1
-        final_segments = np.vstack([part2, part1])
+
+    # Combine: part2 followed by part1, written next to each other in the result
+    final_segments = get_bezsegs_out(out, cut_segments.shape[0], cut_segments.dtype, segments)
+    final_segments[:part2.shape[0]] = part2
+    final_segments[part2.shape[0]:] = part1
 
     # 4. move the whole segments back to the original start/end
     new_start  = final_segments[0, 0]
@@ -0,0 +1,154 @@
+# SPDX-FileCopyrightText: 2025 Natalie Cuthbert <natalie@cuthbert.co.za>
+#
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+
+# NOTE compilation layer for the python expression nodes ('AUTORIZATION_REQUIRED' nodes).
+# these nodes are re-evaluated on each depsgraph or frame signal, parsing & compiling their
+# expression every time is wasteful, as the expression rarely changes.
+# - code objects are cached per (expression, tokens mapping, filename, mode).
+# - the evaluation namespace is cached per node, and rebuilt only when its key changes.
+
+
+from functools import lru_cache, reduce
+
+from .str_utils import replace_exact_tokens
+
+
+# {(tree name, node name): (namespace key, namespace dict)}
+NODES_NAMESPACES = {}
+
+
+@lru_cache(maxsize=512)
+def _compile_expression(source:str, tokens:tuple, filename:str, mode:str):
+    if (tokens):
+        source = replace_exact_tokens(source, dict(tokens))
+    return compile(source, filename, mode)
+
+
+def get_compiled_expression(source:str, tokens_mapping:dict=None, filename:str='<expression>', mode:str='eval',):
+    """get the compiled code object of an expression, after replacing its tokens by the tokens_mapping.
+    The result is cached, a SyntaxError is raised as usual, see str_utils.prettyError()."""
+
+    tokens = tuple(sorted(tokens_mapping.items())) if tokens_mapping else ()
+    return _compile_expression(source, tokens, filename, mode)
+
+
+def get_node_namespace(node, key, builder) -> dict:
+    """get the cached evaluation namespace of a node, (re)built with builder() if the key changed.
+    - key: a hashable describing what the namespace depends on, ex: the user script name & modules.
+    - builder: a function returning a fresh namespace dict."""
+
+    nodekey = (node.id_data.name, node.name)
+
+    cached = NODES_NAMESPACES.get(nodekey)
+    if (cached is not None) and (cached[0]==key):
+        return cached[1]
+
+    namespace = builder()
+    NODES_NAMESPACES[nodekey] = (key, namespace)
+    return namespace
+
+
+def clear_expressions_cache(node=None) -> None:
+    """clear the namespace of the given node, or all namespaces and compiled expressions if None"""
+
+    if (node is not None):
+        NODES_NAMESPACES.pop((node.id_data.name, node.name), None)
+        return None
+
+    NODES_NAMESPACES.clear()
+    _compile_expression.cache_clear()
+    return None
+
+
+def evaluate_expression(node, source:str, key, builder, tokens_mapping:dict=None, filename:str='<expression>',):
+    """evaluate a node expression, using the cached code object and node namespace.
+    NOTE the namespace is shared between evaluations, don't rely on it being clean."""
+
+    code = get_compiled_expression(source, tokens_mapping=tokens_mapping, filename=filename, mode='eval',)
+    namespace = get_node_namespace(node, key, builder)
+    return eval(code, namespace)
+
+
+# NOTE vectorized evaluation mode: one expression is evaluated once over arrays of inputs (per bone, per frame, per instance),
+# instead of once per scalar. The expression tokens are bound to numpy array columns.
+# - the usual math functions names are mapped to their numpy ufuncs equivalent, {name: (numpy name, max number of arguments)}.
+#   NOTE numpy ufuncs take their extra positional argument as 'out', ex: minimum(a, b, c) would write in 'c', one of our
+#   input columns. The functions are wrapped to reject any argument past their arity, and any keyword argument.
+# - min/max reduce over any number of arguments, like their python builtins.
+# - python conditionals (if/else, and/or) won't work on arrays, use where(cond, a, b) instead.
+VECTORIZED_FUNCTIONS = {
+    'sin':('sin',1), 'cos':('cos',1), 'tan':('tan',1), 'asin':('arcsin',1), 'acos':('arccos',1), 'atan':('arctan',1), 'atan2':('arctan2',2),
+    'sinh':('sinh',1), 'cosh':('cosh',1), 'tanh':('tanh',1), 'sqrt':('sqrt',1), 'exp':('exp',1), 'log':('log',1), 'log10':('log10',1), 'log2':('log2',1),
+    'abs':('abs',1), 'floor':('floor',1), 'ceil':('ceil',1), 'round':('round',2), 'sign':('sign',1), 'pow':('power',2),
+    'clip':('clip',3), 'where':('where',3), 'radians':('radians',1), 'degrees':('degrees',1), 'hypot':('hypot',2), 'mod':('mod',2), 'fmod':('fmod',2),
+}
+VECTORIZED_REDUCTIONS = {'min':'minimum', 'max':'maximum',}
+
+
+def _fixed_arity_function(name:str, func, nargs:int):
+    """wrap a numpy function so it can't receive more than nargs positional arguments, nor any keyword argument"""
+
+    def wrapper(*args):
+        if (len(args) > nargs):
+            raise TypeError(f"{name}() takes at most {nargs} argument(s) ({len(args)} given)")
+        return func(*args)
+
+    wrapper.__name__ = name
+    return wrapper
+
+
+def _reduce_function(name:str, func):
+    """wrap a binary numpy function into a reduction over any number of arguments"""
+
+    def wrapper(*args):
+        if (not args):
+            raise TypeError(f"{name}() expected at least 1 argument, got 0")
+        return reduce(func, args)
+
+    wrapper.__name__ = name
+    return wrapper
+
+
+def get_vectorized_namespace() -> dict:
+    """get a namespace of numpy ufuncs for the vectorized evaluation mode"""
+
+    # numpy is imported on first use, not on plugin registration
+    import numpy as np
+
+    namespace = {name: _fixed_arity_function(name, getattr(np, npname), nargs) for name, (npname, nargs) in VECTORIZED_FUNCTIONS.items()}
+    namespace.update({name: _reduce_function(name, getattr(np, npname)) for name, npname in VECTORIZED_REDUCTIONS.items()})
+    namespace.update({'np':np, 'pi':np.pi, 'e':np.e, '__builtins__':{}})
+    return namespace
+
+
+def evaluate_expression_vectorized(source:str, columns:dict, filename:str='<expression>',):
+    """evaluate an expression once over arrays of inputs, with numpy semantics.
+    - columns: {token: array}. Each token of the expression is bound to its array column.
+      all columns should have the same length, or be broadcastable together.
+    Return a numpy array of the results, broadcasted to the columns shape."""
+
+    import numpy as np
+
+    # the tokens are replaced by safe identifiers, as bone names for example might not be valid python names.
+    tokens_mapping = {token: f"_col{i}" for i,token in enumerate(sorted(columns))}
+    code = get_compiled_expression(source, tokens_mapping=tokens_mapping, filename=filename, mode='eval',)
+
+    namespace = get_vectorized_namespace()
+    arrays = []
+    for token, identifier in tokens_mapping.items():
+        arr = np.asarray(columns[token])
+        # read-only views, so the expression can't write in the caller arrays, ex: through np.minimum(a, b, out=c)
+        view = arr.view()
+        view.flags.writeable = False
+        namespace[identifier] = view
+        arrays.append(arr)
+        continue
+
+    result = np.asarray(eval(code, namespace))
+    if (arrays):
+        shape = np.broadcast_shapes(result.shape, *(a.shape for a in arrays))
+        result = np.broadcast_to(result, shape)
+
+    return result
@@ -3,8 +3,10 @@
 # SPDX-License-Identifier: GPL-2.0-or-later
 
 
+import sys
 import types
 import typing
+import importlib.util
 from collections import namedtuple
 
 
@@ -48,3 +50,23 @@ def is_annotation_compliant(value, annotated_type) -> bool:
     # Otherwise (e.g. a generic like List[str]), fallback to a direct check
     # or you could expand this if you need deeper generics logic
     return isinstance(value, annotated_type)
+
+
+def lazy_import(fullname:str) -> types.ModuleType:
+    """Import a module lazily, its code (and its own imports) will only be executed on first attribute access.
+    Useful for heavy modules that are not needed on addon registration. ex: lazy_import(f"{__package__}.bezier2d_utils")"""
+
+    if (fullname in sys.modules):
+        return sys.modules[fullname]
+
+    spec = importlib.util.find_spec(fullname)
+    if (spec is None):
+        raise ImportError(f"lazy_import(): module '{fullname}' not found")
+
+    loader = importlib.util.LazyLoader(spec.loader)
+    spec.loader = loader
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[fullname] = module
+    loader.exec_module(module)
+
+    return module
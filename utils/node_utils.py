@@ -13,8 +13,10 @@
 
 import bpy 
 
-import numpy as np
+import os
+from array import array
 from math import hypot
+from contextlib import contextmanager
 from mathutils import Vector, Matrix, Quaternion
 
 from .draw_utils import get_dpifac
@@ -68,26 +70,69 @@ def get_all_nodes(ignore_ng_name:str="RigNodes", approxmatch_idnames:str="", exa
     return nodes
 
 
+# NOTE names of the nodetrees waiting for a refresh signal.
+# the refresh requests done within a refresh_batch() are coalesced, each nodetree is tagged once leaving the batch.
+# the batch is flushed synchronously, so the frame being evaluated already sees the new state, even in background renders.
+REFRESH_QUEUE = set()
+REFRESH_BATCH_DEPTH = 0
+
+
+def flush_refresh_queue() -> None:
+    """send a refresh signal to every queued nodetree at once"""
+
+    try:
+        for name in REFRESH_QUEUE:
+            node_tree = bpy.data.node_groups.get(name)
+            if (node_tree is not None):
+                node_tree.update_tag()
+            continue
+    finally:
+        # a failing signal should never block the next ones
+        REFRESH_QUEUE.clear()
+
+    return None
+
+
+@contextmanager
+def refresh_batch():
+    """coalesce the refresh signals sent within the context, ex: the handlers dispatch of our custom nodes.
+    ex: `with refresh_batch(): for n in nodes: n.update_all()`"""
+
+    global REFRESH_BATCH_DEPTH
+    REFRESH_BATCH_DEPTH += 1
+    try:
+        yield None
+    finally:
+        REFRESH_BATCH_DEPTH -= 1
+        if (REFRESH_BATCH_DEPTH==0):
+            flush_refresh_queue()
+
+    return None
+
+
+def queue_refresh_signal(node_tree) -> None:
+    """tag a nodetree for re-evaluation, without touching its topology. Deferred to the end of the current refresh_batch() if any"""
+
+    if (REFRESH_BATCH_DEPTH==0):
+        node_tree.update_tag()
+        return None
+
+    REFRESH_QUEUE.add(node_tree.name)
+    return None
+
+
 def send_refresh_signal(socket):
-    """lazy trick to send a refresh signal to the nodetree"""
+    """send a refresh signal to the nodetree of a socket, if the socket is used.
+    This is the entry point for the custom nodes, the signals are batched with queue_refresh_signal()"""
+
+    # NOTE we used to unlink/relink all socket links, which is costly and sends many topology updates.
+    # now the tree is simply tagged for an update. Many signals sent within the same refresh_batch() are coalesced.
 
     if (not socket.links):
         return None
 
-    node_tree = socket.id_data 
-    
-    links_data = []
-    for link in socket.links:
-        links_data.append((link.to_socket, link.to_node))
-    
-    # Perform unlink/relink
-    links_to_remove = list(socket.links)
-    for link in links_to_remove:
-        node_tree.links.remove(link)
-    
-    for to_socket, to_node in links_data:
-        node_tree.links.new(socket, to_socket)
-    
+    queue_refresh_signal(socket.id_data)
+
     return None
 
 
@@ -196,15 +241,14 @@ def get_node_objusers(node) -> set:
 def get_node_absolute_location(node) -> Vector:
     """find the location of the node in global space"""
 
-    if (node.parent is None):
-        return node.location.copy()
-
     #if there's a frame, then the API is false
+    # NOTE not memoized, a node can be moved or re-parented by operators without notifying the msgbus.
     loc = node.location.copy()
 
-    while (node.parent is not None):
-        loc += node.parent.location
-        node = node.parent
+    parent = node.parent
+    while (parent is not None):
+        loc += parent.location
+        parent = parent.parent
         continue
 
     return loc
@@ -312,41 +356,138 @@ def get_ng_socket_by_name(ng, socket_name:str='Foo', in_out:str='OUTPUT',) -> li
     return r
 
 
+# NOTE per nodegroup cache of the interface sockets positions, as searching the interface is costly.
+# - stored as {ng.session_uid: {'itemcount':int, 'INPUT':{...}, 'OUTPUT':{...}}}
+# - each in_out entry is {identifier:(socket index, interface item index)}. indices only, never the RNA objects,
+#   as an interface item or socket removed (undo, user edits..) could crash blender if accessed.
+# - the RNA objects are looked up again on each call with get_ng_interface_item(), and their identifiers verified.
+#   a mismatch (sockets reordered, removed & added..) rebuilds the cache of the nodegroup.
+# - functions of this module editing the interface will clear the cache of the nodegroup.
+NG_INTERFACE_CACHE = {}
+
+
+def clear_ng_interface_cache(ng=None) -> None:
+    """clear the interface sockets cache of the given nodegroup, or of all nodegroups if None"""
+
+    if (ng is None):
+        NG_INTERFACE_CACHE.clear()
+        return None
+
+    NG_INTERFACE_CACHE.pop(ng.session_uid, None)
+    return None
+
+
+def get_ng_interface_sockets(ng, in_out:str='OUTPUT',):
+    """for a NodeCustomGroup: get the NodeSockets of the group input or output node"""
+
+    match in_out:
+        case 'OUTPUT':
+            return ng.nodes["Group Output"].inputs
+        case 'INPUT':
+            return ng.nodes["Group Input"].outputs
+        case _:
+            raise Exception("get_ng_interface_sockets(): in_out arg not valid")
+
+
+def get_ng_interface_map(ng, in_out:str='OUTPUT', rebuild:bool=False,) -> dict:
+    """for a NodeCustomGroup: get a map of the interface sockets positions {identifier:(socket index, interface item index)}
+    the map is built once for all sockets, then cached until the interface changes. Use get_ng_interface_item() to access the sockets."""
+
+    itemcount = len(ng.interface.items_tree)
+    cache = NG_INTERFACE_CACHE.get(ng.session_uid)
+    if (not rebuild) and (cache is not None) and (cache['itemcount']==itemcount):
+        return cache[in_out]
+
+    cache = {'itemcount':itemcount}
+
+    itemindices = {}
+    for j,itm in enumerate(ng.interface.items_tree):
+        if (not hasattr(itm,'identifier')):
+            continue
+        if (itm.identifier in itemindices):
+            print(f"WARNING: get_ng_interface_map: multiple sockets with identifier '{itm.identifier}' exists")
+            continue
+        itemindices[itm.identifier] = j
+        continue
+
+    for io in ('OUTPUT', 'INPUT'):
+        indices = {}
+        for i,s in enumerate(get_ng_interface_sockets(ng, in_out=io)):
+            j = itemindices.get(s.identifier)
+            if (j is not None):
+                indices[s.identifier] = (i, j)
+            continue
+        cache[io] = indices
+        continue
+
+    NG_INTERFACE_CACHE[ng.session_uid] = cache
+    return cache[in_out]
+
+
+def get_ng_interface_items(ng, identifiers, in_out:str='OUTPUT',) -> dict:
+    """for a NodeCustomGroup: get many sockets as {identifier:(socket index, NodeTreeInterfaceSocket, NodeSocket)}, missing ones are omitted.
+    the RNA objects are looked up from the cached positions and verified, the cache is rebuilt once if outdated"""
+
+    result, missing = {}, list(identifiers)
+
+    for rebuild in (False, True):
+        ngmap = get_ng_interface_map(ng, in_out=in_out, rebuild=rebuild)
+        sockets, items = get_ng_interface_sockets(ng, in_out=in_out), ng.interface.items_tree
+        socketcount, itemcount = len(sockets), len(items)
+
+        outdated = []
+        for identifier in missing:
+            indices = ngmap.get(identifier)
+            if (indices is not None):
+                i, j = indices
+                if (i < socketcount) and (j < itemcount):
+                    socket, sockui = sockets[i], items[j]
+                    if (socket.identifier==identifier) and (getattr(sockui,'identifier',None)==identifier):
+                        result[identifier] = (i, sockui, socket)
+                        continue
+            outdated.append(identifier)
+            continue
+
+        missing = outdated
+        if (not missing):
+            break
+        continue
+
+    return result
+
+
+def get_ng_interface_item(ng, identifier:str, in_out:str='OUTPUT',):
+    """for a NodeCustomGroup: get a socket as (socket index, NodeTreeInterfaceSocket, NodeSocket) from its identifier, or None if not found"""
+
+    return get_ng_interface_items(ng, (identifier,), in_out=in_out).get(identifier)
+
+
 def get_socketui_from_ng_socket(ng, idx:int=None, in_out:str='OUTPUT', identifier:str=None,):
     """for a NodeCustomGroup: return a given socket index as an interface item, either find the socket by it's index, name or socketidentifier"""
-    
+
     if (identifier is None):
-        sockets = ng.nodes["Group Output"].inputs if (in_out=='OUTPUT') else ng.nodes["Group Input"].outputs
-        for i,s in enumerate(sockets):
-            if (i==idx):
-                identifier = s.identifier
-                break
+        sockets = get_ng_interface_sockets(ng, in_out=in_out)
+        if (idx is not None) and (0 <= idx < len(sockets)):
+            identifier = sockets[idx].identifier
 
     if (identifier is None):
         raise Exception("ERROR: get_socketui_from_ng_socket(): couldn't retrieve socket identifier..")
     
     #then we retrieve thesocket interface item from identifier
-    sockui = None
-    findgen = [itm for itm in ng.interface.items_tree
-               if hasattr(itm,'identifier') and (itm.identifier == identifier)]
-    if len(findgen):
-        sockui = findgen[0]
-        if len(findgen)>1:
-            print(f"WARNING: get_socketui_from_ng_socket: multiple sockets with identifier '{identifier}' exists")
-
-    if (sockui is None):
+    itm = get_ng_interface_item(ng, identifier, in_out=in_out)
+
+    if (itm is None):
         raise Exception("ERROR: get_socketui_from_ng_socket(): couldn't retrieve socket interface item..")
     
-    return sockui
+    return itm[1]
 
 
 def get_ng_socket_from_socketui(ng, sockui, in_out:str='OUTPUT'):
     """for a NodeCustomGroup: retrieve NodeSocket from a NodeTreeInterfaceSocket type"""
     
-    sockets = ng.nodes["Group Output"].inputs if (in_out=='OUTPUT') else ng.nodes["Group Input"].outputs
-    for s in sockets:
-        if (s.identifier == sockui.identifier):
-            return s
+    itm = get_ng_interface_item(ng, sockui.identifier, in_out=in_out)
+    if (itm is not None):
+        return itm[2]
     raise Exception('NodeSocket from nodetree.interface.items_tree does not exist?')
 
 
@@ -362,6 +503,57 @@ def get_ng_socket_defvalue(ng, idx:int, in_out:str='OUTPUT',):
             raise Exception("get_ng_socket_defvalue(): in_out arg not valid")
 
 
+def flatten_socket_value(value) -> tuple:
+    """flatten a socket value (number, vector, color, euler, quaternion, matrix rows..) into a tuple of scalars"""
+
+    if (type(value) is ColorRGBA):
+        return value[:]
+    if isinstance(value, (int, float, str)) or (not hasattr(value, '__iter__')):
+        return (value,)
+
+    flat = []
+    for v in value:
+        if hasattr(v, '__iter__') and (not isinstance(v, str)):
+              flat.extend(v)
+        else: flat.append(v)
+        continue
+
+    return tuple(flat)
+
+
+def is_socket_value_equal(socket_type:str, current, value,) -> bool:
+    """compare two values of a socket, depending on the socket.type. 
+    Float based values are compared at float32 resolution, as blender store them in single precision.
+    NOTE Vector/Color won't compare with a simple '!=', hence the need for this function."""
+
+    match socket_type:
+
+        case 'VALUE'|'VECTOR'|'RGBA'|'ROTATION'|'MATRIX':
+            a, b = flatten_socket_value(current), flatten_socket_value(value)
+            if (len(a)!=len(b)):
+                return False
+            # round-trip both sides through float32, the exact value blender would store
+            return (array('f', a)==array('f', b))
+
+        case _:
+            return (current==value)
+
+
+def set_socket_defvalue(socket, value,) -> bool:
+    """set the default_value of a socket, only if the value is not already set.
+    Writing a value dirties the nodetree and triggers a depsgraph update, we avoid that if we can.
+    Return True if the value has been written."""
+
+    if (type(value) is ColorRGBA):
+        value = value[:]
+
+    if is_socket_value_equal(socket.type, socket.default_value, value):
+        return False
+
+    socket.default_value = value
+    return True
+
+
 def set_ng_socket_defvalue(ng, idx:int | None=None, socket=None, socket_name:str='', in_out:str='OUTPUT', value=None, node=None,):
     """for a NodeCustomGroup: set the value of the given nodegroups inputs or output sockets"""
 
@@ -419,8 +611,7 @@ def set_ng_socket_defvalue(ng, idx:int | None=None, socket=None, socket_name:str
                         ng.links.new(defnod.outputs[0], socket)
                     #assign values
                     for sock,v in zip(defnod.inputs, value):
-                        if (sock.default_value!=v):
-                            sock.default_value = v
+                        set_socket_defvalue(sock, v)
 
                 case 'MATRIX':
                     defnodname = f"D|Matrix|outputs[{idx}]"
@@ -440,8 +631,7 @@ def set_ng_socket_defvalue(ng, idx:int | None=None, socket=None, socket_name:str
                     #assign flatten values
                     colflatten = [v for col in zip(*value) for v in col]
                     for sock,v in zip(defnod.inputs, colflatten):
-                        if (sock.default_value!=v):
-                            sock.default_value = v
+                        set_socket_defvalue(sock, v)
 
                 case _:
                     #we remove any unwanted links, if exists
@@ -449,9 +639,7 @@ def set_ng_socket_defvalue(ng, idx:int | None=None, socket=None, socket_name:str
                         for l in socket.links:
                             ng.links.remove(l)
                     #we set def value, simply..
-                    #NOTE Vector/Color won't like that, will always be False.. need to use [:]!=[:] for two vec..
-                    if (socket.default_value!=value):
-                        socket.default_value = value
+                    set_socket_defvalue(socket, value)
 
         case 'INPUT':
 
@@ -469,10 +657,143 @@ def set_ng_socket_defvalue(ng, idx:int | None=None, socket=None, socket_name:str
             #rotation and matrixes don't have a default value
             if (instancesocket.type in {'ROTATION','MATRIX'}):
                 return None
-            
-            #NOTE Vector/Color won't like that, will always be False.. need to use [:]!=[:] for two vec..
-            if (instancesocket.default_value!=value):
-                instancesocket.default_value = value
+
+            set_socket_defvalue(instancesocket, value)
+
+    return None
+
+
+def set_ng_socket_defvalues(ng, values:dict, in_out:str='OUTPUT', node=None,) -> None:
+    """for a NodeCustomGroup: bulk set the values of many nodegroups inputs or outputs sockets at once.
+    - values: {socket identifier: value}
+    - node: the node instance to tweak the input values to, if in_out is 'INPUT'
+    values already set are skipped, so we don't send needless updates to the depsgraph."""
+
+    assert in_out in {'INPUT','OUTPUT'}, "set_ng_socket_defvalues(): in_out arg not valid"
+
+    items = get_ng_interface_items(ng, values.keys(), in_out=in_out)
+
+    for identifier, value in values.items():
+
+        itm = items.get(identifier)
+        if (itm is None):
+            raise Exception(f"ERROR: set_ng_socket_defvalues(): socket '{identifier}' not found in nodegroup '{ng.name}'")
+        idx, _, socket = itm
+
+        match in_out:
+
+            case 'OUTPUT':
+                #these types need special nodes, see set_ng_socket_defvalue()
+                if (socket.type in {'ROTATION','MATRIX'}) or (socket.links):
+                    set_ng_socket_defvalue(ng, idx=idx, socket=socket, in_out=in_out, value=value,)
+                    continue
+                set_socket_defvalue(socket, value)
+
+            case 'INPUT':
+                assert node is not None, "for inputs please pass a node instance to tweak the input values to"
+                instancesocket = node.inputs[idx]
+                #rotation and matrixes don't have a default value
+                if (instancesocket.type in {'ROTATION','MATRIX'}):
+                    continue
+                set_socket_defvalue(instancesocket, value)
+
+        continue
+
+    return None
+
+
+# NOTE index of the node instances using a nodegroup, across all nodetrees of the file.
+# - stored as {ng.session_uid: {'users':int, 'instances':[(tree name, node name),]}}
+# - the index is built in one single pass for all nodegroups.
+# - a change of ng.users means instances were added or removed, the index is then rebuilt.
+NG_INSTANCES_INDEX = {}
+
+
+def clear_ng_instances_index() -> None:
+    """clear the nodegroups instances index"""
+
+    NG_INSTANCES_INDEX.clear()
+    return None
+
+
+def build_ng_instances_index() -> None:
+    """index the node instances of every nodegroup in the file, in a single pass"""
+
+    NG_INSTANCES_INDEX.clear()
+
+    found = {}
+    for tree in bpy.data.node_groups:
+        for n in tree.nodes:
+            subng = getattr(n, 'node_tree', None)
+            if (subng is not None):
+                found.setdefault(subng, []).append((tree.name, n.name))
+            continue
+        continue
+
+    for subng, instances in found.items():
+        NG_INSTANCES_INDEX[subng.session_uid] = {'users':subng.users, 'instances':instances}
+        continue
+
+    return None
+
+
+def get_ng_instances(ng) -> list:
+    """for a NodeCustomGroup: get all the nodes instances of the given nodegroup, using an index"""
+
+    for attempt in range(2):
+
+        entry = NG_INSTANCES_INDEX.get(ng.session_uid)
+        if (entry is None) or (entry['users']!=ng.users):
+            if (attempt==0):
+                build_ng_instances_index()
+                continue
+            return []
+
+        nodes = []
+        for treename, nodename in entry['instances']:
+            tree = bpy.data.node_groups.get(treename)
+            node = tree.nodes.get(nodename) if (tree is not None) else None
+            #renamed or removed? the index is outdated
+            if (node is None) or (getattr(node, 'node_tree', None)!=ng):
+                nodes = None
+                break
+            nodes.append(node)
+            continue
+
+        if (nodes is not None):
+            return nodes
+        build_ng_instances_index()
+        continue
+
+    return []
+
+
+def set_ng_instances_defvalues(ng, values:dict,) -> None:
+    """for a NodeCustomGroup: set the inputs values of every node instances of the given nodegroup in the file.
+    - values: {socket identifier: value}
+    values already set are skipped, so we don't send needless updates to the depsgraph."""
+
+    items = get_ng_interface_items(ng, values.keys(), in_out='INPUT')
+
+    indexed = []
+    for identifier, value in values.items():
+        itm = items.get(identifier)
+        if (itm is None):
+            raise Exception(f"ERROR: set_ng_instances_defvalues(): socket '{identifier}' not found in nodegroup '{ng.name}'")
+        if (type(value) is ColorRGBA):
+            value = value[:]
+        indexed.append((itm[0], value))
+        continue
+
+    for node in get_ng_instances(ng):
+        for idx, value in indexed:
+            instancesocket = node.inputs[idx]
+            #rotation and matrixes don't have a default value
+            if (instancesocket.type in {'ROTATION','MATRIX'}):
+                continue
+            set_socket_defvalue(instancesocket, value)
+            continue
+        continue
 
     return None
 
@@ -502,6 +823,8 @@ def set_ng_socket_type(ng, idx:int=None, in_out:str='OUTPUT', socket_type:str="N
     sockui = get_socketui_from_ng_socket(ng, idx=idx, in_out=in_out, identifier=identifier,)
     if (sockui.socket_type!=socket_type):
         sockui.socket_type = socket_type
+        #the original NodeSocket is now dirty
+        clear_ng_interface_cache(ng)
     return get_ng_socket_from_socketui(ng, sockui, in_out=in_out)
 
 
@@ -566,6 +889,7 @@ def create_ng_socket(ng, in_out:str='OUTPUT', socket_type:str="NodeSocketFloat",
     socket_type = crosseditor_socktype_adjust(socket_type, ng.type)
 
     sockui = ng.interface.new_socket(socket_name, in_out=in_out, socket_type=socket_type,)
+    clear_ng_interface_cache(ng)
     if (socket_description):
         sockui.description = socket_description
     return get_ng_socket_from_socketui(ng, sockui, in_out=in_out)
@@ -576,61 +900,257 @@ def remove_ng_socket(ng, idx:int, in_out:str='OUTPUT',) -> None:
         
     itm = get_socketui_from_ng_socket(ng, idx, in_out=in_out,)
     ng.interface.remove(itm)
+    clear_ng_interface_cache(ng)
     
     return None 
 
 
-def create_ng_constant_node(ng, nodetype:str, value, uniquetag:str, location:str='auto', width:int=200,):
-    """for a NodeCustomGroup: add a new constant input node in nodetree if not existing, ensure it's value"""
+class InterfaceBatch:
+    """for a NodeCustomGroup: accumulate interface edits, then apply them all at once with the minimal set of changes.
+    Please use the interface_batch() context manager instead of instancing this class directly."""
 
-    if (not uniquetag.startswith('C|')) and (location=='auto'):
-        print("WARNING: Internal message: create_ng_constant_node() please make the uniquetag startswith 'C|' to support automatic location")
+    def __init__(self, ng, sync:bool=False,):
+        self.ng = ng
+        self.sync = sync
+        self.creations = [] #[(in_out, socket_name, socket_type, socket_description),]
+        self.removals = [] #[(in_out, idx, identifier),]
+        self.edits = [] #[(in_out, idx, identifier, attribute, value),]
+        self.sockets = {} #{(in_out, socket_name): NodeSocket} filled once the batch is applied.
+
+    def new_socket(self, socket_name:str="Value", in_out:str='OUTPUT', socket_type:str="NodeSocketFloat", socket_description:str="",) -> None:
+        """queue a socket creation. In sync mode, an existing socket with the same name will be reused"""
+        self.creations.append((in_out, socket_name, socket_type, socket_description))
+        return None
+
+    def remove_socket(self, idx:int=None, in_out:str='OUTPUT', identifier:str=None,) -> None:
+        """queue the removal of an existing socket, found by index or identifier"""
+        self.removals.append((in_out, idx, identifier))
+        return None
+
+    def set_label(self, label:str, idx:int=None, in_out:str='OUTPUT', identifier:str=None,) -> None:
+        """queue a rename of an existing socket"""
+        if (label):
+            self.edits.append((in_out, idx, identifier, 'name', label))
+        return None
+
+    def set_type(self, socket_type:str, idx:int=None, in_out:str='OUTPUT', identifier:str=None,) -> None:
+        """queue a type change of an existing socket"""
+        self.edits.append((in_out, idx, identifier, 'socket_type', socket_type))
+        return None
+
+    def set_description(self, description:str, idx:int=None, in_out:str='OUTPUT', identifier:str=None,) -> None:
+        """queue a description change of an existing socket"""
+        self.edits.append((in_out, idx, identifier, 'description', description))
+        return None
+
+    def apply(self) -> None:
+        """diff the queued edits against the current interface and apply the changes in one pass"""
 
-    if (location=='auto'):
+        ng = self.ng
+        socktypes = {}
+
+        def adjusted_type(socket_type):
+            if (socket_type not in socktypes):
+                #naive support for strandard socket.type notation
+                t = f'NodeSocket{socket_type.title()}' if socket_type.isupper() else socket_type
+                socktypes[socket_type] = crosseditor_socktype_adjust(t, ng.type)
+            return socktypes[socket_type]
+
+        # 1. resolve every queued operation to an interface item, while the interface is untouched.
+        todel, changes = {}, {} #{identifier:sockui}, {identifier:{attribute:value}}
+
+        for in_out, idx, identifier in self.removals:
+            sockui = get_socketui_from_ng_socket(ng, idx=idx, in_out=in_out, identifier=identifier,)
+            todel[sockui.identifier] = sockui
+            continue
+
+        for in_out, idx, identifier, attribute, value in self.edits:
+            sockui = get_socketui_from_ng_socket(ng, idx=idx, in_out=in_out, identifier=identifier,)
+            changes.setdefault(sockui.identifier, [sockui, {}])[1][attribute] = value
+            continue
+
+        # 2. in sync mode, the queued creations describe the whole interface.
+        # we reuse the existing sockets of same name, and remove the ones not declared.
+        tocreate, reused = [], {} #[creation,], {(in_out, socket_name): identifier}
+        if (self.sync):
+            existing = {}
+            for in_out in ('INPUT','OUTPUT'):
+                for identifier, (_, sockui, _) in get_ng_interface_items(ng, get_ng_interface_map(ng, in_out=in_out), in_out=in_out).items():
+                    if (identifier not in todel):
+                        existing.setdefault((in_out, sockui.name), []).append(sockui)
+                    continue
+            for creation in self.creations:
+                in_out, socket_name, socket_type, socket_description = creation
+                candidates = existing.get((in_out, socket_name))
+                if (not candidates):
+                    tocreate.append(creation)
+                    continue
+                sockui = candidates.pop(0)
+                reused[(in_out, socket_name)] = sockui.identifier
+                attrs = changes.setdefault(sockui.identifier, [sockui, {}])[1]
+                attrs.setdefault('socket_type', socket_type)
+                attrs.setdefault('description', socket_description)
+                continue
+            for candidates in existing.values():
+                for sockui in candidates:
+                    if (sockui.identifier not in changes):
+                        todel[sockui.identifier] = sockui
+                    continue
+        else:
+            tocreate = self.creations
+
+        # 3. apply the minimal set of changes
+        for identifier, sockui in todel.items():
+            changes.pop(identifier, None)
+            ng.interface.remove(sockui)
+            continue
+
+        for sockui, attrs in changes.values():
+            for attribute, value in attrs.items():
+                if (attribute=='socket_type'):
+                    value = adjusted_type(value)
+                if (getattr(sockui, attribute)!=value):
+                    setattr(sockui, attribute, value)
+                continue
+            continue
+
+        created = {}
+        for in_out, socket_name, socket_type, socket_description in tocreate:
+            sockui = ng.interface.new_socket(socket_name, in_out=in_out, socket_type=adjusted_type(socket_type),)
+            if (socket_description):
+                sockui.description = socket_description
+            created[(in_out, socket_name)] = sockui.identifier
+            continue
+
+        # 4. the interface changed, we retrieve the NodeSockets in one single pass
+        clear_ng_interface_cache(ng)
+        for (in_out, socket_name), identifier in (reused | created).items():
+            itm = get_ng_interface_item(ng, identifier, in_out=in_out)
+            if (itm is not None):
+                self.sockets[(in_out, socket_name)] = itm[2]
+            continue
+
+        return None
+
+
+@contextmanager
+def interface_batch(ng, sync:bool=False,):
+    """for a NodeCustomGroup: batch many interface edits together, applied once leaving the context.
+    ex: `with interface_batch(ng) as batch: batch.new_socket('Foo', in_out='INPUT')`
+    - sync: the queued socket creations are describing the full interface. existing sockets of the
+      same name are reused and their type/description adjusted, the sockets not declared are removed.
+    - nothing is applied if an exception is raised within the context."""
+
+    batch = InterfaceBatch(ng, sync=sync)
+    yield batch
+    batch.apply()
+    return None
+
+
+# NOTE per nodegroup registry of the constant nodes created by create_ng_constant_node().
+# - stored as {ng.session_uid: {'count':int, 'shared':{(nodetype, flatvalues):uniquetag}}}
+# - 'count' is a running counter of 'C|' constant nodes, used for their automatic layout slot.
+# - 'shared' is only a hint of which node last received these values, the node sockets are always checked,
+#   as undo/redo or a manual tweak can change a constant node behind our back.
+NG_CONSTANTS_REGISTRY = {}
+
+
+def clear_ng_constants_registry(ng=None) -> None:
+    """clear the constant nodes registry of the given nodegroup, or of all nodegroups if None"""
+
+    if (ng is None):
+        NG_CONSTANTS_REGISTRY.clear()
+        return None
+
+    NG_CONSTANTS_REGISTRY.pop(ng.session_uid, None)
+    return None
+
+
+def get_ng_constants_registry(ng) -> dict:
+    """for a NodeCustomGroup: get the constant nodes registry, the existing constant nodes are only counted once"""
+
+    registry = NG_CONSTANTS_REGISTRY.get(ng.session_uid)
+    if (registry is None):
         constcount = len([C for C in ng.nodes if C.name.startswith('C|')])
-        in_nod = ng.nodes["Group Input"]
-        locx = in_nod.location.x
-        locy = in_nod.location.y
-        locy -= 330
-        locy -= (90*constcount)
-        location = locx, locy
+        registry = {'count':constcount, 'shared':{},}
+        NG_CONSTANTS_REGISTRY[ng.session_uid] = registry
 
-    #initialize the creation of the input node?
-    node = ng.nodes.get(uniquetag)
-    if (node is None):
-        node = ng.nodes.new(nodetype)
-        node.label = node.name = uniquetag
-        node.width = width
-        if (location):
-            node.location.x = location[0]
-            node.location.y = location[1]
+    return registry
+
+
+def create_ng_constant_node(ng, nodetype:str, value, uniquetag:str, location:str='auto', width:int=200, deduplicate:bool=False,):
+    """for a NodeCustomGroup: add a new constant input node in nodetree if not existing, ensure it's value
+    - deduplicate: if a constant node of the same type already hold the same value, return its output instead."""
+
+    if (not uniquetag.startswith('C|')) and (location=='auto'):
+        print("WARNING: Internal message: create_ng_constant_node() please make the uniquetag startswith 'C|' to support automatic location")
 
     match nodetype:
         case 'FunctionNodeQuaternionToRotation':
             assert type(value) is Quaternion, f"Please make sure passed value is of Quaternion type. Currently is of {type(value).__name__}"
             assert len(value)==4, f"Please make sure the passed Quaternion has 4 WXYZ elements. Currently contains {len(value)}"
-            #assign values
-            node.inputs[0].default_value = value.w
-            node.inputs[1].default_value = value.x
-            node.inputs[2].default_value = value.y
-            node.inputs[3].default_value = value.z
-            return node.outputs[0]
+            #assign values in WXYZ order
+            flatvalues = tuple(value)
 
         case 'FunctionNodeCombineMatrix':
             assert type(value) is Matrix, f"Please make sure passed value is of Matrix type. Currently is of {type(value).__name__}"
             rowflatten = [v for row in value for v in row]
             assert len(rowflatten)==16, f"Please make sure the passed Matrix has 16 elements in total. Currently contains {len(rowflatten)}"
             #assign flatten values
-            colflatten = [v for col in zip(*value) for v in col]
-            for sock,v in zip(node.inputs, colflatten):
-                if (sock.default_value!=v):
-                    sock.default_value = v
-            return node.outputs[0]
+            flatvalues = tuple(v for col in zip(*value) for v in col)
 
         case _:
             raise Exception(f"{nodetype} Not Implemented Yet")
 
-    return None
+    registry = get_ng_constants_registry(ng)
+
+    #a node with the same value might already exists?
+    if (deduplicate):
+        sharedtag = registry['shared'].get((nodetype, flatvalues))
+        if (sharedtag is not None):
+            sharednode = ng.nodes.get(sharedtag)
+            if (sharednode is not None) and (sharednode.bl_idname==nodetype):
+                if all(is_socket_value_equal(sock.type, sock.default_value, v) for sock,v in zip(sharednode.inputs, flatvalues)):
+                    return sharednode.outputs[0]
+
+    #initialize the creation of the input node?
+    node = ng.nodes.get(uniquetag)
+    if (node is None):
+
+        if (location=='auto'):
+            in_nod = ng.nodes["Group Input"]
+            locx = in_nod.location.x
+            locy = in_nod.location.y
+            locy -= 330
+            locy -= (90*registry['count'])
+            location = locx, locy
+
+        node = ng.nodes.new(nodetype)
+        node.label = node.name = uniquetag
+        node.width = width
+        if (location):
+            node.location.x = location[0]
+            node.location.y = location[1]
+        if (uniquetag.startswith('C|')):
+            registry['count'] += 1
+
+    #assign the values, only the changed sockets are written
+    for sock,v in zip(node.inputs, flatvalues):
+        set_socket_defvalue(sock, v)
+    registry['shared'][(nodetype, flatvalues)] = uniquetag
+
+    return node.outputs[0]
+
+
+def create_ng_constant_nodes(ng, nodetype:str, values:dict, width:int=200, deduplicate:bool=False,) -> dict:
+    """for a NodeCustomGroup: bulk version of create_ng_constant_node(), automatically placed.
+    - values: {uniquetag: value}
+    Return a dict of {uniquetag: output socket}."""
+
+    return {
+        uniquetag: create_ng_constant_node(ng, nodetype, value, uniquetag, width=width, deduplicate=deduplicate,)
+        for uniquetag, value in values.items()
+        }
 
 
 def create_new_nodegroup(name:str, tree_type:str='GeometryNodeTree', in_sockets:dict={},
@@ -644,40 +1164,120 @@ def create_new_nodegroup(name:str, tree_type:str='GeometryNodeTree', in_sockets:
     in_nod, out_nod = ng.nodes.new('NodeGroupInput'), ng.nodes.new('NodeGroupOutput')
     in_nod.location.x -= 200 ; out_nod.location.x += 200
 
-    #create the sockets
-    #inputs
-    for sname, stype in in_sockets.items():
-        create_ng_socket(ng, in_out='INPUT', socket_type=stype,
-            socket_name=sname, socket_description=sockets_description.get(sname,''))
-            #socket_custom_info=socket_custom_info.get(sname,{}),) #LATER? when we make this work..
-    #outputs
-    for sname, stype in out_sockets.items():
-        create_ng_socket(ng, in_out='OUTPUT', socket_type=stype,
-            socket_name=sname, socket_description=sockets_description.get(sname,''))
-            #socket_custom_info=socket_custom_info.get(sname,{}),) #LATER? when we make this work..
+    #create the sockets, all at once
+    with interface_batch(ng) as batch:
+        #inputs
+        for sname, stype in in_sockets.items():
+            batch.new_socket(in_out='INPUT', socket_type=stype,
+                socket_name=sname, socket_description=sockets_description.get(sname,''))
+                #socket_custom_info=socket_custom_info.get(sname,{}),) #LATER? when we make this work..
+        #outputs
+        for sname, stype in out_sockets.items():
+            batch.new_socket(in_out='OUTPUT', socket_type=stype,
+                socket_name=sname, socket_description=sockets_description.get(sname,''))
+                #socket_custom_info=socket_custom_info.get(sname,{}),) #LATER? when we make this work..
 
     return ng
 
 
+# NOTE cache of the nodegroups names available in .blend libraries, so we don't need to open a library to list it.
+# - stored as {abspath: {'stamp':str, 'node_groups':set}}, filled by import_new_nodegroups() from its own loading session.
+# - the stamp is built from the library file mtime and size, if the file changed, the cache is outdated.
+# - imported nodegroups are stamped as well, with a 'rig_nodes_libstamp' custom property, 
+#   so a nodegroup imported from an outdated library file will be re-imported.
+NG_LIBRARY_CACHE = {}
+
+
+def get_library_stamp(blendpath) -> str:
+    """get a version stamp of a library file, based on the file modification time and size"""
+
+    stat = os.stat(blendpath)
+    return f"{stat.st_mtime_ns}:{stat.st_size}"
+
+
+def import_new_nodegroups(blendpath, ngnames, tree_type='GeometryNodeTree') -> dict:
+    """Import many nodegroups from an external blend file, in a single library loading session.
+    Nodegroups already in the file are reused, unless they were imported from an outdated version of the library.
+    Return a dict of {ngname: nodegroup or None if not found}."""
+
+    abspath = bpy.path.abspath(blendpath)
+    result, pending = {}, []
+
+    for ngname in ngnames:
+
+        # Check if the nodegroup already exists, unstamped ones were not imported by us, we don't touch them
+        ng = bpy.data.node_groups.get(ngname)
+        if (ng is not None) and (ng.get('rig_nodes_libstamp') is None):
+            result[ngname] = ng
+            continue
+
+        pending.append(ngname)
+        continue
+
+    if (not pending):
+        return result
+
+    # only now we need the library version, if the file is unavailable we keep using the nodegroups we have
+    try:
+        stamp = get_library_stamp(abspath)
+    except OSError:
+        stamp = None
+
+    toimport, outdated = [], {}
+
+    for ngname in pending:
+
+        ng = bpy.data.node_groups.get(ngname)
+        if (ng is not None):
+            if (stamp is None) or (ng['rig_nodes_libstamp']==stamp):
+                result[ngname] = ng
+                continue
+            outdated[ngname] = ng
+
+        toimport.append(ngname)
+        continue
+
+    # skip the names we already know are missing from this version of the library
+    cache = NG_LIBRARY_CACHE.get(abspath)
+    if (cache is not None) and (cache['stamp']==stamp):
+        toimport = [n for n in toimport if (n in cache['node_groups'])]
+
+    # Import the nodegroups from the blend file all at once, listing the library in the same session
+    if (toimport):
+        with bpy.data.libraries.load(abspath, link=False) as (data_from, data_to):
+            available = set(data_from.node_groups)
+            NG_LIBRARY_CACHE[abspath] = {'stamp':stamp, 'node_groups':available}
+            toimport = [n for n in toimport if (n in available)]
+            data_to.node_groups = toimport
+
+        for ngname, ng in zip(toimport, data_to.node_groups):
+
+            if (ng is None):
+                continue
+            ng['rig_nodes_libstamp'] = stamp
+
+            # replace the outdated nodegroup by the new one
+            old = outdated.pop(ngname, None)
+            if (old is not None):
+                old.user_remap(ng)
+                bpy.data.node_groups.remove(old)
+                ng.name = ngname
+
+            result[ngname] = ng
+            continue
+
+    # the names not found or not imported, keep their outdated version if any
+    for ngname in pending:
+        if (ngname not in result):
+            result[ngname] = outdated.get(ngname)
+
+    return result
+
+
 def import_new_nodegroup(blendpath, ngname, tree_type='GeometryNodeTree'):
     """Import a nodegroup from an external blend file."""
 
-    # Check if the nodegroup already exists
-    if ngname in bpy.data.node_groups:
-        return bpy.data.node_groups[ngname]
-    
-    # Import the nodegroup from the blend file
-    with bpy.data.libraries.load(blendpath, link=False) as (data_from, data_to):
-        if ngname in data_from.node_groups:
-            data_to.node_groups = [ngname]
-        else:
-            return None
-    
-    # Return the imported nodegroup
-    if (data_to.node_groups):
-        return data_to.node_groups[0]
-
-    return None
+    return import_new_nodegroups(blendpath, [ngname], tree_type=tree_type).get(ngname)
 
 
 def link_sockets(socket1, socket2):
@@ -693,53 +1293,124 @@ def link_sockets(socket1, socket2):
 def replace_node_by_ng(node_tree, old_node, node_group):
     """Replace an existing node with a new Node Group node (assuming same socket structure)"""
 
-    # Save old node properties.
-    old_node_width = float(old_node.width)
-    old_node_location = old_node.location.copy()
+    new_nodes = replace_nodes_by_ng(node_tree, [old_node], node_group)
+    if (not new_nodes):
+        return None
+
+    return new_nodes[0]
 
-    # For inputs, store default values and the linked from_socket (if exists)
-    old_inputs_defaults = [getattr(sock, 'default_value', None) for sock in old_node.inputs]
-    old_inputs_links = [sock.links[0].from_socket if sock.links else None for sock in old_node.inputs]
 
-    # For outputs, store the linked to_socket (if exists)
-    old_outputs_links = [sock.links[0].to_socket if sock.links else None for sock in old_node.outputs]
+def copy_socket_value(value):
+    """copy a socket default_value, vector & color values are views of the socket memory and won't survive its node"""
+
+    if isinstance(value, (str, bpy.types.ID)) or (not hasattr(value, '__len__')):
+        return value
+    if hasattr(value, 'copy'): #mathutils types
+        return value.copy()
+
+    return tuple(copy_socket_value(v) for v in value)
+
+
+def replace_nodes_by_ng(node_tree, old_nodes, node_group) -> list:
+    """Replace many existing nodes with new Node Group nodes at once (assuming same socket structure).
+    All links are preserved, including multi-input links and links between the replaced nodes.
+    Return the list of new nodes, in the same order as old_nodes."""
 
     # Determine the appropriate node type for a node group.
     ng_type = TREE_TO_GROUP_EQUIV.get(node_tree.bl_idname)
     if (ng_type is None):
-        print(f"replace_node_by_ng() does not support '{node_tree.bl_idname}'.")
-        return None
+        print(f"replace_nodes_by_ng() does not support '{node_tree.bl_idname}'.")
+        return []
+
+    old_nodes = list(old_nodes)
+    replaced = {n.name: i for i,n in enumerate(old_nodes)}
+
+    # 1. Snapshot everything before touching the nodetree.
+    # A link end is stored either as a socket of a node we keep, or as (replaced node idx, socket idx),
+    # as the sockets of the removed nodes will not exist anymore.
+    snapshots = []
+    links = [] #[(from_end, to_end),]
+
+    for n in old_nodes:
+        out_idx = {s.identifier: i for i,s in enumerate(n.outputs)}
+        snapshots.append({
+            'width': float(n.width),
+            'location': n.location.copy(),
+            'outidx': out_idx,
+            'defaults': [copy_socket_value(getattr(sock, 'default_value', None)) for sock in n.inputs],
+            })
+        continue
 
-    # Delete the old node.
-    node_tree.nodes.remove(old_node)
-
-    # Create the new node group node.
-    new_node = node_tree.nodes.new(ng_type)
-    new_node.location = old_node_location
-    new_node.width = old_node_width
-
-    # Assign the provided node group.
-    new_node.node_tree = node_group
-
-    # Re-apply default values to new node inputs (if available).
-    for i, sock in enumerate(new_node.inputs):
-        if (i < len(old_inputs_defaults) and old_inputs_defaults[i] is not None):
-            try: sock.default_value = old_inputs_defaults[i]
-            except Exception as e: print(f"Warning: Could not copy default for input '{sock.name}': {e}")
-
-    # Re-create input links.
-    for i, sock in enumerate(new_node.inputs):
-        if (i < len(old_inputs_links) and old_inputs_links[i] is not None):
-            try: node_tree.links.new(old_inputs_links[i], sock)
-            except Exception as e: print(f"Warning: Could not re-link input '{sock.name}': {e}")
-
-    # Re-create output links.
-    for i, sock in enumerate(new_node.outputs):
-        if (i < len(old_outputs_links) and old_outputs_links[i] is not None):
-            try: node_tree.links.new(sock, old_outputs_links[i])
-            except Exception as e: print(f"Warning: Could not re-link output '{sock.name}': {e}")
-    
-    return new_node
+    for k,n in enumerate(old_nodes):
+
+        for i,sock in enumerate(n.inputs):
+            for link in sock.links:
+                from_node = link.from_node
+                if (from_node.name in replaced):
+                    j = replaced[from_node.name]
+                    from_end = (j, snapshots[j]['outidx'][link.from_socket.identifier])
+                else:
+                    from_end = link.from_socket
+                links.append((from_end, (k, i)))
+                continue
+            continue
+
+        for i,sock in enumerate(n.outputs):
+            for link in sock.links:
+                # links between replaced nodes are already stored from the inputs side
+                if (link.to_node.name in replaced):
+                    continue
+                links.append(((k, i), link.to_socket))
+                continue
+            continue
+
+        continue
+
+    # 2. Delete the old nodes, and create the new node group nodes.
+    for n in old_nodes:
+        node_tree.nodes.remove(n)
+        continue
+
+    new_nodes = []
+    for snap in snapshots:
+        new_node = node_tree.nodes.new(ng_type)
+        new_node.location = snap['location']
+        new_node.width = snap['width']
+        # Assign the provided node group.
+        new_node.node_tree = node_group
+        new_nodes.append(new_node)
+
+        # Re-apply default values to new node inputs (if available).
+        old_inputs_defaults = snap['defaults']
+        for i, sock in enumerate(new_node.inputs):
+            if (i < len(old_inputs_defaults) and old_inputs_defaults[i] is not None):
+                try: sock.default_value = old_inputs_defaults[i]
+                except Exception as e: print(f"Warning: Could not copy default for input '{sock.name}': {e}")
+            continue
+        continue
+
+    # 3. Re-create all links in one pass.
+    for from_end, to_end in links:
+
+        if (type(from_end) is tuple):
+            k, i = from_end
+            outputs = new_nodes[k].outputs
+            if (i >= len(outputs)):
+                continue
+            from_end = outputs[i]
+
+        if (type(to_end) is tuple):
+            k, i = to_end
+            inputs = new_nodes[k].inputs
+            if (i >= len(inputs)):
+                continue
+            to_end = inputs[i]
+
+        try: node_tree.links.new(from_end, to_end)
+        except Exception as e: print(f"Warning: Could not re-link '{from_end.name}' to '{to_end.name}': {e}")
+        continue
+
+    return new_nodes
 
 
 def frame_nodes(node_tree, *nodes, label:str="Frame",) -> None:
@@ -770,10 +1441,9 @@ def get_nearest_node_at_position(nodes:list|set, context, event, position=None,
 
     x, y = position
 
-    # Make a list of each corner (and middle of border) for each node.
-    # Will be sorted to find nearest point and thus nearest node
-    node_points_with_dist = []
-
+    # the candidates locations & dimensions, computed once for both passes below.
+    dpifac = get_dpifac()
+    candidates = []
     for n in nodes:
         if (n.type == 'FRAME'):
             continue
@@ -781,9 +1451,15 @@ def get_nearest_node_at_position(nodes:list|set, context, event, position=None,
             continue
         if (forbidden is not None) and (n in forbidden):
             continue
-
         locx, locy = get_node_absolute_location(n)
-        dimx, dimy = n.dimensions.x/get_dpifac(), n.dimensions.y/get_dpifac()
+        candidates.append((n, locx, locy, n.dimensions.x/dpifac, n.dimensions.y/dpifac))
+        continue
+
+    # Make a list of each corner (and middle of border) for each node.
+    # Will be sorted to find nearest point and thus nearest node
+    node_points_with_dist = []
+
+    for n, locx, locy, dimx, dimy in candidates:
 
         node_points_with_dist.append([n, hypot(x - locx, y - locy)])  # Top Left
         node_points_with_dist.append([n, hypot(x - (locx + dimx), y - locy)])  # Top Right
@@ -799,16 +1475,7 @@ def get_nearest_node_at_position(nodes:list|set, context, event, position=None,
 
     nearest_node = sorted(node_points_with_dist, key=lambda k: k[1])[0][0]
 
-    for n in nodes:
-        if (n.type == 'FRAME'):
-            continue
-        if (not allow_reroute and (n.type == 'REROUTE')):
-            continue
-        if (forbidden is not None) and (n in forbidden):
-            continue
-
-        locx, locy = get_node_absolute_location(n)
-        dimx, dimy = n.dimensions.x/get_dpifac(), n.dimensions.y/get_dpifac()
+    for n, locx, locy, dimx, dimy in candidates:
 
         if (locx <= x <= locx+dimx) and \
            (locy-dimy <= y <= locy):
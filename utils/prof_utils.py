@@ -0,0 +1,139 @@
+# SPDX-FileCopyrightText: 2025 Natalie Cuthbert <natalie@cuthbert.co.za>
+#
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+
+# NOTE opt-in profiling of the plugin hot paths (handlers, nodes update_all(), register phases).
+# - enabled from the addon preferences 'debug_profiling' property.
+# - when disabled, the profiled functions only pay for a single attribute lookup.
+# - the latest calls are stored in a ring buffer, and aggregated per name in PROFILING_STATS.
+# NOTE this module should stay free of bpy, it's imported on plugin registration.
+
+
+import json
+from time import perf_counter, time
+from functools import wraps
+from collections import deque
+
+
+class ProfilingState:
+    enabled = False
+
+# the latest calls, as (name, timestamp, milliseconds)
+PROFILING_RECORDS = deque(maxlen=4096)
+# aggregated calls per name, as {name: [calls count, total milliseconds, max milliseconds]}
+PROFILING_STATS = {}
+
+
+def set_profiling_enabled(state:bool) -> None:
+    """enable or disable the profiling. Is called from the addon preferences"""
+
+    ProfilingState.enabled = bool(state)
+    return None
+
+
+def clear_profiling() -> None:
+    """clear all recorded profiling data"""
+
+    PROFILING_RECORDS.clear()
+    PROFILING_STATS.clear()
+    return None
+
+
+def record_profiling(name:str, ms:float) -> None:
+    """record the time spent in a call, in milliseconds"""
+
+    PROFILING_RECORDS.append((name, time(), ms))
+
+    stats = PROFILING_STATS.get(name)
+    if (stats is None):
+        PROFILING_STATS[name] = [1, ms, ms]
+        return None
+
+    stats[0] += 1
+    stats[1] += ms
+    if (ms > stats[2]):
+        stats[2] = ms
+    return None
+
+
+class profiled:
+    """context manager recording the time spent in a block of code, if the profiling is enabled.
+    ex: `with profiled("update_all", node.bl_idname): ...` will be recorded as "update_all.MyNode".
+    the name and suffix are only joined when recording, so a disabled profiling don't format strings."""
+
+    __slots__ = ('name', 'suffix', 'start')
+
+    def __init__(self, name:str, suffix:str=None):
+        self.name = name
+        self.suffix = suffix
+        self.start = None
+
+    def __enter__(self):
+        if (ProfilingState.enabled):
+            self.start = perf_counter()
+        return self
+
+    def __exit__(self, *args):
+        if (self.start is not None):
+            name = self.name if (self.suffix is None) else f"{self.name}.{self.suffix}"
+            record_profiling(name, (perf_counter() - self.start) * 1000)
+        return False
+
+
+def profiled_function(fct):
+    """decorator recording the time spent in a function, if the profiling is enabled. The function __name__ is kept"""
+
+    name = fct.__name__
+
+    @wraps(fct)
+    def wrapper(*args, **kwargs):
+        if (not ProfilingState.enabled):
+            return fct(*args, **kwargs)
+        t = perf_counter()
+        try:
+            return fct(*args, **kwargs)
+        finally:
+            record_profiling(name, (perf_counter() - t) * 1000)
+
+    return wrapper
+
+
+def profiling_summary(register_timings:dict=None) -> list:
+    """get a list of (name, calls count, total ms, average ms, max ms) sorted by total time spent.
+    optionally include the register phases timings, as single calls."""
+
+    summary = []
+
+    if (register_timings):
+        for name, ms in register_timings.items():
+            summary.append((f"register.{name}", 1, ms, ms, ms))
+            continue
+
+    for name, (calls, total, maxi) in PROFILING_STATS.items():
+        summary.append((name, calls, total, total/calls, maxi))
+        continue
+
+    summary.sort(key=lambda s: s[2], reverse=True)
+    return summary
+
+
+def dump_profiling(filepath:str, register_timings:dict=None) -> None:
+    """dump the profiling summary and the ring buffer records to a json file"""
+
+    data = {
+        "register": register_timings or {},
+        "summary": [
+            {"name":name, "calls":calls, "total_ms":total, "avg_ms":avg, "max_ms":maxi}
+            for name, calls, total, avg, maxi in profiling_summary()
+            ],
+        "records": [
+            {"name":name, "timestamp":timestamp, "ms":ms}
+            for name, timestamp, ms in PROFILING_RECORDS
+            ],
+        }
+
+    with open(filepath, 'w') as f:
+        json.dump(data, f, indent=2)
+
+    return None
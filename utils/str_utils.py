@@ -7,7 +7,9 @@
 
 import os
 import re
-import traceback
+import linecache
+from functools import lru_cache
+from collections import OrderedDict
 
 from .. import get_addon_prefs
 
@@ -25,6 +27,65 @@ def is_float_compatible(string):
         return False
 
 
+# NOTE above this number of tokens, the tokens pattern is built from a trie instead of a plain alternation.
+# a regex alternation of hundreds of tokens (ex: bone names) tries every token one by one at each position,
+# a trie shaped regex only walks the characters common to the tokens once.
+TOKENS_TRIE_THRESHOLD = 64
+
+
+def is_number_token(token:str) -> bool:
+    """check if a token is a integer or float number, numbers tokens need different boundaries"""
+    return re.fullmatch(r'\d+(?:\.\d+)?', token) is not None
+
+
+def build_trie_pattern(tokens) -> str:
+    """build a regex pattern matching any of the given tokens, structured as a trie. Longest tokens are preferred."""
+
+    trie = {}
+    for token in tokens:
+        node = trie
+        for char in token:
+            node = node.setdefault(char, {})
+        node[''] = None # end of token marker
+        continue
+
+    def walk(node):
+        alternatives = [re.escape(char) + walk(node[char]) for char in sorted(k for k in node if k)]
+        if (not alternatives):
+            return ''
+        optional = ('' in node)
+        if (len(alternatives)==1) and (not optional):
+            return alternatives[0]
+        return '(?:' + '|'.join(alternatives) + ')' + ('?' if optional else '')
+
+    return walk(trie)
+
+
+@lru_cache(maxsize=256)
+def get_tokens_pattern(tokens:frozenset) -> re.Pattern:
+    """get a compiled regex matching exactly any of the given tokens, cached per set of tokens.
+      - For numbers (integer/float), it won't match if the token is part of a larger number.
+      - For alphabetic tokens, word boundaries are used.
+    Tokens are sorted longest first, so a token is never shadowed by a shorter one it starts with."""
+
+    # For numbers, ensure the token isn't part of a larger number.
+    numbers = sorted((t for t in tokens if is_number_token(t)), key=lambda t: (-len(t), t))
+    # For alphabetic tokens, use word boundaries.
+    words = sorted((t for t in tokens if not is_number_token(t)), key=lambda t: (-len(t), t))
+
+    if (len(tokens) > TOKENS_TRIE_THRESHOLD):
+        parts = []
+        if (numbers):
+            parts.append(r'(?<![\d.])(?:' + build_trie_pattern(numbers) + r')(?![\d.])')
+        if (words):
+            parts.append(r'\b(?:' + build_trie_pattern(words) + r')\b')
+        return re.compile('|'.join(parts))
+
+    parts = [r'(?<![\d.])' + re.escape(t) + r'(?![\d.])' for t in numbers] + \
+            [r'\b' + re.escape(t) + r'\b' for t in words]
+    return re.compile('|'.join(parts))
+
+
 def match_exact_tokens(string:str, tokenlist:list) -> list:
     """
     Get a list of matching token, if any token in our token list match in our string list
@@ -33,42 +94,27 @@ def match_exact_tokens(string:str, tokenlist:list) -> list:
       - For numbers (integer/float), it won't match if the token is part of a larger number.
       - For alphabetic tokens, word boundaries are used.
     """
-    def build_token_pattern(tokens):
-        def boundary(token):
-            # For numbers, ensure the token isn't part of a larger number.
-            if re.fullmatch(r'\d+(?:\.\d+)?', token):
-                return r'(?<![\d.])' + re.escape(token) + r'(?![\d.])'
-            else:
-                # For alphabetic tokens, use word boundaries.
-                return r'\b' + re.escape(token) + r'\b'
-        return '|'.join(boundary(token) for token in tokens)
-    
-    pattern = build_token_pattern(tokenlist)
-    return re.findall(pattern, string)
+
+    if (not tokenlist):
+        return []
+
+    pattern = get_tokens_pattern(frozenset(tokenlist))
+    return pattern.findall(string)
 
 
 def replace_exact_tokens(string:str, tokens_mapping:dict) -> str:
     """Replace any token in the given string with new values as defined by the tokens_mapping dictionary."""
-    
-    def build_token_pattern(tokens):
-        def boundary(token):
-            # If token is a number (integer or float)
-            if re.fullmatch(r'\d+(?:\.\d+)?', token):
-                # Use negative lookbehind and lookahead to ensure the token isn't part of a larger number.
-                return r'(?<![\d.])' + re.escape(token) + r'(?![\d.])'
-            else:
-                # For alphabetic tokens, use word boundaries.
-                return r'\b' + re.escape(token) + r'\b'
-        # Build the overall pattern by joining each token pattern with '|'
-        return '|'.join(boundary(token) for token in tokens)
-
-    pattern = build_token_pattern(tokens_mapping.keys())
+
+    if (not tokens_mapping):
+        return string
+
+    pattern = get_tokens_pattern(frozenset(tokens_mapping.keys()))
     
     def repl(match):
         token = match.group(0)
         return tokens_mapping.get(token, token)
     
-    return re.sub(pattern, repl, string)
+    return pattern.sub(repl, string)
 
 
 def word_wrap(string="", layout=None, alignment="CENTER", max_char=70, char_auto_sidepadding=1.0, context=None, active=False, alert=False, icon=None, scale_y=1.0,):
@@ -145,117 +191,177 @@ def wrap(string,max_char):
     return wrapped
 
 
-def prettyError(e: BaseException, userfilename='',):
+def iter_traceback(tb):
+    """iterate over a traceback (filename, lineno) frames, without reading any source file, unlike traceback.extract_tb()"""
+
+    while (tb is not None):
+        yield tb.tb_frame.f_code.co_filename, tb.tb_lineno
+        tb = tb.tb_next
+        continue
+
+
+class PrettyError:
     """
-    Return a multiline string describing the given exception `e` in a
-    more readable format. If it's a SyntaxError, includes line text
-    with a caret at the .offset. Otherwise, falls back to the last
-    traceback frame and includes the file name, line, and code snippet.
+    Lazy readable description of an exception `e`. The location of the error and
+    the short message are cheap to get, the full message (which may read source 
+    files) is only built on demand, see the .full and .small properties.
+    If it's a SyntaxError, includes line text with a caret at the .offset. Otherwise, 
+    falls back to the last traceback frame and includes the file name, line, and code snippet.
     """
 
-    etypename = type(e).__name__
-    
-    match etypename:
-        
-        #Synthax error?
-        case 'SyntaxError':
-            # e.text is the source line, e.offset is the column offset (1-based)
-            # e.lineno is line number, e.filename is file name, e.msg is short message
-            faulty_line = e.text or ""
-            faulty_line = faulty_line.rstrip("\n")
-
-            # offset can be None or out-of-range
-            offset = e.offset or 1
-            if offset < 1:
-                offset = 1
-            if offset > len(faulty_line):
-                offset = len(faulty_line)
-
-            highlight = ""
-            if (faulty_line):
-                highlight = " " * (offset - 1) + "^"*5
-
-            full_error = (
-                f"{type(e).__name__}: {e.msg}\n"
-                f"File '{e.filename}' At line {e.lineno}.\n"
-                f"    {faulty_line}\n"
-                f"    {highlight}"
-                )
-            small_error = (
-                f"PythonSynthaxError. {e.msg}. Line {e.lineno}."
-                )
-            return full_error, small_error
-
-        #Nex Error?
-        case 'NexError':
-
-            tb = e.__traceback__
-            filtered_tb = tb
-            faultyfilename = 'Unknown'
-            faultyline = 'Unknown'
-
-            while (filtered_tb is not None):
-                # Extract a 1-frame summary for the current node in the traceback
-                frame_summaries = traceback.extract_tb(filtered_tb, limit=1)
-                if (not frame_summaries):
-                    # Something went wrong or we reached the end
-                    break
-
-                frame_info = frame_summaries[0]  # A FrameSummary object
-
-                filename = frame_info.filename
-                lineno = frame_info.lineno
-
-                if (userfilename in filename):
-                    faultyline = lineno
-                    faultyfilename = filename
-                    break
-
-                filtered_tb = filtered_tb.tb_next
-                continue
+    def __init__(self, e: BaseException, userfilename='',):
 
-            full_error = (
-                f"NexError: {e}\n"
-                f"File '{faultyfilename}' At line {faultyline}.\n"
-                )
-            small_error = (
-                f"{e} Line {faultyline}."
-                )
-            return full_error, small_error
-
-        # Other exceptions
-        case _:
-
-            # We'll extract the traceback frames. The last frame is typically where
-            # the exception occurred. We can show file, line, and snippet if available.
-            frames = traceback.extract_tb(e.__traceback__)
-            if not frames:
-                # If there's no traceback info at all, just show type + message
-                return f"{type(e).__name__}: {e}", f"{type(e).__name__}. {e}"
+        # NOTE we only keep the extracted strings & fields, never the exception itself.
+        # its traceback would keep every frame locals alive (RNA objects, arrays..) as long as we are cached.
+        self.userfilename = userfilename
+        self.etypename = type(e).__name__
+        self.message = str(e)
+        self.count = 1 #how many times this same error occured, see get_pretty_error()
+        self._full = None
+
+        match self.etypename:
+
+            case 'SyntaxError':
+                self.filename, self.lineno = e.filename, e.lineno
+                self.syntaxmsg, self.syntaxtext, self.syntaxoffset = e.msg, e.text, e.offset
+
+            #the faulty line is the first frame from the user file
+            case 'NexError':
+                self.filename, self.lineno = 'Unknown', 'Unknown'
+                for filename, lineno in iter_traceback(e.__traceback__):
+                    if (userfilename in filename):
+                        self.filename, self.lineno = filename, lineno
+                        break
+                    continue
 
             # The last frame is typically the innermost call where the error happened
-            last_frame = frames[-1]
-            filename = last_frame.filename
-            lineno = last_frame.lineno
-            code_line = last_frame.line or ""
-
-            if (filename == userfilename):
-                full_error = (
-                    f"UserSideError. {type(e).__name__}: {e}\n"
-                    f"File \"{filename}\", At line {lineno}\n\n"
-                    f"    {code_line}"
+            case _:
+                self.filename, self.lineno = None, None
+                for filename, lineno in iter_traceback(e.__traceback__):
+                    self.filename, self.lineno = filename, lineno
+                    continue
+
+    @property
+    def key(self) -> tuple:
+        return (self.etypename, self.filename, self.lineno, self.message, self.userfilename)
+
+    @property
+    def small(self) -> str:
+
+        match self.etypename:
+
+            case 'SyntaxError':
+                return f"PythonSynthaxError. {self.syntaxmsg}. Line {self.lineno}."
+
+            case 'NexError':
+                return f"{self.message} Line {self.lineno}."
+
+            case _:
+                if (self.filename is None):
+                    return f"{self.etypename}. {self.message}"
+                if (self.filename == self.userfilename):
+                    return f"{self.etypename}. {self.message} Line {self.lineno}."
+                return f"InternalError. {self.etypename}. {self.message}. File '{os.path.basename(self.filename)}' line {self.lineno}."
+
+    @property
+    def full(self) -> str:
+
+        if (self._full is None):
+            self._full = self.build_full()
+        return self._full
+
+    def __str__(self) -> str:
+        return self.full
+
+    def build_full(self) -> str:
+
+        match self.etypename:
+
+            #Synthax error?
+            case 'SyntaxError':
+                # e.text is the source line, e.offset is the column offset (1-based)
+                # e.lineno is line number, e.filename is file name, e.msg is short message
+                faulty_line = self.syntaxtext or ""
+                faulty_line = faulty_line.rstrip("\n")
+
+                # offset can be None or out-of-range
+                offset = self.syntaxoffset or 1
+                if offset < 1:
+                    offset = 1
+                if offset > len(faulty_line):
+                    offset = len(faulty_line)
+
+                highlight = ""
+                if (faulty_line):
+                    highlight = " " * (offset - 1) + "^"*5
+
+                return (
+                    f"{self.etypename}: {self.syntaxmsg}\n"
+                    f"File '{self.filename}' At line {self.lineno}.\n"
+                    f"    {faulty_line}\n"
+                    f"    {highlight}"
                     )
-                small_error = (
-                    f"{type(e).__name__}. {e} Line {lineno}."
+
+            #Nex Error?
+            case 'NexError':
+                return (
+                    f"NexError: {self.message}\n"
+                    f"File '{self.filename}' At line {self.lineno}.\n"
                     )
-                return full_error, small_error
-            
-            full_error = (
-                f"InternalError. Please report! {type(e).__name__}: {e}\n"
-                f"File \"{filename}\", At line {lineno}\n\n"
-                f"    {code_line}"
-                )
-            small_error = (
-                f"InternalError. {type(e).__name__}. {e}. File '{os.path.basename(filename)}' line {lineno}."
-                )
-            return full_error, small_error
+
+            # Other exceptions
+            case _:
+                # If there's no traceback info at all, just show type + message
+                if (self.filename is None):
+                    return f"{self.etypename}: {self.message}"
+
+                code_line = linecache.getline(self.filename, self.lineno).strip()
+
+                if (self.filename == self.userfilename):
+                    return (
+                        f"UserSideError. {self.etypename}: {self.message}\n"
+                        f"File \"{self.filename}\", At line {self.lineno}\n\n"
+                        f"    {code_line}"
+                        )
+                return (
+                    f"InternalError. Please report! {self.etypename}: {self.message}\n"
+                    f"File \"{self.filename}\", At line {self.lineno}\n\n"
+                    f"    {code_line}"
+                    )
+
+
+# NOTE the latest errors described, de-duplicated by (exception type, file, line, message).
+# a node failing identically on every frame will reuse the same PrettyError.
+PRETTY_ERRORS_CACHE = OrderedDict()
+PRETTY_ERRORS_MAX = 128
+
+
+def get_pretty_error(e: BaseException, userfilename='',) -> PrettyError:
+    """get a lazy PrettyError for the given exception. An identical error already described is reused,
+    check PrettyError.count to avoid reporting the same error over and over."""
+
+    err = PrettyError(e, userfilename=userfilename,)
+    key = err.key
+
+    cached = PRETTY_ERRORS_CACHE.get(key)
+    if (cached is not None):
+        cached.count += 1
+        PRETTY_ERRORS_CACHE.move_to_end(key)
+        return cached
+
+    PRETTY_ERRORS_CACHE[key] = err
+    while (len(PRETTY_ERRORS_CACHE) > PRETTY_ERRORS_MAX):
+        PRETTY_ERRORS_CACHE.popitem(last=False)
+
+    return err
+
+
+def prettyError(e: BaseException, userfilename='',):
+    """
+    Return a multiline string describing the given exception `e` in a
+    more readable format, and a short version of it. See PrettyError.
+    Identical errors reuse the strings already built, use get_pretty_error() for a lazy description.
+    """
+
+    err = get_pretty_error(e, userfilename=userfilename,)
+    return err.full, err.small